@@ -0,0 +1,324 @@
+import re
+import threading
+from array import array
+
+try:
+    import numpy as np  # in requirements.txt; ohne NumPy wird in Python gezählt
+except ImportError:
+    np = None
+
+from .curriculum import drill_questions
+from .feedback_rules import normalize_value
+from .session_export import latest_checkins
+
+# Dimensionen für Filter und Kreuztabellen (Modul/Drill/Frage ergeben sich aus der Spalte)
+DIMENSIONS = ("user", "team", "phase", "shift")
+
+_SHIFT = re.compile(r"^shift_(\d+)_")
+
+
+class _Codes:
+    """Wert <-> fortlaufender int-Code"""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value) -> int:
+        return self._codes.get(value, -1)
+
+
+class _Column:
+    """Alle Antworten auf eine Drill-Frage als parallele int-Arrays (eine Zeile pro Antwort).
+
+    Antwortcodes 0..n-1 sind die Optionen aus config.questions in Curriculum-Reihenfolge;
+    Werte, die auch normalisiert keiner Option entsprechen, bekommen Codes ab n.
+    """
+
+    def __init__(self, module_id, drill_id, question, position):
+        self.module_id = module_id
+        self.drill_id = drill_id
+        self.position = position
+        self.key = question["key"]
+        self.label = question.get("label")
+        self.values = list(question["options"])
+        self.option_count = len(self.values)
+        self._codes = {}
+        for code, option in enumerate(self.values):
+            self._codes.setdefault(normalize_value(option), code)
+        self.slot = array("I")
+        self.user = array("I")
+        self.team = array("I")
+        self.phase = array("I")
+        self.shift = array("H")
+        self.value = array("H")
+
+    def code(self, answer) -> int:
+        normalized = normalize_value(answer)
+        code = self._codes.get(normalized)
+        if code is None:
+            code = self._codes[normalized] = len(self.values)
+            self.values.append(answer)
+        return code
+
+    def append(self, slot, user, team, phase, shift, value):
+        self.slot.append(slot)
+        self.user.append(user)
+        self.team.append(team)
+        self.phase.append(phase)
+        self.shift.append(shift)
+        self.value.append(value)
+
+    def keep(self, slot_map: dict):
+        """Zeilen gelöschter/überholter Sessions entfernen, Slots umnummerieren"""
+        rows = [i for i, s in enumerate(self.slot) if s in slot_map]
+        for name in ("user", "team", "phase", "shift", "value"):
+            old = getattr(self, name)
+            setattr(self, name, array(old.typecode, (old[i] for i in rows)))
+        self.slot = array("I", (slot_map[self.slot[i]] for i in rows))
+
+
+class AnswerAnalytics:
+    """Verteilungen der Checkin-Antworten (Auswahlfragen) über alle Sessions.
+
+    Die Antworten werden einmal aus dem Store gelesen und spaltenweise pro Drill-Frage
+    als kompakte int-Arrays gehalten (Nutzer, beobachtetes Team, Phase, Shift, Antwortcode);
+    danach hält update()/remove() sie bei jedem Schreiben aktuell. Abfragen zählen nur
+    noch über die Arrays, mit NumPy (bincount) falls installiert, sonst in Python.
+    Überholte Zeilen werden per Slot als tot markiert und gelegentlich entfernt.
+    Ändert sich das Curriculum (andere Optionen), wird beim nächsten Zugriff neu aufgebaut.
+    """
+
+    def __init__(self, store, index_fn):
+        self.store = store
+        self.index_fn = index_fn
+        self._lock = threading.RLock()
+        self._index = None
+        self._reset()
+
+    def _reset(self):
+        self._columns = {}
+        self._key_maps = {}
+        self._slots = {}
+        self._fingerprints = {}
+        self._alive = bytearray()
+        self._dead = 0
+        self._dims = {dim: _Codes() for dim in ("user", "team", "phase")}
+
+    def _current_index(self):
+        try:
+            return self.index_fn()
+        except FileNotFoundError:
+            return None
+
+    def _ensure(self):
+        index = self._current_index()
+        if index is not None and index is self._index:
+            return
+        self._reset()
+        self._index = index
+        if index is None:
+            return
+        for session_id in self.store.ids():
+            session = self.store.load(session_id)
+            if session is not None:
+                self._add(session)
+
+    def _key_map(self, module_id, drill_id) -> dict:
+        """Antwort-Key -> (Drill, Frage, Shift) für einen Drill"""
+        cache_key = (module_id, drill_id)
+        if cache_key not in self._key_maps:
+            mapping = {}
+            drill = self._index.get_drill(drill_id, module_id) if drill_id else None
+            for answer_key, question in drill_questions(drill) if drill else ():
+                if not question.get("options"):
+                    continue
+                match = _SHIFT.match(answer_key) if answer_key != question["key"] else None
+                mapping.setdefault(answer_key, (drill, question, int(match.group(1)) if match else 0))
+            self._key_maps[cache_key] = mapping
+        return self._key_maps[cache_key]
+
+    @staticmethod
+    def _recorded_drill(session: dict, checkin: dict):
+        """Drill, unter dem ein Checkin erfasst wurde: eigener drill_id, der Drill der Session
+        oder bei modulweiten Sessions der aktuelle Drill (progress.current_drill_index)"""
+        if checkin.get("drill_id") or session.get("drill_id"):
+            return checkin.get("drill_id") or session.get("drill_id")
+        drills = session.get("drill_refs") or session.get("drills") or []
+        position = (session.get("progress") or {}).get("current_drill_index") or 0
+        return drills[position].get("id") if 0 <= position < len(drills) else None
+
+    def _observations(self, session: dict) -> list:
+        """(Drill, Antwort-Key, Phase, Antwort) aller Auswahlfragen der Session"""
+        module_id = session.get("module_id")
+        observations = []
+        for phase, checkin in sorted(latest_checkins(session).items()):
+            drill_id = self._recorded_drill(session, checkin)
+            mapping = self._key_map(module_id, drill_id)
+            for answer_key, answer in (checkin.get("answers") or {}).items():
+                if answer_key in mapping and answer is not None and answer != "":
+                    observations.append((drill_id, answer_key, phase, str(answer)))
+        return observations
+
+    def _add(self, session: dict):
+        observations = self._observations(session)
+        module_id = session.get("module_id")
+        fingerprint = hash((session.get("user"), self._team_of(session), module_id, session.get("drill_id"),
+                            tuple(observations)))
+        session_id = session["id"]
+        if self._fingerprints.get(session_id) == fingerprint:
+            return
+        self._drop(session_id)
+        self._fingerprints[session_id] = fingerprint
+        if not observations:
+            return
+        slot = self._slots[session_id] = len(self._alive)
+        self._alive.append(1)
+        user = self._dims["user"].code(session.get("user"))
+        team = self._dims["team"].code(self._team_of(session))
+        for drill_id, answer_key, phase, answer in observations:
+            drill, question, shift = self._key_map(module_id, drill_id)[answer_key]
+            column = self._columns.get((module_id, drill["id"], question["key"]))
+            if column is None:
+                # Reihenfolge wie im Curriculum
+                position = (list(self._index.module_drills).index((module_id, drill["id"])),
+                            drill["config"]["questions"].index(question))
+                column = self._columns[(module_id, drill["id"], question["key"])] = _Column(
+                    module_id, drill["id"], question, position)
+            column.append(slot, user, team, self._dims["phase"].code(phase), shift, column.code(answer))
+
+    @staticmethod
+    def _team_of(session: dict):
+        return session.get("observed_team") or (session.get("game_info") or {}).get("observed_team")
+
+    def _drop(self, session_id: str):
+        self._fingerprints.pop(session_id, None)
+        slot = self._slots.pop(session_id, None)
+        if slot is None:
+            return
+        self._alive[slot] = 0
+        self._dead += 1
+        if self._dead > max(1000, len(self._slots)):
+            self._compact()
+
+    def _compact(self):
+        slot_map = {old: new for new, old in enumerate(sorted(self._slots.values()))}
+        for column in self._columns.values():
+            column.keep(slot_map)
+        self._slots = {sid: slot_map[old] for sid, old in self._slots.items()}
+        self._alive = bytearray(b"\x01" * len(slot_map))
+        self._dead = 0
+
+    def update(self, session: dict):
+        """Nach dem Speichern einer Session; vor dem ersten Zugriff nichts zu tun"""
+        with self._lock:
+            if self._index is None:
+                return
+            if self._current_index() is not self._index:
+                # Neues Curriculum: beim nächsten Zugriff komplett neu aufbauen
+                self._index = None
+                return
+            self._add(session)
+
+    def remove(self, session_id: str):
+        with self._lock:
+            if self._index is not None:
+                self._drop(session_id)
+
+    def rebuild(self):
+        with self._lock:
+            self._index = None
+            self._ensure()
+
+    # --- Abfragen ---
+
+    def answers(self, module_id=None, drill_id=None, key=None, by=(), **filters) -> dict:
+        """Antwortverteilung pro Frage, optional gefiltert (user, team, phase, shift) und
+        als Kreuztabelle nach den Dimensionen in by"""
+        unknown = [dim for dim in list(by) + list(filters) if dim not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"unknown dimension: {', '.join(unknown)}")
+        with self._lock:
+            self._ensure()
+            codes = {}
+            for dim, value in filters.items():
+                if value is None:
+                    continue
+                codes[dim] = int(value) if dim == "shift" else self._dims[dim].lookup(value)
+            if any(code < 0 for code in codes.values()):
+                # Unbekannter Nutzer/Team/Phase: keine Antworten
+                return {"sessions": len(self._slots), "numpy": np is not None, "questions": []}
+            count = _count_numpy if np is not None else _count_python
+            questions = []
+            for column in sorted(self._columns.values(), key=lambda c: c.position):
+                if module_id and column.module_id != module_id:
+                    continue
+                if drill_id and column.drill_id != drill_id:
+                    continue
+                if key and column.key != key:
+                    continue
+                total, counts, tables = count(column, self._alive, codes, by)
+                if not total:
+                    continue
+                questions.append({
+                    "module_id": column.module_id,
+                    "drill_id": column.drill_id,
+                    "key": column.key,
+                    "label": column.label,
+                    "values": list(column.values),
+                    "option_count": column.option_count,
+                    "total": total,
+                    "counts": counts,
+                    "by": {dim: self._table(dim, rows) for dim, rows in tables.items()},
+                })
+            return {"sessions": len(self._slots), "numpy": np is not None, "questions": questions}
+
+    def _table(self, dim, rows: dict) -> dict:
+        """Nur Zeilen mit Antworten; Shift-Zeilen tragen die Shift-Nummer selbst"""
+        labels = sorted(rows) if dim == "shift" else sorted(rows, key=lambda c: str(self._dims[dim].values[c]))
+        return {"values": [c if dim == "shift" else self._dims[dim].values[c] for c in labels],
+                "counts": [rows[c] for c in labels]}
+
+
+def _count_numpy(column: _Column, alive: bytearray, codes: dict, by) -> tuple:
+    if not column.value:
+        return 0, [], {}
+    slot = np.frombuffer(column.slot, dtype=column.slot.typecode)
+    mask = np.frombuffer(alive, dtype=np.uint8)[slot].astype(bool)
+    for dim, code in codes.items():
+        mask &= np.frombuffer(getattr(column, dim), dtype=getattr(column, dim).typecode) == code
+    values = np.frombuffer(column.value, dtype=column.value.typecode)[mask].astype(np.int64)
+    width = len(column.values)
+    counts = np.bincount(values, minlength=width)
+    tables = {}
+    for dim in by:
+        dims = np.frombuffer(getattr(column, dim), dtype=getattr(column, dim).typecode)[mask].astype(np.int64)
+        if not dims.size:
+            tables[dim] = {}
+            continue
+        height = int(dims.max()) + 1
+        cross = np.bincount(dims * width + values, minlength=height * width).reshape(height, width)
+        tables[dim] = {int(row): cross[row].tolist() for row in np.flatnonzero(cross.sum(axis=1))}
+    return int(values.size), counts.tolist(), tables
+
+
+def _count_python(column: _Column, alive: bytearray, codes: dict, by) -> tuple:
+    rows = [i for i, s in enumerate(column.slot)
+            if alive[s] and all(getattr(column, dim)[i] == code for dim, code in codes.items())]
+    width = len(column.values)
+    counts = [0] * width
+    tables = {dim: {} for dim in by}
+    for i in rows:
+        value = column.value[i]
+        counts[value] += 1
+        for dim in by:
+            row = tables[dim].setdefault(getattr(column, dim)[i], [0] * width)
+            row[value] += 1
+    return len(rows), counts, tables
@@ -1,27 +1,186 @@
+import hashlib
 import json
+import logging
 import os
+import threading
+
+from .feedback_rules import FeedbackRules
 
 CURRICULUM_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'academy', 'curriculum.json')
 
+logger = logging.getLogger("academy.curriculum")
+
+_cache = {'stamp': None, 'curriculum': None, 'index': None}
+_cache_lock = threading.Lock()
+
+
+def drill_hash(drill):
+    """Inhalts-Hash eines Drills (kanonisches JSON), Schlüssel für Drill-Snapshots"""
+    canonical = json.dumps(drill, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:24]
+
+
+class CurriculumIndex:
+    """Lookup-Tabellen über das Curriculum, einmal pro Curriculum-Version gebaut.
+
+    Drill-IDs sind nicht global eindeutig (z.B. C1_D1 in C1 und C2), daher gibt es
+    neben dem ID-Lookup (erstes Vorkommen) auch den Lookup über (module_id, drill_id).
+    Die miniFeedback-Bedingungen aller Drills werden dabei zu FeedbackRules kompiliert;
+    ungültige Verweise landen in rule_problems (und im Log), die Gruppe passt dann nie.
+    """
+
+    def __init__(self, curriculum):
+        self.tracks = {}
+        self.modules = {}
+        self.module_track = {}
+        self.drills = {}
+        self.drill_module = {}
+        self.module_drills = {}
+        self.drill_types = {}
+        self.feedback_rules = {}
+        self.rule_problems = []
+        self._hashes = {}
+        for track in curriculum.get('tracks', []):
+            self.tracks[track['id']] = track
+            for module in track.get('modules', []):
+                self.modules.setdefault(module['id'], module)
+                self.module_track.setdefault(module['id'], track)
+                for drill in module.get('drills', []):
+                    self.module_drills[(module['id'], drill['id'])] = drill
+                    self.drills.setdefault(drill['id'], drill)
+                    self.drill_module.setdefault(drill['id'], module)
+                    self.drill_types.setdefault(drill.get('drill_type'), []).append(drill)
+                    if drill.get('miniFeedback'):
+                        rules = self.feedback_rules[(module['id'], drill['id'])] = FeedbackRules(drill)
+                        self.rule_problems.extend(rules.problems)
+        for problem in self.rule_problems:
+            level = logging.ERROR if problem["level"] == "error" else logging.WARNING
+            logger.log(level, problem["message"], extra={"event": "mini_feedback_rule", "drill_id": problem["drill_id"]})
+
+    def get_track(self, track_id):
+        return self.tracks.get(track_id)
+
+    def get_module(self, module_id):
+        return self.modules.get(module_id)
+
+    def track_of(self, module_id):
+        return self.module_track.get(module_id)
+
+    def module_of(self, drill_id):
+        return self.drill_module.get(drill_id)
+
+    def get_drill(self, drill_id, module_id=None):
+        if module_id is not None:
+            return self.module_drills.get((module_id, drill_id))
+        return self.drills.get(drill_id)
+
+    def rules_for(self, drill_id, module_id=None):
+        """Kompilierte miniFeedback-Regeln; ohne module_id die des ersten Vorkommens"""
+        if module_id is None:
+            module = self.drill_module.get(drill_id)
+            module_id = module['id'] if module else None
+        return self.feedback_rules.get((module_id, drill_id))
+
+    def hash_of(self, drill):
+        """Inhalts-Hash eines Drills aus diesem Curriculum (pro Version gecacht)"""
+        key = id(drill)
+        if key not in self._hashes:
+            self._hashes[key] = drill_hash(drill)
+        return self._hashes[key]
+
+    def drills_of_type(self, drill_type):
+        return self.drill_types.get(drill_type, [])
+
+    def resolve_drills(self, module_id, drill_id=None):
+        """Drills für eine neue Session: der gewählte Drill oder alle Drills des Moduls"""
+        module = self.modules.get(module_id)
+        if module is None:
+            return []
+        if drill_id:
+            drill = self.module_drills.get((module_id, drill_id))
+            return [drill] if drill else []
+        return module.get('drills', [])
+
+
+# Felder für Übersichten; didactics, config und miniFeedback gibt es nur im Drill selbst
+OUTLINE_TRACK_FIELDS = ('id', 'title', 'goal', 'description')
+OUTLINE_MODULE_FIELDS = ('id', 'title', 'summary', 'description', 'learningGoals', 'difficulty', 'duration')
+DRILL_SUMMARY_FIELDS = ('id', 'title', 'drill_type', 'description')
+
+
+def drill_summary(drill):
+    return {k: drill[k] for k in DRILL_SUMMARY_FIELDS if k in drill}
+
+
+def drill_questions(drill):
+    """(Antwort-Key, Frage) eines Drills; shift_tracker speichert pro Shift shift_<n>_<key>"""
+    config = drill.get('config') or {}
+    questions = [q for q in config.get('questions', []) if 'key' in q]
+    if drill.get('drill_type') == 'shift_tracker':
+        return [(f"shift_{n}_{q['key']}", q) for n in range(1, int(config.get('shift_count') or 0) + 1)
+                for q in questions]
+    return [(q['key'], q) for q in questions]
+
+
+def curriculum_outline(curriculum):
+    """Tracks und Module mit Titeln, Zusammenfassung, Schwierigkeit und Drill-Liste (ohne Inhalte)"""
+    tracks = []
+    for track in curriculum.get('tracks', []):
+        modules = []
+        for module in track.get('modules', []):
+            entry = {k: module[k] for k in OUTLINE_MODULE_FIELDS if k in module}
+            drills = module.get('drills', [])
+            entry['drill_count'] = len(drills)
+            entry['drills'] = [{k: d[k] for k in ('id', 'title', 'drill_type') if k in d} for d in drills]
+            modules.append(entry)
+        tracks.append({**{k: track[k] for k in OUTLINE_TRACK_FIELDS if k in track}, 'modules': modules})
+    return {'tracks': tracks}
+
+
+def module_detail(index, module_id):
+    """Modul mit allen Feldern, Drills aber nur als Zusammenfassung; None wenn unbekannt"""
+    module = index.get_module(module_id)
+    if module is None:
+        return None
+    detail = {k: v for k, v in module.items() if k != 'drills'}
+    detail['track_id'] = index.track_of(module_id)['id']
+    detail['drills'] = [drill_summary(d) for d in module.get('drills', [])]
+    return detail
+
+
+def _load_cached():
+    st = os.stat(CURRICULUM_PATH)
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _cache['stamp'] != stamp:
+        with _cache_lock:
+            if _cache['stamp'] != stamp:
+                with open(CURRICULUM_PATH, 'r', encoding='utf-8') as f:
+                    curriculum = json.load(f)
+                _cache['curriculum'] = curriculum
+                _cache['index'] = CurriculumIndex(curriculum)
+                _cache['stamp'] = stamp
+    return _cache
+
 def load_curriculum():
-    with open(CURRICULUM_PATH, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return _load_cached()['curriculum']
+
+def get_index():
+    return _load_cached()['index']
 
 def get_tracks():
     return load_curriculum()['tracks']
 
 def get_track(track_id):
-    tracks = get_tracks()
-    return next((t for t in tracks if t['id'] == track_id), None)
+    return get_index().get_track(track_id)
 
 def get_module(track_id, module_id):
-    track = get_track(track_id)
-    if track:
-        return next((m for m in track['modules'] if m['id'] == module_id), None)
+    index = get_index()
+    track = index.track_of(module_id)
+    if track and track['id'] == track_id:
+        return index.get_module(module_id)
     return None
 
 def get_drill(track_id, module_id, drill_id):
-    module = get_module(track_id, module_id)
-    if module:
-        return next((d for d in module['drills'] if d['id'] == drill_id), None)
-    return None
\ No newline at end of file
+    if get_module(track_id, module_id):
+        return get_index().get_drill(drill_id, module_id)
+    return None
@@ -0,0 +1,87 @@
+import json
+import os
+import threading
+
+from .curriculum import drill_hash
+
+
+class DrillSnapshotStore:
+    """Inhaltsadressierte Ablage von Drill-Versionen (<hash>.json).
+
+    Sessions speichern nur noch {"id", "hash"} je Drill. Ändert sich ein Drill im
+    Curriculum, bleibt die alte Version hier erhalten, damit historische Sessions
+    weiterhin mit dem Drill dargestellt werden, mit dem sie erfasst wurden.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._cache = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, digest):
+        return os.path.join(self.root, f"{digest}.json")
+
+    def put(self, drill, digest=None) -> str:
+        digest = digest or drill_hash(drill)
+        if digest in self._cache:
+            return digest
+        path = self._path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(drill, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(tmp, path)
+            self._cache[digest] = drill
+        return digest
+
+    def get(self, digest):
+        drill = self._cache.get(digest)
+        if drill is None:
+            try:
+                with open(self._path(digest), 'r', encoding='utf-8') as f:
+                    drill = json.load(f)
+            except FileNotFoundError:
+                return None
+            self._cache[digest] = drill
+        return drill
+
+
+def drill_refs(drills, index, snapshots: DrillSnapshotStore) -> list:
+    """Drill-Objekte in Referenzen umwandeln und ihre Version als Snapshot sichern"""
+    refs = []
+    for drill in drills:
+        digest = snapshots.put(drill, index.hash_of(drill) if index else None)
+        refs.append({"id": drill.get("id"), "hash": digest})
+    return refs
+
+
+def hydrate(session: dict, index, snapshots: DrillSnapshotStore) -> dict:
+    """Session mit aufgelösten Drills (flache Kopie); Altsessions mit eingebetteten Drills bleiben unverändert"""
+    refs = session.get("drill_refs")
+    if refs is None:
+        return session
+    module_id = session.get("module_id")
+    drills = []
+    for ref in refs:
+        current = index.get_drill(ref.get("id"), module_id) if index else None
+        if current is not None and index.hash_of(current) == ref.get("hash"):
+            drills.append(current)
+            continue
+        drill = snapshots.get(ref.get("hash")) or current
+        if drill is not None:
+            drills.append(drill)
+    return {**session, "drills": drills}
+
+
+def dehydrate(session: dict, snapshots: DrillSnapshotStore) -> bool:
+    """Eingebettete Drills einer (Alt-)Session durch Referenzen ersetzen, True wenn geändert"""
+    if "drill_refs" in session:
+        return session.pop("drills", None) is not None
+    drills = session.get("drills")
+    if not isinstance(drills, list):
+        return False
+    session["drill_refs"] = drill_refs([d for d in drills if isinstance(d, dict)], None, snapshots)
+    del session["drills"]
+    return True
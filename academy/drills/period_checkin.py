@@ -1,5 +1,7 @@
 import streamlit as st
 
+from ..feedback_rules import parse_condition
+
 def render(drill, context):
     st.subheader(drill['title'])
 
@@ -20,15 +22,5 @@ def render(drill, context):
     return responses
 
 def eval_condition(condition, responses):
-    # Simple condition evaluator
-    if '==' in condition:
-        key, value = condition.split('==')
-        key = key.strip()
-        value = value.strip().strip("'\"")
-        return responses.get(key) == value
-    elif '<=' in condition:
-        key, value = condition.split('<=')
-        key = key.strip()
-        value = int(value.strip())
-        return responses.get(key, 0) <= value
-    return False
\ No newline at end of file
+    # Bedingung wird einmal zerlegt (gecacht), danach nur noch ausgewertet
+    return parse_condition(condition)(responses)
@@ -0,0 +1,120 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+
+def normalize_value(value) -> str:
+    """Vergleichsform für Optionswerte: Groß/klein, Umlaute, _ vs. Leerzeichen egal"""
+    text = unicodedata.normalize("NFC", str(value)).casefold().translate(_UMLAUTS)
+    return re.sub(r"[\s_]+", " ", text).strip()
+
+
+class FeedbackRules:
+    """miniFeedback-Gruppen eines Drills als Prädikat-Tabellen.
+
+    Jede Gruppe ist ein Bit. Pro Fragen-Key gibt es eine Tabelle normalisierter
+    Optionswert -> Bitmaske der Gruppen, deren Bedingung für diesen Key erfüllt ist
+    (Gruppen ohne Bedingung auf dem Key sind immer enthalten). Die passenden Gruppen
+    sind das UND der Masken über die Keys: ein Dict-Lookup pro Key statt einer
+    Auswertung pro Gruppe und Bedingung.
+    """
+
+    def __init__(self, drill: dict):
+        self.drill_id = drill.get("id", "<no id>")
+        self.problems = []
+        mini_feedback = drill.get("miniFeedback") or {}
+        self.groups = list(mini_feedback.get("groups") or [])
+        self.trigger = mini_feedback.get("trigger")
+        questions = {q["key"]: q for q in (drill.get("config") or {}).get("questions", []) if "key" in q}
+
+        all_groups = (1 << len(self.groups)) - 1
+        self._valid = all_groups
+        # key -> (Maske der Gruppen ohne Bedingung auf key, {normalisierter Wert: Maske})
+        self._tables = {}
+        for bit, group in enumerate(self.groups):
+            when = group.get("when") or {}
+            if not isinstance(when, dict):
+                self._problem("error", bit, f"miniFeedback.when must be an object, got {when!r}")
+                self._valid &= ~(1 << bit)
+                continue
+            for key, value in when.items():
+                question = questions.get(key)
+                if question is None:
+                    self._problem("error", bit, f"miniFeedback.when key '{key}' not in config.questions")
+                    self._valid &= ~(1 << bit)
+                    continue
+                value = self._resolve_value(bit, key, value, question.get("options"))
+                if value is None:
+                    self._valid &= ~(1 << bit)
+                    continue
+                table = self._tables.setdefault(key, [all_groups, {}])
+                table[0] &= ~(1 << bit)
+                table[1][value] = table[1].get(value, 0) | (1 << bit)
+        # Gruppen ohne Bedingung auf key passen bei jedem Wert
+        for free, by_value in self._tables.values():
+            for value in by_value:
+                by_value[value] |= free
+
+    def _problem(self, level, bit, message):
+        self.problems.append({"level": level, "drill_id": self.drill_id, "group": bit,
+                              "message": f"Drill {self.drill_id}: {message}"})
+
+    def _resolve_value(self, bit, key, value, options):
+        normalized = normalize_value(value)
+        if not options:
+            return normalized
+        if value in options:
+            return normalized
+        matches = [o for o in options if normalize_value(o) == normalized]
+        if len(matches) == 1:
+            self._problem("warning", bit, f"miniFeedback.when value '{value}' for key '{key}' "
+                                          f"matches option '{matches[0]}' only after normalization")
+            return normalized
+        self._problem("error", bit, f"miniFeedback.when value '{value}' not in options for key '{key}' ({options})")
+        return None
+
+    def match_mask(self, answers: dict) -> int:
+        mask = self._valid
+        for key, (free, by_value) in self._tables.items():
+            answer = answers.get(key)
+            if answer is None:
+                mask &= free
+            else:
+                mask &= by_value.get(normalize_value(answer), free)
+            if not mask:
+                break
+        return mask
+
+    def match(self, answers: dict) -> list:
+        """Passende Gruppen (Index, Gruppe) in Curriculum-Reihenfolge"""
+        mask = self.match_mask(answers or {})
+        return [(i, group) for i, group in enumerate(self.groups) if mask >> i & 1]
+
+    def question_for(self, answers: dict):
+        """Erste Frage der ersten passenden Gruppe, sonst der ersten Gruppe (wie im Frontend)"""
+        for _, group in self.match(answers):
+            if group.get("questions"):
+                return group["questions"][0], False
+        if self.groups and self.groups[0].get("questions"):
+            return self.groups[0]["questions"][0], True
+        return None, True
+
+
+@lru_cache(maxsize=256)
+def parse_condition(condition: str):
+    """String-Bedingung ("key == 'wert'" bzw. "key <= 3") als Prädikat, pro String gecacht.
+
+    Nur für die einzelnen Bedingungen der Streamlit-Drills; die miniFeedback-Gruppen
+    laufen über die Masken-Tabellen von FeedbackRules.
+    """
+    if "==" in condition:
+        key, value = condition.split("==", 1)
+        key, value = key.strip(), value.strip().strip("'\"")
+        return lambda responses: responses.get(key) == value
+    if "<=" in condition:
+        key, value = condition.split("<=", 1)
+        key, value = key.strip(), int(value.strip())
+        return lambda responses: responses.get(key, 0) <= value
+    return lambda responses: False
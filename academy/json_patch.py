@@ -0,0 +1,167 @@
+import copy
+
+
+class PatchError(ValueError):
+    """Patch passt nicht auf das Dokument"""
+
+
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+def _unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+def pointer(*tokens) -> str:
+    return "".join("/" + _escape(t) for t in tokens)
+
+def parse_pointer(path: str) -> list:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer: {path!r}")
+    return [_unescape(t) for t in path[1:].split("/")]
+
+
+def diff(old, new, path: str = "") -> list:
+    """RFC 6902 Operationen, die old in new überführen (Dicts und Listen rekursiv)"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": path + pointer(key)})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": path + pointer(key), "value": value})
+            else:
+                ops.extend(diff(old[key], value, path + pointer(key)))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for i in range(common):
+            ops.extend(diff(old[i], new[i], path + pointer(i)))
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": path + pointer(i)})
+        for value in new[common:]:
+            ops.append({"op": "add", "path": path + "/-", "value": value})
+        return ops
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def _parent(doc, tokens):
+    target = doc
+    for token in tokens[:-1]:
+        if isinstance(target, list):
+            try:
+                target = target[int(token)]
+            except (ValueError, IndexError):
+                raise PatchError(f"Path not found: {pointer(*tokens)}")
+        elif isinstance(target, dict) and token in target:
+            target = target[token]
+        else:
+            raise PatchError(f"Path not found: {pointer(*tokens)}")
+    return target
+
+def _list_index(target, token, allow_end=False):
+    if allow_end and token == "-":
+        return len(target)
+    try:
+        index = int(token)
+    except ValueError:
+        raise PatchError(f"Invalid list index: {token!r}")
+    if index < 0 or index > len(target) or (index == len(target) and not allow_end):
+        raise PatchError(f"List index out of range: {index}")
+    return index
+
+def _get(doc, tokens):
+    if not tokens:
+        return doc
+    parent = _parent(doc, tokens)
+    if isinstance(parent, list):
+        return parent[_list_index(parent, tokens[-1])]
+    if isinstance(parent, dict) and tokens[-1] in parent:
+        return parent[tokens[-1]]
+    raise PatchError(f"Path not found: {pointer(*tokens)}")
+
+def _add(doc, tokens, value):
+    if not tokens:
+        return value
+    parent = _parent(doc, tokens)
+    if isinstance(parent, list):
+        parent.insert(_list_index(parent, tokens[-1], allow_end=True), value)
+    elif isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    else:
+        raise PatchError(f"Cannot add to {pointer(*tokens)}")
+    return doc
+
+def _remove(doc, tokens):
+    if not tokens:
+        raise PatchError("Cannot remove the document root")
+    parent = _parent(doc, tokens)
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, tokens[-1]))
+    if isinstance(parent, dict) and tokens[-1] in parent:
+        return parent.pop(tokens[-1])
+    raise PatchError(f"Path not found: {pointer(*tokens)}")
+
+
+def apply_patch(doc, ops: list, in_place: bool = False):
+    """RFC 6902 Patch anwenden; liefert das neue Dokument"""
+    if not in_place:
+        doc = copy.deepcopy(doc)
+    for op in ops:
+        if not isinstance(op, dict) or "op" not in op or "path" not in op:
+            raise PatchError(f"Invalid patch operation: {op!r}")
+        name = op["op"]
+        tokens = parse_pointer(op["path"])
+        if name == "add":
+            doc = _add(doc, tokens, copy.deepcopy(op.get("value")))
+        elif name == "remove":
+            _remove(doc, tokens)
+        elif name == "replace":
+            _get(doc, tokens)
+            if tokens:
+                _remove(doc, tokens)
+            doc = _add(doc, tokens, copy.deepcopy(op.get("value")))
+        elif name in ("move", "copy"):
+            if "from" not in op:
+                raise PatchError(f"Missing 'from' in {name} operation")
+            source = parse_pointer(op["from"])
+            if name == "move":
+                if tokens[:len(source)] == source and tokens != source:
+                    raise PatchError("Cannot move a value into one of its children")
+                value = _remove(doc, source)
+            else:
+                value = copy.deepcopy(_get(doc, source))
+            doc = _add(doc, tokens, value)
+        elif name == "test":
+            if _get(doc, tokens) != op.get("value"):
+                raise PatchError(f"Test failed at {op['path']}")
+        else:
+            raise PatchError(f"Unsupported patch operation: {name!r}")
+    return doc
+
+
+def merge_patch(target, patch):
+    """RFC 7396 JSON Merge Patch anwenden (null löscht, Objekte werden rekursiv gemergt)"""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def changed_paths(old, new) -> list:
+    """Pfade (JSON Pointer), an denen sich new von old unterscheidet"""
+    paths = []
+    for op in diff(old, new):
+        if op["path"] not in paths:
+            paths.append(op["path"])
+    return paths
@@ -0,0 +1,157 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monoton steigender Zähler je Label-Kombination"""
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(n, "") for n in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Gauge:
+    """Momentanwert je Label-Kombination; mit fn wird er erst beim Auslesen ermittelt"""
+
+    type = "gauge"
+
+    def __init__(self, name, help, labelnames=(), fn=None):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._fn = fn
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[tuple(labels.get(n, "") for n in self.labelnames)] = value
+
+    def samples(self):
+        if self._fn is not None:
+            yield f"{self.name} {_number(self._fn())}"
+            return
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    """Histogramm mit festen Buckets (kumulativ ausgegeben, wie Prometheus es erwartet)"""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, [('le', _number(bound))])} {cumulative}"
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, [('le', '+Inf')])} {count}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=(), fn=None):
+        return self.register(Gauge(name, help, labelnames, fn))
+
+    def histogram(self, name, help, labelnames=(), buckets=()):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """Alle Metriken im Prometheus-Textformat (Version 0.0.4)"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Datenablage: Aufrufe, Bytes und Zeit, getrennt nach Platte (io) und JSON (de)serialisierung
+STORE_CALLS = REGISTRY.counter("academy_store_calls_total", "Load/save calls in the data layer", ("backend", "op"))
+STORE_BYTES = REGISTRY.counter("academy_store_bytes_total", "Bytes read or written by the data layer", ("backend", "op"))
+STORE_SECONDS = REGISTRY.counter("academy_store_seconds_total", "Time spent in the data layer",
+                                 ("backend", "op", "phase"))
+
+
+@contextmanager
+def timed(backend: str, op: str, phase: str):
+    """Zeit eines Abschnitts (phase=io|json) auf STORE_SECONDS buchen"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STORE_SECONDS.inc(time.perf_counter() - started, backend=backend, op=op, phase=phase)
+
+
+def record_io(backend: str, op: str, nbytes: int):
+    STORE_CALLS.inc(backend=backend, op=op)
+    STORE_BYTES.inc(nbytes, backend=backend, op=op)
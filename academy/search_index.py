@@ -0,0 +1,380 @@
+import bisect
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from .curriculum import drill_questions
+from .metrics import record_io, timed
+from .session_export import PRE_QUESTIONS
+
+# Erhöhen, wenn sich Tokenisierung oder Dokumentaufbau ändern (Index wird dann neu aufgebaut)
+SEARCH_VERSION = 2
+
+_WORD = re.compile(r"\w+")
+# ä/ae/a (usw.) sollen gleich gefunden werden: Umschreibungen auf den Grundvokal falten
+_DIGRAPHS = re.compile(r"([aou])e")
+# Häufige deutsche Funktionswörter (bereits gefaltet)
+_STOPWORDS = """
+aber alle als also am an auch auf aus bei bin bis bist da dann das dass dem den der des die dies
+diese dieser doch du durch ein eine einem einen einer eines er es fuer hat hatte ich ihr im in ist
+ja kein keine man mehr mit nach nicht noch nur ob oder ohne schon sehr sein sich sie sind so ueber
+um und uns von vor war waren was weil wenn wer wie wir wird zu zum zur
+"""
+_SUFFIXES = ("ern", "em", "er", "en", "es", "e", "s", "n")
+_MIN_STEM = 4
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_CHARS = 160
+
+
+def fold(word: str) -> str:
+    """Kleinschreibung, Akzente/Umlaute entfernen, ae/oe/ue -> a/o/u, ß -> ss.
+
+    Dokument und Suchanfrage werden gleich gefaltet: Überzahl, Ueberzahl und
+    uberzahl ergeben denselben Term.
+    """
+    word = "".join(c for c in unicodedata.normalize("NFKD", word.casefold()) if not unicodedata.combining(c))
+    return _DIGRAPHS.sub(r"\1", word)
+
+
+STOPWORDS = frozenset(fold(w) for w in _STOPWORDS.split())
+
+
+def stem(word: str) -> str:
+    """Leichtes Stemming: eine häufige Flexionsendung abschneiden (Verteidigern -> verteidig)"""
+    if word.isdigit():
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM:
+            return word[:-len(suffix)]
+    return word
+
+
+def _term(word: str):
+    word = fold(word)
+    if len(word) < 2 or word in STOPWORDS:
+        return None
+    return stem(word)
+
+
+def tokenize(text: str) -> list:
+    return [t for t in (_term(w) for w in _WORD.findall(text or "")) if t]
+
+
+def _strings(value):
+    if isinstance(value, str):
+        if value.strip():
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def free_text_keys(index, module_id, drill_id) -> set:
+    """Antwort-Keys mit Freitext (Fragen ohne Optionen) der Drills einer Session, plus PRE-Fragen"""
+    keys = set(PRE_QUESTIONS)
+    if index is not None:
+        for drill in index.resolve_drills(module_id, drill_id):
+            keys.update(key for key, question in drill_questions(drill) if not question.get("options"))
+    return keys
+
+
+def session_texts(session: dict, text_keys=frozenset(PRE_QUESTIONS)) -> list:
+    """Durchsuchbare Texte einer Session als [Feld, Text]; von den Checkin-Antworten nur
+    die Freitext-Keys (Auswahlwerte wie low/high sind keine Notizen)"""
+    texts = []
+    for checkin in session.get("checkins") or []:
+        phase = checkin.get("phase") or "?"
+        for key, answer in (checkin.get("answers") or {}).items():
+            if key in text_keys:
+                for text in _strings(answer):
+                    texts.append([f"checkin:{phase}", text])
+        for key in ("feedback", "next_task"):
+            if isinstance(checkin.get(key), str) and checkin[key].strip():
+                texts.append([f"checkin:{phase}:{key}", checkin[key]])
+    post = session.get("post") or {}
+    for key in ("summary", "unclear"):
+        if isinstance(post.get(key), str) and post[key].strip():
+            texts.append([f"post:{key}", post[key]])
+    for phase, block in (session.get("microfeedback") or {}).items():
+        if isinstance(block, dict) and isinstance(block.get("text"), str) and block["text"].strip():
+            texts.append([f"microfeedback:{phase}", block["text"]])
+    note = (session.get("abort") or {}).get("note")
+    if isinstance(note, str) and note.strip():
+        texts.append(["abort:note", note])
+    return texts
+
+
+def session_document(session: dict, text_keys=frozenset(PRE_QUESTIONS)) -> dict:
+    return {"user": session.get("user"), "module_id": session.get("module_id"),
+            "created_at": session.get("created_at"), "texts": session_texts(session, text_keys)}
+
+
+class SearchIndex:
+    """Invertierter Index über Notizen und Reflexionen aller Sessions (BM25).
+
+    Pro Session werden die Texte (siehe session_texts) samt Nutzer/Modul gehalten,
+    daraus Postings Term -> {Session-ID: Häufigkeit}. Jede Änderung wird als Zeile an
+    eine JSONL-Datei angehängt (wie das Session-Journal) und ab einer gewissen Länge
+    zu einer Zeile pro Session kompaktiert. Beim ersten Zugriff wird die Datei
+    eingelesen und mit den IDs im Store abgeglichen; fehlende Sessions werden
+    nachindiziert. Änderungen anderer Prozesse sieht der Index erst nach rebuild().
+    Welche Checkin-Antworten Freitext sind, ergibt sich aus dem Curriculum (index_fn).
+    """
+
+    def __init__(self, path: str, store, index_fn=None):
+        self.path = path
+        self.store = store
+        self.index_fn = index_fn
+        self._text_keys = (None, {})
+        self._docs = None
+        self._postings = {}
+        self._lengths = {}
+        self._total_length = 0
+        self._terms = None
+        self._log_lines = 0
+        self._lock = threading.RLock()
+
+    # --- Aufbau und Persistenz ---
+
+    def _ensure(self):
+        if self._docs is not None:
+            return
+        self._docs = {}
+        self._postings, self._lengths, self._total_length = {}, {}, 0
+        self._log_lines = 0
+        valid = self._load_file()
+        known = set(self.store.ids())
+        changed = False
+        for session_id in list(self._docs):
+            if session_id not in known:
+                self._remove_doc(session_id)
+                changed = True
+        for session_id in known - set(self._docs):
+            session = self.store.load(session_id)
+            if session is not None:
+                self._add_doc(session_id, self._document(session))
+                changed = True
+        if changed or not valid or self._log_lines > len(self._docs):
+            self._compact()
+
+    def _load_file(self) -> bool:
+        """Datei einlesen; False, wenn sie fehlt oder eine andere Version hat"""
+        try:
+            with timed("search", "load", "io"):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    lines = f.readlines()
+        except FileNotFoundError:
+            return False
+        record_io("search", "load", sum(len(line) for line in lines))
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            return False
+        if header.get("version") != SEARCH_VERSION:
+            return False
+        with timed("search", "load", "json"):
+            for line in lines[1:]:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Abgebrochene letzte Zeile (Crash beim Anhängen)
+                    break
+                self._log_lines += 1
+                if entry.get("deleted"):
+                    self._remove_doc(entry["id"])
+                else:
+                    self._add_doc(entry["id"], entry["doc"])
+        return True
+
+    def _append(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with timed("search", "append", "io"):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        record_io("search", "append", len(line))
+        self._log_lines += 1
+        if self._log_lines > max(100, 2 * len(self._docs)):
+            self._compact()
+
+    def _compact(self):
+        tmp = self.path + ".tmp"
+        lines = [json.dumps({"version": SEARCH_VERSION})]
+        lines.extend(json.dumps({"id": sid, "doc": doc}, ensure_ascii=False, separators=(",", ":"))
+                     for sid, doc in self._docs.items())
+        raw = ("\n".join(lines) + "\n").encode("utf-8")
+        with timed("search", "save", "io"):
+            with open(tmp, "wb") as f:
+                f.write(raw)
+            os.replace(tmp, self.path)
+        record_io("search", "save", len(raw))
+        self._log_lines = len(self._docs)
+
+    def rebuild(self):
+        """Index komplett aus dem Store neu aufbauen"""
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self._docs = None
+            self._terms = None
+            self._ensure()
+
+    # --- Dokumente ---
+
+    def _document(self, session):
+        try:
+            index = self.index_fn() if self.index_fn is not None else None
+        except FileNotFoundError:
+            index = None
+        if self._text_keys[0] is not index:
+            self._text_keys = (index, {})
+        cache_key = (session.get("module_id"), session.get("drill_id"))
+        keys = self._text_keys[1].get(cache_key)
+        if keys is None:
+            keys = self._text_keys[1][cache_key] = free_text_keys(index, *cache_key)
+        return session_document(session, keys)
+
+    def _add_doc(self, session_id, doc):
+        if session_id in self._docs:
+            self._remove_doc(session_id)
+        counts = Counter(t for _, text in doc["texts"] for t in tokenize(text))
+        self._docs[session_id] = doc
+        self._lengths[session_id] = sum(counts.values())
+        self._total_length += self._lengths[session_id]
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._terms = None
+            postings[session_id] = tf
+
+    def _remove_doc(self, session_id):
+        doc = self._docs.pop(session_id, None)
+        if doc is None:
+            return
+        self._total_length -= self._lengths.pop(session_id, 0)
+        for term in set(t for _, text in doc["texts"] for t in tokenize(text)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(session_id, None)
+                if not postings:
+                    del self._postings[term]
+                    self._terms = None
+
+    def update(self, session: dict):
+        """Nach dem Speichern einer Session; schreibt nur, wenn sich Texte oder Metadaten geändert haben"""
+        with self._lock:
+            self._ensure()
+            doc = self._document(session)
+            if self._docs.get(session["id"]) == doc:
+                return
+            self._add_doc(session["id"], doc)
+            self._append({"id": session["id"], "doc": doc})
+
+    def remove(self, session_id: str):
+        with self._lock:
+            self._ensure()
+            if session_id not in self._docs:
+                return
+            self._remove_doc(session_id)
+            self._append({"id": session_id, "deleted": True})
+
+    # --- Suche ---
+
+    def _expand(self, prefix):
+        """Alle Terme mit diesem Präfix (für das zuletzt getippte Wort)"""
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        start = bisect.bisect_left(self._terms, prefix)
+        result = []
+        for term in self._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            result.append(term)
+        return result
+
+    def search(self, q: str, user=None, module_id=None, limit=20, prefix=True) -> dict:
+        """Sessions, die alle Suchbegriffe enthalten, nach BM25 sortiert, mit Textausschnitt.
+
+        Das letzte Wort zählt (prefix=True) auch als Präfix, damit Suche beim Tippen funktioniert.
+        """
+        with self._lock:
+            self._ensure()
+            words = [fold(w) for w in _WORD.findall(q or "")]
+            words = [w for w in words if len(w) >= 2 and w not in STOPWORDS]
+            if not words:
+                return {"total": 0, "results": []}
+            groups = [[stem(w)] for w in words]
+            if prefix:
+                groups[-1] = sorted(set(groups[-1] + self._expand(words[-1])))
+            n_docs = len(self._docs) or 1
+            avg_length = (self._total_length / n_docs) or 1
+            scores = None
+            for terms in groups:
+                group_scores = {}
+                for term in terms:
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for session_id, tf in postings.items():
+                        norm = tf * (BM25_K1 + 1) / (
+                            tf + BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[session_id] / avg_length))
+                        group_scores[session_id] = max(group_scores.get(session_id, 0.0), idf * norm)
+                if scores is None:
+                    scores = group_scores
+                else:
+                    scores = {sid: s + group_scores[sid] for sid, s in scores.items() if sid in group_scores}
+                if not scores:
+                    return {"total": 0, "results": []}
+            hits = []
+            for session_id, score in scores.items():
+                doc = self._docs[session_id]
+                if user and doc.get("user") != user:
+                    continue
+                if module_id and doc.get("module_id") != module_id:
+                    continue
+                hits.append((score, doc.get("created_at") or "", session_id))
+            hits.sort(reverse=True)
+            wanted = {t for terms in groups for t in terms}
+            results = []
+            for score, _, session_id in hits[:limit] if limit else hits:
+                doc = self._docs[session_id]
+                field, snippet, highlights = _snippet(doc["texts"], wanted)
+                results.append({"id": session_id, "score": round(score, 4), "user": doc.get("user"),
+                                "module_id": doc.get("module_id"), "created_at": doc.get("created_at"),
+                                "field": field, "snippet": snippet, "highlights": highlights})
+            return {"total": len(hits), "results": results}
+
+
+def _snippet(texts, wanted):
+    """Ausschnitt um den ersten Treffer im Text mit den meisten Treffern; highlights als [start, ende]"""
+    best = None
+    for field, text in texts:
+        spans = [m.span() for m in _WORD.finditer(text) if _term(m.group()) in wanted]
+        if spans and (best is None or len(spans) > len(best[2])):
+            best = (field, text, spans)
+    if best is None:
+        field, text = texts[0] if texts else (None, "")
+        return field, text[:SNIPPET_CHARS], []
+    field, text, spans = best
+    start = max(0, spans[0][0] - SNIPPET_CHARS // 3)
+    if start:
+        space = text.rfind(" ", 0, start)
+        start = space + 1 if space != -1 and start - space < 20 else start
+    end = min(len(text), start + SNIPPET_CHARS)
+    prefix = "…" if start else ""
+    snippet = prefix + text[start:end] + ("…" if end < len(text) else "")
+    offset = len(prefix) - start
+    highlights = [[s + offset, e + offset] for s, e in spans if s >= start and e <= end]
+    return field, snippet, highlights
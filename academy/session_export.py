@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+
+from .curriculum import drill_questions
+
+# Sessions werden seitenweise aus dem Index gelesen und einzeln geladen: der Speicherbedarf
+# hängt nicht von der Datenmenge ab. Ausgabe in Blöcken von etwa EXPORT_CHUNK Bytes.
+EXPORT_BATCH = 200
+EXPORT_CHUNK = 64 * 1024
+
+CHECKIN_PHASES = ("PRE", "P1", "P2", "P3", "POST")
+# PRE-Fragen stellt das Frontend selbst (nicht aus dem Curriculum)
+PRE_QUESTIONS = ("expectations",)
+DRILL_PHASES = ("P1", "P2", "P3")
+
+BASE_COLUMNS = (
+    "id", "user", "created_by", "state", "module_id", "drill_id", "created_at", "ended_at",
+    "current_phase", "revision", "observed_team", "game.league", "game.team_home", "game.team_away",
+    "game.date", "goal", "confidence", "focus", "session_method", "helpfulness", "abort_reason",
+)
+EXTRA_COLUMN = "extra_answers"
+
+
+def iter_sessions(store, batch: int = EXPORT_BATCH, **filters):
+    """Sessions (gespeicherte Form) nach created_at aufsteigend, seitenweise über store.query"""
+    cursor = None
+    while True:
+        entries = store.query(order="asc", cursor=cursor, limit=batch, **filters)
+        for entry in entries:
+            session = store.load(entry["id"])
+            if session is not None:
+                yield session
+        if len(entries) < batch:
+            return
+        cursor = (entries[-1].get("created_at") or "", entries[-1]["id"])
+
+
+def answer_columns(drills) -> list:
+    """Antwort-Spalten <phase>.<key>: PRE-Fragen, dann die Drill-Fragen je Drittel"""
+    keys = {}
+    for drill in drills:
+        for key, _ in drill_questions(drill):
+            keys.setdefault(key, None)
+    return [f"PRE.{key}" for key in PRE_QUESTIONS] + [f"{phase}.{key}" for phase in DRILL_PHASES for key in keys]
+
+
+def csv_columns(drills) -> list:
+    return list(BASE_COLUMNS) + answer_columns(drills) + [EXTRA_COLUMN]
+
+
+def latest_checkins(session: dict) -> dict:
+    """Checkin pro Phase; bei doppelten Checkins gilt der neueste"""
+    latest = {}
+    for checkin in session.get("checkins") or []:
+        phase = (checkin.get("phase") or "").strip().upper()
+        if phase not in latest or (checkin.get("timestamp") or "") > (latest[phase].get("timestamp") or ""):
+            latest[phase] = checkin
+    return latest
+
+
+def latest_answers(session: dict) -> dict:
+    """Antworten pro Phase; bei doppelten Checkins gilt der neueste"""
+    return {phase: checkin.get("answers") or {} for phase, checkin in latest_checkins(session).items()}
+
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return value
+
+
+def session_row(session: dict, columns: set) -> dict:
+    """Eine CSV-Zeile; Antworten ohne eigene Spalte landen als JSON in extra_answers"""
+    game = session.get("game_info") or {}
+    post = session.get("post") or {}
+    abort = session.get("abort") or {}
+    row = {column: _cell(session.get(column)) for column in BASE_COLUMNS if "." not in column}
+    row["created_by"] = row["created_by"] or session.get("user")
+    row["ended_at"] = post.get("completed_at") or abort.get("aborted_at")
+    row["observed_team"] = session.get("observed_team") or game.get("observed_team")
+    for field in ("league", "team_home", "team_away", "date"):
+        row[f"game.{field}"] = _cell(game.get(field))
+    row["helpfulness"] = post.get("helpfulness")
+    row["abort_reason"] = abort.get("reason")
+    extra = {}
+    for phase, answers in latest_answers(session).items():
+        for key, value in answers.items():
+            column = f"{phase}.{key}"
+            if column in columns:
+                row[column] = _cell(value)
+            else:
+                extra.setdefault(phase, {})[key] = value
+    row[EXTRA_COLUMN] = _cell(extra) if extra else None
+    return row
+
+
+def _chunked(pieces, first_now: bool = True):
+    """Stücke zu Blöcken zusammenfassen; das erste geht sofort raus"""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= EXPORT_CHUNK or first_now:
+            first_now = False
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_ndjson(sessions):
+    """Eine Session pro Zeile"""
+    return _chunked(json.dumps(s, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                    for s in sessions)
+
+
+def iter_csv(sessions, columns: list):
+    """Kopfzeile sofort, danach die Zeilen in Blöcken"""
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    yield out.getvalue().encode("utf-8")
+    wanted = set(columns)
+
+    def rows():
+        for session in sessions:
+            out.seek(0)
+            out.truncate()
+            writer.writerow(session_row(session, wanted))
+            yield out.getvalue().encode("utf-8")
+
+    yield from _chunked(rows(), first_now=False)
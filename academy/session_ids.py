@@ -0,0 +1,61 @@
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+# ULID: 48 Bit Millisekunden + 80 Bit Zufall, Crockford-Base32 (26 Zeichen, lexikografisch = zeitlich sortiert)
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ULID = re.compile(r"^[0-9A-HJKMNP-TV-Z]{26}$")
+# Altbestand: <user>_<unix-ts> (Backend) bzw. <yyyymmdd>_<user>_<drill>_<unix-ts> (academy.sessions)
+_LEGACY_TS = re.compile(r"_(\d{9,11})$")
+
+_lock = threading.Lock()
+_last = (0, 0)
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, rem = divmod(value, 32)
+        chars.append(_ALPHABET[rem])
+    return "".join(reversed(chars))
+
+
+def new_session_id(now_ms: Optional[int] = None) -> str:
+    """Neue, zeitlich sortierbare Session-ID (ULID).
+
+    Innerhalb derselben Millisekunde wird der Zufallsteil hochgezählt, IDs aus
+    einem Prozess sind also streng monoton und kollidieren nicht.
+    """
+    global _last
+    ms = int(time.time() * 1000) if now_ms is None else now_ms
+    with _lock:
+        last_ms, last_rand = _last
+        if ms <= last_ms:
+            ms, rand = last_ms, last_rand + 1
+            if rand >> 80:
+                # Zufallsteil erschöpft (praktisch unmöglich): in die nächste Millisekunde
+                ms, rand = ms + 1, int.from_bytes(os.urandom(10), "big")
+        else:
+            rand = int.from_bytes(os.urandom(10), "big")
+        _last = (ms, rand)
+    return _encode(ms, 10) + _encode(rand, 16)
+
+
+def is_ulid(session_id: str) -> bool:
+    return bool(_ULID.match(session_id or ""))
+
+
+def id_timestamp(session_id: str) -> Optional[datetime]:
+    """Erzeugungszeit aus der ID (ULID oder Altbestand mit Unix-Zeitstempel am Ende), sonst None"""
+    if is_ulid(session_id):
+        ms = 0
+        for char in session_id[:10]:
+            ms = ms * 32 + _ALPHABET.index(char)
+        return datetime.fromtimestamp(ms / 1000, timezone.utc)
+    match = _LEGACY_TS.search(session_id or "")
+    if match:
+        return datetime.fromtimestamp(int(match.group(1)), timezone.utc)
+    return None
@@ -0,0 +1,199 @@
+import threading
+from collections import Counter
+
+FINISHED_STATES = ("COMPLETED", "ABORTED")
+
+
+def _contribution(summary):
+    """Der Teil einer Session-Summary, der in die Aggregate eingeht (None = keine Session)"""
+    if summary is None:
+        return None
+    activity = max(filter(None, (summary.get("created_at"), summary.get("ended_at"))), default=None)
+    return (
+        summary.get("user"), summary.get("state"), summary.get("module_id"), summary.get("drill_id"),
+        summary.get("confidence"), summary.get("helpfulness"), activity, summary.get("id"),
+        summary.get("created_at"), summary.get("abort_reason"),
+    )
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+class _UserAggregate:
+    """Rohsummen eines Nutzers; Durchschnitte werden erst bei der Ausgabe gebildet"""
+
+    def __init__(self):
+        self.total = 0
+        self.by_state = Counter()
+        self.modules = {}
+        self.completed_drills = Counter()
+        self.completed_modules = Counter()
+        self.confidence = [0, 0]
+        self.helpfulness = [0, 0]
+        self.last_activity = None
+
+    def apply(self, part, sign):
+        _, state, module_id, drill_id, confidence, helpfulness, activity, session_id, created_at, abort_reason = part
+        self.total += sign
+        self.by_state[state or "UNKNOWN"] += sign
+        module = self.modules.setdefault(module_id, {"by_state": Counter(), "last": None})
+        module["by_state"][state or "UNKNOWN"] += sign
+        if state == "COMPLETED":
+            # Modulweite Sessions (ohne drill_id) zählen nur beim Modul
+            self.completed_modules[module_id] += sign
+            if drill_id:
+                self.completed_drills[drill_id] += sign
+        for bucket, value in ((self.confidence, _number(confidence)), (self.helpfulness, _number(helpfulness))):
+            if value is not None:
+                bucket[0] += sign * value
+                bucket[1] += sign
+        if sign > 0 and activity:
+            if self.last_activity is None or activity > self.last_activity:
+                self.last_activity = activity
+            if module["last"] is None or (activity, session_id) >= module["last"][:2]:
+                module["last"] = (activity, session_id, state, created_at, abort_reason)
+
+
+class SessionStats:
+    """Materialisierte Aggregate pro Nutzer, bei jedem Schreiben/Löschen inkrementell angepasst.
+
+    Änderungen anderer Prozesse (Streamlit) werden erst nach reset() berücksichtigt.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._users = None
+        # Session-ID -> gezählter Beitrag; beim Update wird dieser abgezogen, nicht der gemeldete alte Stand
+        self._parts = {}
+        self._stale = set()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self._users = None
+            self._parts = {}
+            self._stale.clear()
+
+    def _ensure(self):
+        """Aggregate (neu) aufbauen; nur unter self._lock aufrufen, wie update()"""
+        if self._users is None:
+            users, parts = {}, {}
+            for summary in self.store.query(order="asc"):
+                part = parts[summary["id"]] = _contribution(summary)
+                users.setdefault(part[0], _UserAggregate()).apply(part, 1)
+            self._users, self._parts = users, parts
+        for user in list(self._stale):
+            aggregate = _UserAggregate()
+            for summary in self.store.query(user=user, order="asc"):
+                part = self._parts[summary["id"]] = _contribution(summary)
+                aggregate.apply(part, 1)
+            self._users[user] = aggregate
+            self._stale.discard(user)
+
+    def update(self, old_summary, new_summary):
+        """Beitrag einer Session ersetzen; old/new sind Summaries oder None (Anlegen/Löschen)"""
+        if _contribution(old_summary) == _contribution(new_summary):
+            return
+        session_id = (new_summary or old_summary)["id"]
+        new = _contribution(new_summary)
+        with self._lock:
+            if self._users is None:
+                return
+            old = self._parts.get(session_id)
+            if old == new:
+                # Schon gezählt (Aufbau hat den neuen Stand bereits gelesen)
+                return
+            if new is None:
+                self._parts.pop(session_id, None)
+            else:
+                self._parts[session_id] = new
+            if old is not None and old[0] not in self._stale:
+                aggregate = self._users.get(old[0])
+                if aggregate is not None:
+                    aggregate.apply(old, -1)
+                    # Maxima lassen sich nicht zurückrechnen -> Nutzer neu aufbauen,
+                    # außer die Session bleibt (gleicher Nutzer/Modul) und wird nur jünger
+                    kept = new is not None and new[0] == old[0] and new[2] == old[2] and (new[6] or "") >= (old[6] or "")
+                    module_last = (aggregate.modules.get(old[2]) or {}).get("last")
+                    if not kept and old[6] and (old[6] == aggregate.last_activity or
+                                                (module_last and module_last[1] == old[7])):
+                        self._stale.add(old[0])
+            if new is not None and new[0] not in self._stale:
+                self._users.setdefault(new[0], _UserAggregate()).apply(new, 1)
+
+    def _aggregates(self, user=None):
+        with self._lock:
+            self._ensure()
+            if user is not None:
+                aggregate = self._users.get(user)
+                return [aggregate] if aggregate else []
+            return list(self._users.values())
+
+    def stats(self, user=None) -> dict:
+        aggregates = self._aggregates(user)
+        by_state, drills, modules = Counter(), Counter(), Counter()
+        confidence, helpfulness = [0, 0], [0, 0]
+        last_activity = None
+        for a in aggregates:
+            by_state.update(a.by_state)
+            drills.update(a.completed_drills)
+            modules.update(a.completed_modules)
+            for total, part in ((confidence, a.confidence), (helpfulness, a.helpfulness)):
+                total[0] += part[0]
+                total[1] += part[1]
+            if a.last_activity and (last_activity is None or a.last_activity > last_activity):
+                last_activity = a.last_activity
+        total = sum(a.total for a in aggregates)
+        finished = sum(by_state[s] for s in FINISHED_STATES)
+        return {
+            "user": user,
+            "total": total,
+            "completed": by_state["COMPLETED"],
+            "aborted": by_state["ABORTED"],
+            "active": total - finished,
+            "by_state": {k: v for k, v in by_state.items() if v},
+            "last_activity": last_activity,
+            "completed_drills": sorted(d for d, n in drills.items() if n > 0),
+            "completed_by_module": {m: n for m, n in sorted(modules.items(), key=lambda i: str(i[0])) if n > 0},
+            "avg_confidence": round(confidence[0] / confidence[1], 2) if confidence[1] else None,
+            "avg_helpfulness": round(helpfulness[0] / helpfulness[1], 2) if helpfulness[1] else None,
+        }
+
+    def progress(self, user=None, track_of=None) -> dict:
+        """Fortschritt je Modul und (über track_of(module_id)) je Track"""
+        modules = {}
+        for a in self._aggregates(user):
+            for module_id, data in a.modules.items():
+                entry = modules.setdefault(module_id, {"by_state": Counter(), "last": None})
+                entry["by_state"].update(data["by_state"])
+                if data["last"] and (entry["last"] is None or data["last"][:2] > entry["last"][:2]):
+                    entry["last"] = data["last"]
+
+        result_modules, tracks = {}, {}
+        for module_id, entry in modules.items():
+            counts = entry["by_state"]
+            total = sum(counts.values())
+            if total <= 0:
+                continue
+            last = entry["last"]
+            item = {
+                "total": total,
+                "completed": counts["COMPLETED"],
+                "aborted": counts["ABORTED"],
+                "active": total - sum(counts[s] for s in FINISHED_STATES),
+                "last_activity": last[0] if last else None,
+                "last_session": {"id": last[1], "state": last[2], "created_at": last[3],
+                                 "abort_reason": last[4]} if last else None,
+            }
+            result_modules[module_id] = item
+            track_id = track_of(module_id) if track_of else None
+            if track_id:
+                track = tracks.setdefault(track_id, {"total": 0, "completed": 0, "aborted": 0, "active": 0,
+                                                     "modules": 0, "last_activity": None})
+                for key in ("total", "completed", "aborted", "active"):
+                    track[key] += item[key]
+                track["modules"] += 1
+                if item["last_activity"] and (track["last_activity"] is None or item["last_activity"] > track["last_activity"]):
+                    track["last_activity"] = item["last_activity"]
+        return {"user": user, "modules": result_modules, "tracks": tracks}
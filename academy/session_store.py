@@ -0,0 +1,840 @@
+import copy
+import glob
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional
+
+from .json_patch import apply_patch, diff
+from .metrics import record_io, timed
+from .session_ids import id_timestamp, is_ulid
+
+try:
+    import fcntl  # nur POSIX; ohne fcntl gelten nur die prozessinternen Locks
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger("academy.store")
+
+# ACADEMY_DATA_DIR erlaubt eine andere Datenablage (z.B. temporäre Kopie für Benchmarks)
+DATA_DIR = os.environ.get("ACADEMY_DATA_DIR") or os.path.join(os.path.dirname(__file__), '..', 'data', 'academy')
+
+# Auswahl des Backends: ACADEMY_SESSION_STORE=json (Default) oder sqlite
+SESSION_STORE = os.environ.get("ACADEMY_SESSION_STORE", "json")
+SQLITE_FILE = os.environ.get("ACADEMY_SQLITE_PATH")
+# Journal-Modus für den JSON-Store: Änderungen als Patch-Zeilen anhängen statt Datei neu schreiben
+SESSION_JOURNAL = os.environ.get("ACADEMY_SESSION_JOURNAL", "0") == "1"
+JOURNAL_COMPACT_AFTER = int(os.environ.get("ACADEMY_JOURNAL_COMPACT_AFTER", "50"))
+# fsync nach jedem Schreiben (JSON) bzw. synchronous=FULL (SQLite)
+SESSION_FSYNC = os.environ.get("ACADEMY_SESSION_FSYNC", "0") == "1"
+# Write-Behind: geänderte Sessions im Speicher sammeln und gebündelt schreiben (opt-in)
+WRITE_BEHIND = os.environ.get("ACADEMY_WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_INTERVAL = float(os.environ.get("ACADEMY_WRITE_BEHIND_INTERVAL", "2.0"))
+WRITE_BEHIND_MAX_DIRTY = int(os.environ.get("ACADEMY_WRITE_BEHIND_MAX_DIRTY", "20"))
+
+
+class SessionStore(ABC):
+    """Schnittstelle für die Session-Ablage. Die API sieht nur diese Methoden."""
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[dict]:
+        """Session laden, None wenn sie nicht existiert"""
+
+    @abstractmethod
+    def save(self, session: dict, base: Optional[dict] = None) -> None:
+        """Session unter session['id'] anlegen oder überschreiben.
+
+        base ist optional der zuletzt geladene Stand; Stores mit Journal schreiben dann nur die Differenz.
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Session löschen, False wenn sie nicht existiert"""
+
+    @abstractmethod
+    def list(self, user=None, state=None, module_id=None) -> list:
+        """Sessions filtern (alle Filter optional)"""
+
+    @abstractmethod
+    def ids(self) -> list:
+        """Alle Session-IDs (für Migrationen)"""
+
+    @abstractmethod
+    def query(self, user=None, state=None, module_id=None, since=None, until=None,
+              order="desc", cursor=None, limit=None) -> list:
+        """Summaries (siehe summarize) nach (created_at, id) sortiert, ab cursor, max. limit"""
+
+
+# Felder, die ohne Laden des Dokuments verfügbar sind (Listen, History, Dashboard)
+_PLAIN_SUMMARY_FIELDS = (
+    "id", "user", "created_by", "state", "module_id", "drill_id", "created_at", "current_phase",
+    "game_info", "observed_team", "goal", "confidence",
+)
+SUMMARY_FIELDS = _PLAIN_SUMMARY_FIELDS + ("checkin_phases", "microfeedback_done", "helpfulness", "ended_at", "abort_reason")
+# Erhöhen, wenn sich summarize() ändert (Index und SQLite-Summaries werden dann neu berechnet)
+SUMMARY_VERSION = 3
+
+
+def summarize(session: dict) -> dict:
+    """Kompakte Zusammenfassung einer Session (ohne Drills, Drafts, Antworten)"""
+    summary = {field: session.get(field) for field in _PLAIN_SUMMARY_FIELDS}
+    summary["created_by"] = summary["created_by"] or session.get("user", "Unbekannt")
+    summary["checkin_phases"] = [c.get("phase") for c in session.get("checkins") or []]
+    summary["microfeedback_done"] = [p for p, mf in (session.get("microfeedback") or {}).items() if mf.get("done")]
+    summary["helpfulness"] = (session.get("post") or {}).get("helpfulness")
+    abort = session.get("abort") or {}
+    summary["ended_at"] = (session.get("post") or {}).get("completed_at") or abort.get("aborted_at")
+    summary["abort_reason"] = abort.get("reason")
+    return summary
+
+
+def _matches(session, user=None, state=None, module_id=None, since=None, until=None):
+    if user and session.get('user') != user:
+        return False
+    if state and session.get('state') != state:
+        return False
+    if module_id and session.get('module_id') != module_id:
+        return False
+    created_at = session.get('created_at') or ""
+    if since and created_at < since:
+        return False
+    if until and created_at > until:
+        return False
+    return True
+
+
+def _sort_key(entry):
+    return (entry.get("created_at") or "", entry.get("id") or "")
+
+
+class SessionIndex:
+    """Metadaten aller Session-Dateien, damit Filter keine Datei öffnen müssen.
+
+    Liegt als JSONL neben dem sessions-Ordner: Kopfzeile mit Version, danach eine
+    Zeile pro Änderung ({"id", "entry"} bzw. {"id", "deleted"}). Ein Schreibvorgang
+    hängt also nur eine Zeile an, unabhängig von der Zahl der Sessions; ab einer
+    gewissen Länge wird zu einer Zeile pro Session kompaktiert. Vor jedem Zugriff
+    werden neue Zeilen anderer Prozesse (Backend/Streamlit) nachgelesen, nach einer
+    Kompaktierung durch den anderen Prozess (neue Datei) die ganze Datei.
+    refresh() gleicht beim Start per mtime/Größe mit den Dateien ab und parst nur
+    neue oder geänderte Sessions. Einträge sind summarize() + mtime/size. Ändert ein
+    Schreibvorgang nur mtime/size (z.B. Draft-Autosave), wird nichts angehängt;
+    refresh() holt das beim nächsten Start nach.
+    """
+
+    VERSION = SUMMARY_VERSION
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.RLock()
+        self._inode = None
+        self._offset = 0
+        self._log_lines = 0
+        self._valid = self._reload()
+
+    def _reload(self) -> bool:
+        """Datei komplett einlesen; False, wenn sie fehlt oder eine andere Version hat"""
+        self.entries, self._inode, self._offset, self._log_lines = {}, None, 0, 0
+        try:
+            with timed("index", "load", "io"):
+                with open(self.path, 'rb') as f:
+                    inode = os.fstat(f.fileno()).st_ino
+                    raw = f.read()
+        except FileNotFoundError:
+            return False
+        record_io("index", "load", len(raw))
+        header, _, rest = raw.partition(b"\n")
+        try:
+            if json.loads(header).get("version") != self.VERSION:
+                return False
+        except ValueError:
+            return False
+        self._inode = inode
+        self._offset = len(header) + 1
+        self._apply(rest)
+        return True
+
+    def _apply(self, raw: bytes):
+        """Vollständige Zeilen anwenden; eine unvollständige letzte Zeile bleibt für später"""
+        end = raw.rfind(b"\n") + 1
+        with timed("index", "load", "json"):
+            for line in raw[:end].splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._log_lines += 1
+                if record.get("deleted"):
+                    self.entries.pop(record["id"], None)
+                else:
+                    self.entries[record["id"]] = record["entry"]
+        self._offset += end
+
+    def sync(self):
+        """Zeilen nachlesen, die ein anderer Prozess seit dem letzten Zugriff angehängt hat"""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                self._valid = self._reload()
+            elif st.st_size > self._offset:
+                with open(self.path, 'rb') as f:
+                    f.seek(self._offset)
+                    raw = f.read()
+                record_io("index", "load", len(raw))
+                self._apply(raw)
+
+    def _append(self, record: dict):
+        if not self._valid:
+            self._compact()
+            return
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode('utf-8')
+        with timed("index", "append", "io"):
+            with open(self.path, 'ab') as f:
+                f.write(line)
+                end = f.tell()
+        record_io("index", "append", len(line))
+        self._log_lines += 1
+        if end - len(line) == self._offset:
+            # Niemand hat dazwischen angehängt: eigene Zeile nicht erneut lesen
+            self._offset = end
+        if self._log_lines > max(100, 2 * len(self.entries)):
+            self._compact()
+
+    def _compact(self):
+        tmp = self.path + ".tmp"
+        with timed("index", "save", "json"):
+            lines = [json.dumps({"version": self.VERSION})]
+            lines.extend(json.dumps({"id": sid, "entry": entry}, ensure_ascii=False, separators=(",", ":"))
+                         for sid, entry in self.entries.items())
+            raw = ("\n".join(lines) + "\n").encode('utf-8')
+        with timed("index", "save", "io"):
+            with open(tmp, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp, self.path)
+        record_io("index", "save", len(raw))
+        self._inode = os.stat(self.path).st_ino
+        self._offset = len(raw)
+        self._log_lines = len(self.entries)
+        self._valid = True
+
+    @staticmethod
+    def entry_for(session, stamp):
+        entry = summarize(session)
+        entry["mtime"], entry["size"] = stamp
+        return entry
+
+    def put(self, session, stamp):
+        entry = self.entry_for(session, stamp)
+        with self._lock:
+            self.sync()
+            old = self.entries.get(session["id"])
+            self.entries[session["id"]] = entry
+            if old is None or {**old, "mtime": None, "size": None} != {**entry, "mtime": None, "size": None}:
+                self._append({"id": session["id"], "entry": entry})
+
+    def remove(self, session_id):
+        with self._lock:
+            self.sync()
+            if self.entries.pop(session_id, None) is not None:
+                self._append({"id": session_id, "deleted": True})
+
+    def ids(self) -> list:
+        with self._lock:
+            self.sync()
+            return list(self.entries)
+
+    def refresh(self, ids, stat, load):
+        """Index mit den vorhandenen Sessions abgleichen; stat(id) -> (mtime, size), load(id) -> Session"""
+        changed = False
+        ids = set(ids)
+        with self._lock:
+            self.sync()
+            for session_id in list(self.entries):
+                if session_id not in ids:
+                    del self.entries[session_id]
+                    changed = True
+            for session_id in ids:
+                stamp = stat(session_id)
+                if stamp is None:
+                    continue
+                entry = self.entries.get(session_id)
+                if entry and (entry.get("mtime"), entry.get("size")) == stamp:
+                    continue
+                session = load(session_id)
+                if session is None:
+                    continue
+                session.setdefault("id", session_id)
+                self.entries[session_id] = self.entry_for(session, stamp)
+                changed = True
+            if changed or not self._valid:
+                self._compact()
+        return changed
+
+    def query(self, user=None, state=None, module_id=None, since=None, until=None,
+              order="desc", cursor=None, limit=None):
+        with self._lock:
+            self.sync()
+            rows = [e for e in self.entries.values() if _matches(e, user, state, module_id, since, until)]
+        reverse = order == "desc"
+        rows.sort(key=_sort_key, reverse=reverse)
+        if cursor:
+            cursor = tuple(cursor)
+            rows = [e for e in rows if (_sort_key(e) < cursor if reverse else _sort_key(e) > cursor)]
+        return rows[:limit] if limit else rows
+
+
+def _shard_name(user) -> str:
+    """Dateisystem-tauglicher Ordnername für einen Nutzer"""
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(user or "")).lstrip(".")
+    return name or "_"
+
+
+def shard_of(session: dict) -> str:
+    """Relativer Shard-Ordner <user>/<yyyy-mm> (Monat aus der ID, sonst aus created_at)"""
+    stamp = id_timestamp(session.get("id") or "")
+    month = stamp.strftime("%Y-%m") if stamp else (session.get("created_at") or "")[:7] or "unknown"
+    return os.path.join(_shard_name(session.get("user")), month)
+
+
+class JsonSessionStore(SessionStore):
+    """Eine JSON-Datei pro Session unter data/academy/sessions/<user>/<yyyy-mm>/<id>.json.
+
+    Sessions aus dem Altbestand liegen direkt in sessions/ und bleiben dort; der
+    Pfad einer ID wird beim Start einmal ermittelt (_paths) und für neue IDs aus
+    Nutzer und Monat abgeleitet. Nutzer-Listen lesen damit nur den eigenen Shard.
+
+    Snapshot und Journal werden nur unter einer Dateisperre (sessions/.journal.lock)
+    gelesen und geändert, damit Backend und Streamlit-Prozess sich nicht überholen.
+
+    Im Journal-Modus ist <id>.json nur der letzte Snapshot; jede Änderung wird als
+    eine kompakte Zeile mit RFC-6902-Operationen an <id>.journal.jsonl angehängt.
+    Der aktuelle Stand ist Snapshot + Journal. Nach JOURNAL_COMPACT_AFTER Einträgen
+    oder beim Abschluss/Abbruch faltet ein Hintergrund-Thread das Journal in einen
+    neuen Snapshot. Ohne Journal-Modus wird ein vorhandenes Journal (anderer Prozess,
+    früherer Start) beim Lesen angewendet und vor dem Schreiben gefaltet.
+    """
+
+    def __init__(self, sessions_dir: str, index_path: str = None, journal: bool = False,
+                 compact_after: int = JOURNAL_COMPACT_AFTER, fsync: bool = SESSION_FSYNC):
+        self.sessions_dir = sessions_dir
+        self.journal = journal
+        self.fsync = fsync
+        self.compact_after = compact_after
+        os.makedirs(sessions_dir, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._paths = {}
+        self._journal_lengths = {}
+        self._compactor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal-compact") if journal else None
+        self.index = SessionIndex(index_path or os.path.join(os.path.dirname(os.path.abspath(sessions_dir)), "session_index.jsonl"))
+        self.index.refresh(self._scan_ids(), self._stamp, self._load)
+
+    def _resolve(self, session_id):
+        """Pfad einer unbekannten ID suchen: Altbestand flach, ULIDs im Monats-Shard
+        (z.B. von einem anderen Prozess angelegt)"""
+        flat = os.path.join(self.sessions_dir, f"{session_id}.json")
+        if os.path.exists(flat):
+            return flat
+        stamp = id_timestamp(session_id) if is_ulid(session_id) else None
+        if stamp is not None:
+            pattern = os.path.join(glob.escape(self.sessions_dir), "*", stamp.strftime("%Y-%m"),
+                                   glob.escape(session_id) + ".json")
+            for path in glob.glob(pattern):
+                return path
+        return None
+
+    def path_of(self, session_id):
+        """Snapshot-Datei einer Session; None, wenn es sie nicht gibt"""
+        path = self._paths.get(session_id)
+        if path is None:
+            path = self._resolve(session_id)
+            if path is not None:
+                self._paths[session_id] = path
+        return path
+
+    def _path(self, session_id):
+        return self.path_of(session_id) or os.path.join(self.sessions_dir, f"{session_id}.json")
+
+    def _journal_path(self, session_id):
+        return self._path(session_id)[:-len(".json")] + ".journal.jsonl"
+
+    def _lock(self, session_id):
+        with self._locks_guard:
+            lock = self._locks.get(session_id)
+            if lock is None:
+                lock = self._locks[session_id] = threading.Lock()
+            return lock
+
+    @contextmanager
+    def _locked(self, session_id, shared=False):
+        """Session-Lock im Prozess plus Dateisperre über Prozesse (lesend geteilt)"""
+        with self._lock(session_id):
+            if fcntl is None:
+                yield
+                return
+            # Eigener Deskriptor pro Sperre: flock sperrt dann auch Threads gegeneinander
+            fd = os.open(os.path.join(self.sessions_dir, ".journal.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _scan_ids(self):
+        """Alle Session-Dateien (flach und in Shards) einmal beim Start erfassen"""
+        for root, _dirs, files in os.walk(self.sessions_dir):
+            for name in files:
+                if name.endswith('.json'):
+                    self._paths.setdefault(name[:-5], os.path.join(root, name))
+        return list(self._paths)
+
+    def _stamp(self, session_id):
+        """(mtime, size) über Snapshot und Journal, Basis für den Index-Abgleich"""
+        try:
+            st = os.stat(self._path(session_id))
+        except FileNotFoundError:
+            return None
+        mtime, size = st.st_mtime_ns, st.st_size
+        try:
+            jst = os.stat(self._journal_path(session_id))
+            mtime, size = max(mtime, jst.st_mtime_ns), size + jst.st_size
+        except FileNotFoundError:
+            pass
+        return (mtime, size)
+
+    @staticmethod
+    def _read(path):
+        try:
+            with timed("json", "load", "io"):
+                with open(path, 'rb') as f:
+                    raw = f.read()
+        except FileNotFoundError:
+            return None
+        record_io("json", "load", len(raw))
+        with timed("json", "load", "json"):
+            return json.loads(raw)
+
+    def _replay(self, session_id, session):
+        try:
+            with timed("json", "journal_read", "io"):
+                with open(self._journal_path(session_id), 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
+        except FileNotFoundError:
+            return session, 0
+        record_io("json", "journal_read", sum(len(line) for line in lines))
+        count = 0
+        snapshot_rev = session.get("revision")
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Abgebrochene letzte Zeile (Crash beim Anhängen) ignorieren
+                break
+            count += 1
+            rev = entry.get("rev")
+            if rev is not None and snapshot_rev is not None and rev <= snapshot_rev:
+                # Schon im Snapshot enthalten (Crash zwischen Snapshot und Journal-Löschen)
+                continue
+            session = apply_patch(session, entry.get("ops", []), in_place=True)
+        return session, count
+
+    def _load(self, session_id):
+        session = self._read(self._path(session_id))
+        if session is None:
+            return None
+        session, count = self._replay(session_id, session)
+        self._journal_lengths[session_id] = count
+        return session
+
+    def load(self, session_id):
+        # Snapshot und Journal müssen zusammenpassen, daher unter den Locks lesen;
+        # auch ohne Journal-Modus, das Journal kann von einem anderen Prozess stammen
+        with self._locked(session_id, shared=True):
+            return self._load(session_id)
+
+    def _write_snapshot(self, session):
+        # Erst in eine Temp-Datei schreiben, dann atomar ersetzen: Leser sehen nie halbe Dateien
+        path = self.path_of(session['id'])
+        if path is None:
+            directory = os.path.join(self.sessions_dir, shard_of(session))
+            os.makedirs(directory, exist_ok=True)
+            path = self._paths[session['id']] = os.path.join(directory, f"{session['id']}.json")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with timed("json", "save", "json"):
+            raw = json.dumps(session, indent=2, ensure_ascii=False).encode('utf-8')
+        with timed("json", "save", "io"):
+            with open(tmp, 'wb') as f:
+                f.write(raw)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp, path)
+        record_io("json", "save", len(raw))
+
+    def save(self, session, base=None):
+        session_id = session['id']
+        with self._locked(session_id):
+            if self.journal and base is not None and self.path_of(session_id) is not None:
+                ops = diff(base, session)
+                if ops:
+                    with timed("json", "journal_append", "json"):
+                        line = json.dumps({"rev": session.get("revision"), "ops": ops},
+                                          ensure_ascii=False, separators=(",", ":"))
+                    with timed("json", "journal_append", "io"):
+                        with open(self._journal_path(session_id), 'a', encoding='utf-8') as f:
+                            f.write(line + "\n")
+                            if self.fsync:
+                                f.flush()
+                                os.fsync(f.fileno())
+                    record_io("json", "journal_append", len(line) + 1)
+                    self._journal_lengths[session_id] = self._journal_lengths.get(session_id, 0) + 1
+            else:
+                # Ein vorhandenes Journal erst falten: bricht das Schreiben ab, fehlt nichts
+                self._compact(session_id)
+                self._write_snapshot(session)
+            self.index.put(session, self._stamp(session_id))
+        if self.journal and (self._journal_lengths.get(session_id, 0) >= self.compact_after
+                             or (session.get("state") in ("COMPLETED", "ABORTED") and self._journal_lengths.get(session_id))):
+            self._compactor.submit(self.compact, session_id)
+
+    def _drop_journal(self, session_id):
+        self._journal_lengths[session_id] = 0
+        try:
+            os.remove(self._journal_path(session_id))
+        except FileNotFoundError:
+            pass
+
+    def _compact(self, session_id):
+        if not os.path.exists(self._journal_path(session_id)):
+            return None
+        session = self._load(session_id)
+        if session is not None and self._journal_lengths.get(session_id):
+            self._write_snapshot(session)
+        self._drop_journal(session_id)
+        return session
+
+    def compact(self, session_id):
+        """Journal in einen neuen Snapshot falten"""
+        with self._locked(session_id):
+            session = self._compact(session_id)
+            if session is not None:
+                self.index.put(session, self._stamp(session_id))
+
+    def delete(self, session_id):
+        with self._locked(session_id):
+            self._drop_journal(session_id)
+            self._journal_lengths.pop(session_id, None)
+            try:
+                os.remove(self._path(session_id))
+            except FileNotFoundError:
+                self.index.remove(session_id)
+                return False
+            finally:
+                self._paths.pop(session_id, None)
+            self.index.remove(session_id)
+            return True
+
+    def ids(self):
+        return self.index.ids()
+
+    def query(self, user=None, state=None, module_id=None, since=None, until=None,
+              order="desc", cursor=None, limit=None):
+        return self.index.query(user, state, module_id, since, until, order, cursor, limit)
+
+    def list(self, user=None, state=None, module_id=None):
+        sessions = []
+        for entry in self.index.query(user, state, module_id, order="asc"):
+            session = self.load(entry["id"])
+            if session is not None:
+                sessions.append(session)
+        return sessions
+
+
+class SqliteSessionStore(SessionStore):
+    """SQLite-Ablage (WAL) mit indizierten Filterspalten, Dokument als JSON-Spalte"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            user TEXT,
+            state TEXT,
+            module_id TEXT,
+            created_at TEXT,
+            summary TEXT,
+            doc TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user);
+        CREATE INDEX IF NOT EXISTS idx_sessions_state ON sessions(state);
+        CREATE INDEX IF NOT EXISTS idx_sessions_module ON sessions(module_id);
+        CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions(created_at);
+    """
+
+    def __init__(self, db_path: str, fsync: bool = SESSION_FSYNC):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL" if fsync else "PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = {r[1] for r in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "summary" not in columns:
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN summary TEXT")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SUMMARY_VERSION:
+            for session_id, doc in self._conn.execute("SELECT id, doc FROM sessions").fetchall():
+                self._conn.execute("UPDATE sessions SET summary = ? WHERE id = ?",
+                                   (json.dumps(summarize(json.loads(doc)), ensure_ascii=False), session_id))
+            self._conn.execute(f"PRAGMA user_version = {SUMMARY_VERSION}")
+
+    def load(self, session_id):
+        with timed("sqlite", "load", "io"), self._lock:
+            row = self._conn.execute("SELECT doc FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if not row:
+            return None
+        record_io("sqlite", "load", len(row[0]))
+        with timed("sqlite", "load", "json"):
+            return json.loads(row[0])
+
+    def save(self, session, base=None):
+        with timed("sqlite", "save", "json"):
+            doc = json.dumps(session, ensure_ascii=False)
+            summary = json.dumps(summarize(session), ensure_ascii=False)
+        record_io("sqlite", "save", len(doc) + len(summary))
+        with timed("sqlite", "save", "io"), self._lock:
+            self._conn.execute(
+                """INSERT INTO sessions (id, user, state, module_id, created_at, summary, doc)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET user=excluded.user, state=excluded.state,
+                       module_id=excluded.module_id, created_at=excluded.created_at,
+                       summary=excluded.summary, doc=excluded.doc""",
+                (session['id'], session.get('user'), session.get('state'), session.get('module_id'),
+                 session.get('created_at'), summary, doc),
+            )
+
+    def delete(self, session_id):
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        return cur.rowcount > 0
+
+    def ids(self):
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT id FROM sessions ORDER BY created_at")]
+
+    @staticmethod
+    def _where(user=None, state=None, module_id=None, since=None, until=None):
+        clauses, params = [], []
+        for column, value in (("user", user), ("state", state), ("module_id", module_id)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("created_at <= ?")
+            params.append(until)
+        return clauses, params
+
+    def query(self, user=None, state=None, module_id=None, since=None, until=None,
+              order="desc", cursor=None, limit=None):
+        clauses, params = self._where(user, state, module_id, since, until)
+        direction = "DESC" if order == "desc" else "ASC"
+        if cursor:
+            clauses.append(f"(COALESCE(created_at, ''), id) {'<' if order == 'desc' else '>'} (?, ?)")
+            params.extend(cursor)
+        sql = "SELECT summary FROM sessions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY COALESCE(created_at, '') {direction}, id {direction}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def list(self, user=None, state=None, module_id=None):
+        clauses, params = self._where(user, state, module_id)
+        sql = "SELECT doc FROM sessions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+
+class WriteBehindSessionStore(SessionStore):
+    """Puffert geänderte Sessions im Speicher und schreibt sie gebündelt in den inneren Store.
+
+    Mehrere Änderungen einer Session innerhalb eines Flush-Fensters ergeben genau
+    einen Schreibzugriff. Gelesen wird zuerst aus dem Puffer (auch während eines
+    laufenden Flushs, bis der Stand geschrieben ist); Listen/Abfragen legen die
+    gepufferten Stände über das Ergebnis des inneren Stores, ohne zu flushen.
+    delete wartet einen laufenden Flush ab. Nach start() schreibt ein Hintergrund-Thread
+    periodisch bzw. ab max_dirty Einträgen; close() flusht beim Herunterfahren.
+    Andere Prozesse (Streamlit) sehen Änderungen erst nach dem Flush.
+    """
+
+    def __init__(self, inner: SessionStore, interval: float = WRITE_BEHIND_INTERVAL,
+                 max_dirty: int = WRITE_BEHIND_MAX_DIRTY):
+        self.inner = inner
+        self.interval = interval
+        self.max_dirty = max_dirty
+        self._dirty = {}
+        # Gerade im Flush befindliche Stände, bis sie im inneren Store liegen
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self.saves = 0
+        self.writes = 0
+
+    @property
+    def dirty_count(self):
+        return len(self._dirty)
+
+    def start(self):
+        """Hintergrund-Thread starten, der alle interval Sekunden (oder ab max_dirty) flusht"""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="session-write-behind", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._dirty:
+                self.flush()
+
+    def close(self):
+        """Thread beenden und alle offenen Änderungen schreiben"""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def load(self, session_id):
+        with self._lock:
+            entry = self._dirty.get(session_id) or self._inflight.get(session_id)
+            if entry is not None:
+                return copy.deepcopy(entry["doc"])
+        return self.inner.load(session_id)
+
+    def save(self, session, base=None):
+        with self._lock:
+            self.saves += 1
+            entry = self._dirty.get(session['id'])
+            # Für Journal-Stores zählt die Differenz zum zuletzt geschriebenen Stand
+            first_base = entry["base"] if entry is not None else base
+            self._dirty[session['id']] = {"doc": session, "base": first_base}
+            if len(self._dirty) >= self.max_dirty:
+                self._wake.set()
+
+    def flush(self):
+        """Alle gepufferten Sessions schreiben; liefert die Anzahl der Schreibzugriffe"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._dirty = self._dirty, {}
+                self._inflight = pending
+            written = 0
+            for session_id, entry in list(pending.items()):
+                try:
+                    self.inner.save(entry["doc"], entry["base"])
+                    written += 1
+                    with self._lock:
+                        self._inflight.pop(session_id, None)
+                except Exception:
+                    logger.exception("write-behind flush failed", extra={
+                        "event": "write_behind_flush_failed", "session_id": session_id,
+                        "store": type(self.inner).__name__,
+                    })
+                    with self._lock:
+                        self._inflight.pop(session_id, None)
+                        # Nur zurücklegen, wenn inzwischen kein neuerer Stand gepuffert wurde
+                        newer = self._dirty.get(session_id)
+                        if newer is None:
+                            self._dirty[session_id] = entry
+                        else:
+                            newer["base"] = entry["base"]
+            self.writes += written
+            return written
+
+    def delete(self, session_id):
+        # Nicht parallel zu einem Flush, der die Session sonst wieder auf die Platte schreibt
+        with self._flush_lock:
+            with self._lock:
+                buffered = self._dirty.pop(session_id, None) is not None
+            return self.inner.delete(session_id) or buffered
+
+    def _buffered(self) -> dict:
+        """Gepufferte Stände (im Flush befindliche zuerst, neuere überschreiben sie)"""
+        with self._lock:
+            return {sid: entry["doc"] for sid, entry in (*self._inflight.items(), *self._dirty.items())}
+
+    def ids(self):
+        buffered = self._buffered()
+        return [sid for sid in self.inner.ids() if sid not in buffered] + list(buffered)
+
+    def query(self, user=None, state=None, module_id=None, since=None, until=None,
+              order="desc", cursor=None, limit=None):
+        buffered = self._buffered()
+        if not buffered:
+            return self.inner.query(user, state, module_id, since, until, order, cursor, limit)
+        # Gepufferte Sessions können im inneren Ergebnis veraltet stehen: entsprechend mehr holen
+        rows = [e for e in self.inner.query(user, state, module_id, since, until, order, cursor,
+                                            limit + len(buffered) if limit else None)
+                if e["id"] not in buffered]
+        rows.extend(summary for summary in map(summarize, buffered.values())
+                    if _matches(summary, user, state, module_id, since, until))
+        reverse = order == "desc"
+        rows.sort(key=_sort_key, reverse=reverse)
+        if cursor:
+            cursor = tuple(cursor)
+            rows = [e for e in rows if (_sort_key(e) < cursor if reverse else _sort_key(e) > cursor)]
+        return rows[:limit] if limit else rows
+
+    def list(self, user=None, state=None, module_id=None):
+        buffered = self._buffered()
+        sessions = [s for s in self.inner.list(user, state, module_id) if s["id"] not in buffered]
+        sessions.extend(copy.deepcopy(doc) for doc in buffered.values() if _matches(doc, user, state, module_id))
+        sessions.sort(key=lambda s: s.get("created_at") or "")
+        return sessions
+
+
+def get_session_store(data_dir: str = DATA_DIR, backend: str = None) -> SessionStore:
+    """Session-Store gemäß Konfiguration (ACADEMY_SESSION_STORE) erzeugen"""
+    backend = (backend or SESSION_STORE).lower()
+    if backend == "json":
+        return JsonSessionStore(os.path.join(data_dir, "sessions"), journal=SESSION_JOURNAL)
+    if backend == "sqlite":
+        return SqliteSessionStore(SQLITE_FILE or os.path.join(data_dir, "sessions.sqlite3"))
+    raise ValueError(f"Unknown session store: {backend}")
+
+
+def migrate(source: SessionStore, target: SessionStore) -> int:
+    """Alle Sessions von source nach target kopieren, liefert die Anzahl"""
+    count = 0
+    for session_id in source.ids():
+        session = source.load(session_id)
+        if session is not None:
+            target.save(session)
+            count += 1
+    return count
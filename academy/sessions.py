@@ -1,26 +1,15 @@
-import re
-import time
-from datetime import datetime
-from zoneinfo import ZoneInfo
-def _safe_slug(s: str) -> str:
-    s = (s or "").strip()
-    s = re.sub(r"[^a-zA-Z0-9_-]+", "_", s)
-    s = re.sub(r"_+", "_", s)
-    return s.strip("_") or "NA"
-import json
 import os
 from datetime import datetime
+from zoneinfo import ZoneInfo
+from .session_ids import new_session_id
+from .session_store import DATA_DIR, get_session_store
 
-SESSIONS_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'academy', 'sessions')
+SESSIONS_DIR = os.path.join(DATA_DIR, 'sessions')
 
-os.makedirs(SESSIONS_DIR, exist_ok=True)
+_store = get_session_store(DATA_DIR)
 
 def create_session(payload: dict):
-    user = _safe_slug(payload.get("user", "NA"))
-    drill = _safe_slug(payload.get("drill_id") or payload.get("drill") or payload.get("module_id") or "NA")
-    date_prefix = datetime.now(ZoneInfo("Europe/Berlin")).strftime("%Y%m%d")
-    ts = int(time.time())
-    session_id = f"{date_prefix}_{user}_{drill}_{ts}"
+    session_id = new_session_id()
 
     session = {
         "id": session_id,
@@ -40,25 +29,13 @@ def create_session(payload: dict):
 
 def save_session(session):
     # Speichere immer unter session['id']
-    path = os.path.join(SESSIONS_DIR, f"{session['id']}.json")
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(session, f, indent=2, ensure_ascii=False)
+    _store.save(session)
 
 def load_session(session_id):
-    path = os.path.join(SESSIONS_DIR, f"{session_id}.json")
-    if os.path.exists(path):
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return None
+    return _store.load(session_id)
 
 def list_sessions(user=None):
-    sessions = []
-    for filename in os.listdir(SESSIONS_DIR):
-        if filename.endswith('.json'):
-            with open(os.path.join(SESSIONS_DIR, filename), 'r', encoding='utf-8') as f:
-                session = json.load(f)
-                if user is None or session['user'] == user:
-                    sessions.append(session)
+    sessions = _store.list(user=user)
     return sorted(sessions, key=lambda s: s['created_at'], reverse=True)
 
 def add_checkin(session_id, phase, responses, feedback=None, next_task=None):
@@ -1,9 +1,113 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt ist absichtlich langsam (~100-300 ms) und darf den Event-Loop nicht blockieren
+BCRYPT_WORKERS = int(os.environ.get("ACADEMY_BCRYPT_WORKERS", "2"))
+BCRYPT_MAX_QUEUE = int(os.environ.get("ACADEMY_BCRYPT_MAX_QUEUE", "32"))
+BCRYPT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
+
+
+class HashPoolBusy(Exception):
+    """Warteschlange des bcrypt-Pools ist voll"""
+
+
+class BcryptPool:
+    """Begrenzter Worker-Pool für Passwort-Hashing mit Warteschlangen-Metriken.
+
+    Höchstens `workers` Hashes laufen parallel, höchstens `max_queue` warten;
+    weitere Anfragen werden sofort mit HashPoolBusy abgewiesen.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        self._metrics = None
+
+    def register_metrics(self, registry):
+        """Warteschlange, Auslastung und Zeiten zusätzlich im Metrik-Registry (/api/metrics)"""
+        registry.gauge("academy_bcrypt_workers", "Size of the bcrypt worker pool", fn=lambda: self.workers)
+        registry.gauge("academy_bcrypt_in_flight", "Password hashes currently running", fn=lambda: self.in_flight)
+        registry.gauge("academy_bcrypt_queued", "Password hashes waiting for a worker",
+                       fn=lambda: self.stats()["queued"])
+        self._metrics = {
+            "completed": registry.counter("academy_bcrypt_completed_total", "Password hashes finished"),
+            "rejected": registry.counter("academy_bcrypt_rejected_total", "Password hashes rejected (queue full)"),
+            "wait": registry.histogram("academy_bcrypt_wait_seconds", "Time a password hash waited for a worker",
+                                       buckets=BCRYPT_BUCKETS),
+            "run": registry.histogram("academy_bcrypt_run_seconds", "Time spent computing a password hash",
+                                      buckets=BCRYPT_BUCKETS),
+        }
+
+    def _job(self, queued_at, fn, args):
+        started = time.monotonic()
+        with self._lock:
+            self.in_flight += 1
+            self.wait_seconds += started - queued_at
+        if self._metrics:
+            self._metrics["wait"].observe(started - queued_at)
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.run_seconds += elapsed
+            if self._metrics:
+                self._metrics["completed"].inc()
+                self._metrics["run"].observe(elapsed)
+
+    async def run(self, fn, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            if self._metrics:
+                self._metrics["rejected"].inc()
+            raise HashPoolBusy()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._job, time.monotonic(), fn, args)
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self.in_flight
+            return {
+                "workers": self.workers,
+                "in_flight": in_flight,
+                "queued": max(self.pending - in_flight, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": round(self.wait_seconds, 6),
+                "run_seconds_total": round(self.run_seconds, 6),
+            }
+
+
+bcrypt_pool = BcryptPool(BCRYPT_WORKERS, BCRYPT_MAX_QUEUE)
+
+async def hash_password_async(password: str) -> str:
+    return await bcrypt_pool.run(hash_password, password)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await bcrypt_pool.run(verify_password, plain, hashed)
@@ -0,0 +1,118 @@
+import gzip
+import os
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+# Dynamische Antworten erst ab dieser Größe komprimieren (kleine Bodies lohnen nicht)
+COMPRESS_MIN_SIZE = int(os.environ.get("ACADEMY_COMPRESS_MIN_SIZE", "1024"))
+# Schnelle Stufen pro Request, maximale Stufen für einmal vorkomprimierte Dateien
+DYNAMIC_LEVELS = {"br": 4, "gzip": 5}
+STATIC_LEVELS = {"br": 11, "gzip": 9}
+
+
+def available_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding) -> str:
+    """Beste unterstützte Kodierung laut Accept-Encoding (br vor gzip), sonst None"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, static: bool = False) -> bytes:
+    level = (STATIC_LEVELS if static else DYNAMIC_LEVELS)[encoding]
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _add_vary(headers):
+    for i, (key, value) in enumerate(headers):
+        if key.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[i] = (key, value + b", Accept-Encoding")
+            return
+    headers.append((b"vary", b"Accept-Encoding"))
+
+
+class CompressionMiddleware:
+    """ASGI-Middleware: komprimiert vollständige Antworten ab minimum_size per gzip/brotli.
+
+    Gestreamte Antworten (mehrere Body-Nachrichten, z.B. SSE oder Exporte) und
+    bereits kodierte Antworten (vorkomprimiertes Curriculum) gehen unverändert durch.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept = None
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+        encoding = negotiate(accept)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        passthrough = False
+
+        async def wrapped_send(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = dict((k.lower(), v) for k, v in message.get("headers", []))
+                if b"content-encoding" in headers or headers.get(b"content-type", b"").startswith(b"text/event-stream"):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            if start is None:
+                await send(message)
+                return
+            headers = list(start.get("headers", []))
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Gestreamt oder zu klein: Header unverändert nachreichen
+                passthrough = True
+                await send(start)
+                start = None
+                await send(message)
+                return
+            body = compress(body, encoding)
+            headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+            headers.append((b"content-encoding", encoding.encode("ascii")))
+            headers.append((b"content-length", str(len(body)).encode("ascii")))
+            _add_vary(headers)
+            await send({**start, "headers": headers})
+            start = None
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, wrapped_send)
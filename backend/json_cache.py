@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import threading
+
+from academy.metrics import record_io, timed
+
+
+class CachedJson:
+    """Geparstes JSON-File samt vorserialisiertem Body und starkem ETag"""
+
+    def __init__(self, data, body: bytes, etag: str, stamp: tuple, digest: str):
+        self.data = data
+        self.body = body
+        self.etag = etag
+        self.stamp = stamp
+        self.digest = digest
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str, compress) -> bytes:
+        """Body in der gewünschten Kodierung, einmal pro Dateiversion komprimiert"""
+        return self.derive("body:" + encoding, lambda data: compress(self.body, encoding, static=True))
+
+    def derive(self, name: str, factory):
+        """Einmal pro Dateiversion berechnete Ableitung (z.B. Index) liefern"""
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = factory(self.data)
+            return self._derived[name]
+
+
+def json_entry(data) -> CachedJson:
+    """Abgeleitete Ressource (z.B. Curriculum-Outline) mit eigenem Body und ETag"""
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()
+    return CachedJson(data, body, '"' + digest[:32] + '"', None, digest)
+
+
+class JsonFileCache:
+    """Prozessweiter Cache für selten geänderte JSON-Dateien (Curriculum, Teams).
+
+    Pro Zugriff wird nur ein stat() gemacht. Ändern sich mtime oder Größe, wird die
+    Datei neu gelesen; ist der Inhalt (SHA-256) gleich geblieben, bleibt der alte
+    Eintrag inkl. ETag und Ableitungen gültig.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> CachedJson:
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry.stamp == stamp:
+            return entry
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.stamp == stamp:
+                return entry
+            with timed("file", "load", "io"):
+                with open(path, "rb") as f:
+                    raw = f.read()
+            record_io("file", "load", len(raw))
+            digest = hashlib.sha256(raw).hexdigest()
+            if entry is not None and entry.digest == digest:
+                # Nur angefasst (touch/Deploy), Inhalt unverändert
+                entry.stamp = stamp
+                return entry
+            with timed("file", "load", "json"):
+                data = json.loads(raw)
+                body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            entry = CachedJson(data, body, etag, stamp, digest)
+            self._entries[path] = entry
+            return entry
+
+
+def encoded_etag(etag: str, encoding) -> str:
+    """Eigener starker ETag je Kodierung ("abc" -> "abc-gzip")"""
+    return etag if not encoding else etag[:-1] + "-" + encoding + '"'
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    """If-None-Match Header gegen einen ETag prüfen (Liste, '*' und W/-Präfix erlaubt).
+
+    Kodierte Varianten ("abc-gzip") gelten als dieselbe Version wie "abc".
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag or (candidate.startswith(etag[:-1] + "-") and candidate.endswith('"')):
+            return True
+    return False
@@ -0,0 +1,134 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import uuid
+from datetime import datetime, timezone
+
+# Log-Datei mit Rotation nach Größe; Handler laufen im Listener-Thread, nie im Request.
+# Nicht backend.log: dorthin leiten die Startskripte stdout um (doppelte Zeilen, Rotation
+# würde die Datei unter dem offenen stdout umbenennen)
+LOG_FILE = os.environ.get("ACADEMY_LOG_FILE", "backend.jsonl")
+LOG_MAX_BYTES = int(os.environ.get("ACADEMY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUPS = int(os.environ.get("ACADEMY_LOG_BACKUPS", "5"))
+LOG_LEVEL = os.environ.get("ACADEMY_LOG_LEVEL", "INFO")
+LOG_STDOUT = os.environ.get("ACADEMY_LOG_STDOUT", "1") == "1"
+
+trace_id_var = contextvars.ContextVar("trace_id", default=None)
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# Attribute, die jeder LogRecord hat; alles andere (extra=...) wird als Feld ausgegeben
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "exc"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Eine JSON-Zeile pro Eintrag: ts, level, logger, msg, trace/request-ID und extra-Felder"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and value is not None:
+                entry[key] = value
+        exc = getattr(record, "exc", None) or (self.formatException(record.exc_info) if record.exc_info else None)
+        if exc:
+            entry["exc"] = exc
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """Übernimmt Trace-/Request-ID aus dem aufrufenden Kontext, bevor der Eintrag in die Queue geht"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if getattr(record, "trace_id", None) is None:
+            record.trace_id = trace_id_var.get()
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        if record.exc_info:
+            record.exc = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info, record.exc_text = record.message, None, None, None
+        return record
+
+
+_listener = None
+
+def setup_logging():
+    """Root-Logger auf Queue umstellen; Datei-/Konsolen-Handler laufen in einem Listener-Thread"""
+    global _listener
+    if _listener is not None:
+        return _listener
+    formatter = JsonFormatter()
+    handlers = []
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
+    if LOG_STDOUT:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_ContextQueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+def stop_logging():
+    """Queue leeren und Listener beenden (beim Herunterfahren)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class TraceIdMiddleware:
+    """ASGI-Middleware: X-Trace-Id übernehmen (oder erzeugen) und für Logs im Kontext setzen.
+
+    Jeder Request bekommt zusätzlich eine eigene request_id; beide IDs gehen als
+    Header X-Trace-Id / X-Request-Id zurück an den Client.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        trace_id = None
+        for key, value in scope.get("headers", []):
+            if key == b"x-trace-id":
+                trace_id = value.decode("latin-1")[:64]
+        request_id = uuid.uuid4().hex[:12]
+        trace_id = trace_id or request_id
+        trace_token = trace_id_var.set(trace_id)
+        request_token = request_id_var.set(request_id)
+
+        async def wrapped_send(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", trace_id.encode("latin-1")))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            trace_id_var.reset(trace_token)
+            request_id_var.reset(request_token)
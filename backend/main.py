@@ -3,27 +3,54 @@ import json
 import jwt
 from datetime import datetime, timedelta
 from fastapi import Header, HTTPException, Depends
-from auth_utils import hash_password, verify_password
+from auth_utils import HashPoolBusy, bcrypt_pool, hash_password_async, verify_password_async
 # JWT config
-DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "academy")
+DATA_DIR = os.environ.get("ACADEMY_DATA_DIR") or os.path.join(os.path.dirname(__file__), "..", "data", "academy")
 USERS_FILE = os.path.join(DATA_DIR, "users.json")
 JWT_SECRET = os.environ.get("ACADEMY_JWT_SECRET", "dev-secret")
 JWT_ALGO = "HS256"
 JWT_EXP_DAYS = 7
 
+# users.json wird nur bei Änderung (mtime/Größe) oder nach save_users neu gelesen
+_users_cache = {"stamp": None, "data": {"users": []}, "by_name": {}}
+
+def _normalize_username(username: str) -> str:
+    return username.strip().lower()
+
+def _users_state():
+    try:
+        st = os.stat(USERS_FILE)
+    except FileNotFoundError:
+        _users_cache.update(stamp=None, data={"users": []}, by_name={})
+        return _users_cache
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _users_cache["stamp"] != stamp:
+        with timed("users", "load", "io"):
+            with open(USERS_FILE, "rb") as f:
+                raw = f.read()
+        record_io("users", "load", len(raw))
+        with timed("users", "load", "json"):
+            data = json.loads(raw)
+        by_name = {_normalize_username(u["username"]): u for u in data.get("users", [])}
+        _users_cache.update(stamp=stamp, data=data, by_name=by_name)
+    return _users_cache
+
 def load_users():
-    if not os.path.exists(USERS_FILE):
-        print("[AUTH] USERS_FILE (not found):", USERS_FILE)
-        return {"users": []}
-    print("[AUTH] USERS_FILE =", USERS_FILE)
-    with open(USERS_FILE, "r") as f:
-        return json.load(f)
+    return _users_state()["data"]
+
+def find_user(username: str):
+    return _users_state()["by_name"].get(_normalize_username(username))
 
 def save_users(data):
     tmp = USERS_FILE + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(data, f, indent=2)
-    os.replace(tmp, USERS_FILE)
+    with timed("users", "save", "json"):
+        raw = json.dumps(data, indent=2).encode("utf-8")
+    with timed("users", "save", "io"):
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, USERS_FILE)
+    record_io("users", "save", len(raw))
+    _users_cache["stamp"] = None
 
 def get_current_user(authorization: str = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
@@ -48,26 +75,60 @@ from fastapi import Request
 # ...alle anderen Endpunkte...
 
 # ...existing code...
-from fastapi import FastAPI, HTTPException, Request
-from uuid import uuid4
+from fastapi import Body, FastAPI, HTTPException, Request
 from collections import Counter
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from compression import COMPRESS_MIN_SIZE, CompressionMiddleware, compress, negotiate
+import asyncio
+import base64
+import copy
 import json
 import os
+import sys
+import time
+import weakref
 import logging
-from typing import List, Optional
-from pydantic import BaseModel
+from contextlib import asynccontextmanager
+from typing import Any, List, Optional
+from pydantic import BaseModel, ValidationError
 from datetime import datetime
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(message)s',
-    handlers=[
-        logging.FileHandler("backend.log", encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
 
-app = FastAPI(title="Academy API", version="1.0.0")
+# Repo-Root für das gemeinsame academy-Paket (Curriculum-Index etc.)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from academy.curriculum import CurriculumIndex, curriculum_outline, module_detail
+from academy.metrics import REGISTRY, record_io, timed
+from json_cache import JsonFileCache, encoded_etag, etag_matches, json_entry
+from request_metrics import RequestMetricsMiddleware
+from logging_setup import TraceIdMiddleware, setup_logging, stop_logging
+from session_events import SessionEventBus, changed_fields, event_stream, parse_last_event_id
+from session_ops import MICROFEEDBACK_PHASES, apply_checkin, apply_drafts, apply_microfeedback, apply_phase
+from academy.session_ids import new_session_id
+from academy.session_store import SUMMARY_FIELDS, WRITE_BEHIND, WriteBehindSessionStore, get_session_store, summarize
+from academy.session_stats import SessionStats
+from academy.search_index import SearchIndex
+from academy.answer_analytics import DIMENSIONS, AnswerAnalytics
+from academy.session_export import csv_columns, iter_csv, iter_ndjson, iter_sessions
+from academy.drill_snapshots import DrillSnapshotStore, dehydrate, drill_refs, hydrate
+from academy.json_patch import PatchError, apply_patch, changed_paths, merge_patch
+
+# Strukturierte JSON-Logs über eine Queue: Schreiben/Rotation passiert im Listener-Thread
+setup_logging()
+logger = logging.getLogger("academy.api")
+
+@asynccontextmanager
+async def lifespan(app):
+    if isinstance(session_store, WriteBehindSessionStore):
+        session_store.start()
+    try:
+        yield
+    finally:
+        # Gepufferte Sessions vor dem Beenden auf die Platte bringen
+        if isinstance(session_store, WriteBehindSessionStore):
+            await asyncio.to_thread(session_store.close)
+        stop_logging()
+
+app = FastAPI(title="Academy API", version="1.0.0", lifespan=lifespan)
 
 # CORS für Frontend
 app.add_middleware(
@@ -76,14 +137,115 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Trace-Id", "X-Request-Id", "Preference-Applied"],
 )
+# gzip/brotli für größere Antworten (Curriculum/Teams sind bereits vorkomprimiert)
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESS_MIN_SIZE)
+# Äußerste Schicht: misst Latenz inkl. Kompression und die tatsächlich gesendeten Bytes
+app.add_middleware(RequestMetricsMiddleware)
+# Trace-/Request-ID für alle Logs eines Requests
+app.add_middleware(TraceIdMiddleware)
 
 @app.get("/api/health")
 async def health():
     return {"status": "ok"}
 
-# Daten-Verzeichnis
-DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "academy")
+# bcrypt-Pool (auth_utils) meldet Warteschlange und Zeiten ebenfalls unter /api/metrics
+bcrypt_pool.register_metrics(REGISTRY)
+
+@app.get("/api/metrics")
+async def metrics():
+    """Latenzen/Größen je Route und I/O-Zähler der Datenablage im Prometheus-Textformat"""
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Daten-Verzeichnis (ACADEMY_DATA_DIR überschreibt, z.B. für scripts/replay_benchmark.py)
+DATA_DIR = os.environ.get("ACADEMY_DATA_DIR") or os.path.join(os.path.dirname(__file__), "..", "data", "academy")
+CURRICULUM_FILE = os.path.join(DATA_DIR, "curriculum.json")
+TEAMS_FILE = os.path.join(DATA_DIR, "teams.json")
+
+# Curriculum/Teams ändern sich praktisch nie -> einmal parsen, vorserialisiert ausliefern
+file_cache = JsonFileCache()
+
+# Session-Ablage (JSON-Dateien oder SQLite, siehe ACADEMY_SESSION_STORE)
+session_store = get_session_store(DATA_DIR)
+if WRITE_BEHIND:
+    # Opt-in: Änderungen gebündelt schreiben (ACADEMY_WRITE_BEHIND_INTERVAL / _MAX_DIRTY)
+    session_store = WriteBehindSessionStore(session_store)
+# Dashboard-/Fortschritts-Aggregate pro Nutzer, bei jedem Schreiben nachgeführt
+session_stats = SessionStats(session_store)
+# Live-Ereignisse (SSE) für offene Session-/Nutzer-Streams
+session_events = SessionEventBus()
+# Alte Drill-Versionen, auf die Sessions per Hash verweisen
+drill_snapshots = DrillSnapshotStore(os.path.join(DATA_DIR, "drill_snapshots"))
+
+def curriculum_index() -> CurriculumIndex:
+    """Index über das aktuelle Curriculum (wird pro Curriculum-Version einmal gebaut)"""
+    return file_cache.get(CURRICULUM_FILE).derive("index", CurriculumIndex)
+
+# Volltextsuche über Notizen/Reflexionen (Freitext-Fragen laut Curriculum), bei jedem Schreiben nachgeführt
+search_index = SearchIndex(os.path.join(DATA_DIR, "search_index.jsonl"), session_store, curriculum_index)
+# Antwortverteilungen (spaltenweise int-Arrays), beim ersten Zugriff aufgebaut und danach nachgeführt
+answer_analytics = AnswerAnalytics(session_store, curriculum_index)
+
+def with_drills(session: dict) -> dict:
+    """Session für die Ausgabe: Drill-Referenzen über Curriculum bzw. Snapshots auflösen"""
+    return hydrate(session, curriculum_index(), drill_snapshots)
+
+def store_session(session: dict, base: Optional[dict] = None):
+    """Session speichern; eingebettete Drills (Altbestand, PATCH) werden zu Referenzen.
+
+    base ist der Stand vor der Änderung (für den Journal-Modus des Stores).
+    Blockiert (Datei-I/O, abgeleitete Indizes): aus Handlern nur per asyncio.to_thread.
+    """
+    dehydrate(session, drill_snapshots)
+    session_store.save(session, base)
+    session_stats.update(summarize(base) if base is not None else None, summarize(session))
+    search_index.update(session)
+    answer_analytics.update(session)
+
+# Pro Session ein asyncio.Lock; schwache Referenzen, damit ungenutzte Locks verschwinden
+_session_locks = weakref.WeakValueDictionary()
+
+def session_lock(session_id: str) -> asyncio.Lock:
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _session_locks[session_id] = lock
+    return lock
+
+def check_revision(session: dict, request: Optional[Request]):
+    """Optimistic Concurrency: If-Match muss der aktuellen Revision entsprechen, sonst 409"""
+    if_match = request.headers.get("if-match") if request is not None else None
+    if not if_match or if_match.strip() == "*":
+        return
+    current = str(session.get("revision", 0))
+    for candidate in if_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == current:
+            return
+    raise HTTPException(status_code=409, detail={"error": "revision_conflict", "revision": session.get("revision", 0)})
+
+@asynccontextmanager
+async def session_txn(session_id: str, request: Optional[Request] = None):
+    """Read-modify-write einer Session unter ihrem Lock; speichert mit neuer Revision.
+
+    Wirft der Block eine Exception (z.B. HTTPException), wird nichts geschrieben.
+    """
+    async with session_lock(session_id):
+        session = await asyncio.to_thread(session_store.load, session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        check_revision(session, request)
+        base = copy.deepcopy(session)
+        yield session
+        if session == base:
+            # Nichts geändert: kein Schreibzugriff, Revision bleibt
+            return
+        session["revision"] = session.get("revision", 0) + 1
+        await asyncio.to_thread(store_session, session, base)
+        session_events.publish("session.updated", session, changed_fields(base, session))
 
 # Pydantic Models
 class SessionCreate(BaseModel):
@@ -117,79 +279,208 @@ class AbortData(BaseModel):
     note: Optional[str] = None
 
 # Hilfsfunktionen
-def load_json(file_path: str):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_json(file_path: str, data):
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def cached_json_response(entry, request: Request):
+    """Vorserialisierten (ggf. vorkomprimierten) Body mit ETag ausliefern, bei passendem If-None-Match nur 304"""
+    encoding = negotiate(request.headers.get("accept-encoding")) if len(entry.body) >= COMPRESS_MIN_SIZE else None
+    headers = {"ETag": encoded_etag(entry.etag, encoding), "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=entry.encoded(encoding, compress), media_type="application/json", headers=headers)
 
 # API Endpunkte
 @app.get("/api/curriculum")
-async def get_curriculum():
+async def get_curriculum(request: Request):
     """Curriculum laden"""
     try:
-        curriculum = load_json(os.path.join(DATA_DIR, "curriculum.json"))
-        return curriculum
+        return cached_json_response(file_cache.get(CURRICULUM_FILE), request)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Curriculum not found")
 
+# Teilressourcen des Curriculums: einmal pro Curriculum-Version serialisiert, jeweils mit eigenem ETag
+def curriculum_entry():
+    try:
+        return file_cache.get(CURRICULUM_FILE)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Curriculum not found")
+
+@app.get("/api/curriculum/outline")
+async def get_curriculum_outline(request: Request):
+    """Tracks/Module mit Titeln, Zusammenfassung, Schwierigkeit und Drill-Liste (ohne Didaktik)"""
+    entry = curriculum_entry()
+    return cached_json_response(entry.derive("outline", lambda data: json_entry(curriculum_outline(data))), request)
+
+@app.get("/api/curriculum/modules/{module_id}")
+async def get_curriculum_module(module_id: str, request: Request):
+    """Modul-Details; Drills nur als Zusammenfassung (Inhalt über /api/curriculum/drills/{id})"""
+    entry = curriculum_entry()
+    index = entry.derive("index", CurriculumIndex)
+    if index.get_module(module_id) is None:
+        raise HTTPException(status_code=404, detail="Module not found")
+    return cached_json_response(
+        entry.derive(f"module:{module_id}", lambda data: json_entry(module_detail(index, module_id))), request)
+
+@app.get("/api/curriculum/drills/{drill_id}")
+async def get_curriculum_drill(drill_id: str, request: Request, module_id: Optional[str] = None):
+    """Vollständiger Drill (Didaktik, Config, miniFeedback); module_id bei mehrdeutigen IDs"""
+    entry = curriculum_entry()
+    index = entry.derive("index", CurriculumIndex)
+    drill = index.get_drill(drill_id, module_id)
+    if drill is None:
+        raise HTTPException(status_code=404, detail="Drill not found")
+    owner = module_id or index.module_of(drill_id)["id"]
+    return cached_json_response(
+        entry.derive(f"drill:{owner}:{drill_id}", lambda data: json_entry({**drill, "module_id": owner})), request)
+
 @app.get("/api/teams")
-async def get_teams():
+async def get_teams(request: Request):
     """DEL Teams laden"""
     try:
-        return load_json(os.path.join(DATA_DIR, "teams.json"))
+        return cached_json_response(file_cache.get(TEAMS_FILE), request)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Teams not found")
 
+class DrillFeedbackRequest(BaseModel):
+    answers: dict
+    module_id: Optional[str] = None  # Drill-IDs sind nicht global eindeutig
+
+@app.post("/api/drills/{drill_id}/feedback")
+async def drill_feedback(drill_id: str, payload: DrillFeedbackRequest):
+    """Passende miniFeedback-Gruppen für die Antworten (kompilierte Regeln aus dem Curriculum-Index)"""
+    index = curriculum_index()
+    if index.get_drill(drill_id, payload.module_id) is None:
+        raise HTTPException(status_code=404, detail="Drill not found")
+    rules = index.rules_for(drill_id, payload.module_id)
+    if rules is None:
+        return {"drill_id": drill_id, "groups": [], "question": None, "fallback": True}
+    question, fallback = rules.question_for(payload.answers)
+    return {
+        "drill_id": drill_id,
+        "trigger": rules.trigger,
+        "groups": [{"index": i, "when": group.get("when") or {}, "questions": group.get("questions") or []}
+                   for i, group in rules.match(payload.answers)],
+        "question": question,
+        "fallback": fallback,
+    }
+
+@app.get("/api/drills/feedback/problems")
+async def drill_feedback_problems():
+    """Beim Kompilieren gefundene Fehler/Warnungen in miniFeedback-Bedingungen"""
+    return {"problems": curriculum_index().rule_problems}
+
+def json_response(data, headers: Optional[dict] = None) -> Response:
+    """Kompakt serialisieren (Session-Dokumente sind reines JSON, jsonable_encoder unnötig)"""
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def wants_minimal(request: Request) -> bool:
+    """?return=minimal|representation hat Vorrang vor dem Header Prefer: return=minimal"""
+    explicit = request.query_params.get("return")
+    if explicit:
+        return explicit == "minimal"
+    for part in request.headers.get("prefer", "").replace(";", ",").split(","):
+        if part.strip().lower() == "return=minimal":
+            return True
+    return False
+
+def mutation_response(session: dict, request: Request, changed: Optional[dict] = None):
+    """Volle Session (Default) oder nur id, Revision, Status, Phase und das geänderte Teilobjekt"""
+    if not wants_minimal(request):
+        return with_drills(session)
+    body = {
+        "id": session["id"],
+        "revision": session.get("revision", 0),
+        "state": session.get("state"),
+        "current_phase": session.get("current_phase"),
+        **(changed or {}),
+    }
+    return json_response(body, {"Preference-Applied": "return=minimal"})
+
+def encode_cursor(entry) -> str:
+    raw = json.dumps([entry.get("created_at") or "", entry["id"]]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, session_id = json.loads(raw)
+        return (str(created_at), str(session_id))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def date_bound(value: Optional[str], end: bool = False):
+    """Reines Datum (YYYY-MM-DD) als Tagesanfang bzw. -ende interpretieren"""
+    if value and len(value) == 10 and end:
+        return value + "T23:59:59.999999"
+    return value
+
 @app.get("/api/sessions")
-async def get_sessions(user: Optional[str] = None, state: Optional[str] = None):
-    """Sessions filtern"""
-    sessions_dir = os.path.join(DATA_DIR, "sessions")
-    if not os.path.exists(sessions_dir):
-        return []
+def get_sessions(
+    response: Response,
+    user: Optional[str] = None,
+    state: Optional[str] = None,
+    module: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    order: str = "desc",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """Sessions filtern, nach created_at sortieren und seitenweise liefern.
+
+    Mit limit wird paginiert; der Cursor für die nächste Seite steht im Header
+    X-Next-Cursor. view=summary bzw. fields=a,b liefern nur die angefragten Felder.
+    Bewusst kein async: Index und Session-Dateien werden synchron gelesen, FastAPI
+    führt den Handler daher im Threadpool aus statt auf dem Event-Loop.
+    """
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be >= 1")
+    entries = session_store.query(
+        user=user, state=state, module_id=module,
+        since=date_bound(since), until=date_bound(until, end=True),
+        order=order, cursor=decode_cursor(cursor) if cursor else None,
+        limit=limit + 1 if limit else None,
+    )
+    if limit and len(entries) > limit:
+        entries = entries[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(entries[-1])
+
+    wanted = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    if view == "summary" and not wanted:
+        wanted = list(SUMMARY_FIELDS)
+    if wanted and all(f in SUMMARY_FIELDS for f in wanted):
+        # Alles aus dem Index beantwortbar, kein Session-Dokument öffnen
+        return [{"id": e["id"], **{f: e.get(f) for f in wanted}} for e in entries]
 
     sessions = []
-    for file in os.listdir(sessions_dir):
-        if file.endswith('.json'):
-            session = load_json(os.path.join(sessions_dir, file))
-            if user and session.get('user') != user:
-                continue
-            if state and session.get('state') != state:
-                continue
-            # Ensure created_by is set (fallback to user for old sessions)
-            if not session.get('created_by'):
-                session['created_by'] = session.get('user', 'Unbekannt')
-            sessions.append(session)
-    return sessions
+    for entry in entries:
+        session = session_store.load(entry["id"])
+        if session is None:
+            continue
+        # Ensure created_by is set (fallback to user for old sessions)
+        if not session.get('created_by'):
+            session['created_by'] = session.get('user', 'Unbekannt')
+        session = with_drills(session)
+        if wanted:
+            session = {"id": session["id"], **{f: session.get(f) for f in wanted}}
+        sessions.append(session)
+    next_cursor = response.headers.get("X-Next-Cursor")
+    return json_response(sessions, {"X-Next-Cursor": next_cursor} if next_cursor else None)
 
 @app.post("/api/sessions")
 async def create_session(session: SessionCreate, user=Depends(get_current_user)):
     """Neue Session erstellen (auth required)"""
-    sessions_dir = os.path.join(DATA_DIR, "sessions")
-    os.makedirs(sessions_dir, exist_ok=True)
-
-    session_id = f"{user}_{int(datetime.now().timestamp())}"
-
-    # Lade Module-Drills aus Curriculum
-    curriculum = load_json(os.path.join(DATA_DIR, "curriculum.json"))
-    module_drills = []
-    for track in curriculum.get("tracks", []):
-        for module in track.get("modules", []):
-            if module["id"] == session.module_id:
-                if session.drill_id:
-                    # Wenn drill_id spezifiziert, nur diesen Drill laden
-                    for drill in module.get("drills", []):
-                        if drill["id"] == session.drill_id:
-                            module_drills = [drill]
-                            break
-                else:
-                    # Sonst alle Drills des Moduls
-                    module_drills = module.get("drills", [])
-                break
-        if module_drills:
-            break
+    session_id = new_session_id()
+
+    # Module-Drills aus dem Curriculum-Index, gespeichert werden nur Referenzen
+    index = curriculum_index()
+    module_drills = index.resolve_drills(session.module_id, session.drill_id)
 
     session_data = {
         "id": session_id,
@@ -202,9 +493,11 @@ async def create_session(session: SessionCreate, user=Depends(get_current_user))
         "session_method": session.session_method,  # Store session method
         "drill_id": session.drill_id,  # Store selected drill
         "state": "IN_PROGRESS",  # Start as in progress instead of PRE
+        "revision": 1,
         "current_phase": "PRE",  # Track current phase for continuation
         "created_at": datetime.now().isoformat(),
-        "drills": module_drills,
+        "drill_refs": drill_refs(module_drills, index, drill_snapshots),
+        "curriculum_version": file_cache.get(CURRICULUM_FILE).digest[:24],
         "progress": {
             "current_drill_index": 0,
             "completed_drills": []
@@ -221,278 +514,383 @@ async def create_session(session: SessionCreate, user=Depends(get_current_user))
         }
     }
 
-    print(f"[AUTH] request by user={user} path=/api/sessions")
-    save_json(os.path.join(sessions_dir, f"{session_id}.json"), session_data)
-    return session_data
+    logger.info("session created", extra={"event": "session_create", "user": user, "session_id": session_id})
+    await asyncio.to_thread(store_session, session_data)
+    session_events.publish("session.created", session_data)
+    return with_drills(session_data)
+
+@app.get("/api/stats")
+async def get_stats(user: Optional[str] = None):
+    """Kennzahlen (Anzahl je Status, letzte Aktivität, Ø Confidence/Helpfulness) ohne Session-Download"""
+    return await asyncio.to_thread(session_stats.stats, user)
+
+@app.get("/api/progress")
+async def get_progress(user: Optional[str] = None):
+    """Fortschritt je Modul und Track aus den Aggregaten"""
+    index = curriculum_index()
+    return await asyncio.to_thread(
+        session_stats.progress, user, lambda module_id: (index.track_of(module_id) or {}).get("id"))
+
+@app.get("/api/search")
+async def search_sessions(q: str, user: Optional[str] = None, module: Optional[str] = None, limit: int = 20):
+    """Volltextsuche (Checkin-Antworten, Post, Microfeedback, Abbruch-Notiz); Treffer mit Ausschnitt"""
+    started = time.perf_counter()
+    result = await asyncio.to_thread(search_index.search, q, user, module, max(1, min(limit, 100)))
+    result["took_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+@app.get("/api/analytics/answers")
+async def get_answer_analytics(
+    module: Optional[str] = None,
+    drill: Optional[str] = None,
+    key: Optional[str] = None,
+    user: Optional[str] = None,
+    team: Optional[str] = None,
+    phase: Optional[str] = None,
+    shift: Optional[int] = None,
+    by: Optional[str] = None,
+):
+    """Antwortverteilung je Auswahlfrage (Optionen aus config.questions), gefiltert nach
+    Modul/Drill/Frage/Nutzer/Team/Phase/Shift; by=phase,user,... liefert Kreuztabellen"""
+    dims = [d.strip() for d in by.split(",") if d.strip()] if by else []
+    if any(d not in DIMENSIONS for d in dims):
+        raise HTTPException(status_code=400, detail=f"by must be one of {', '.join(DIMENSIONS)}")
+    started = time.perf_counter()
+    result = await asyncio.to_thread(
+        answer_analytics.answers, module_id=module, drill_id=drill, key=key, by=dims,
+        user=user, team=team, phase=phase.strip().upper() if phase else None, shift=shift,
+    )
+    result["took_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+@app.get("/api/export/sessions")
+async def export_sessions(
+    format: str = "ndjson",
+    user: Optional[str] = None,
+    state: Optional[str] = None,
+    module: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+):
+    """Alle passenden Sessions gestreamt (älteste zuerst), Filter wie bei /api/sessions.
+
+    ndjson: ein gespeichertes Session-Dokument pro Zeile (Drills als Referenz).
+    csv: eine Zeile pro Session, Checkin-Antworten als Spalten <phase>.<key> nach den
+    Fragen der Drills im Curriculum (bei module nur dessen Drills); übrige Antworten
+    als JSON in extra_answers.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    sessions = iter_sessions(session_store, user=user, state=state, module_id=module,
+                             since=date_bound(since), until=date_bound(until, end=True))
+    if format == "csv":
+        try:
+            index = curriculum_index()
+            drills = [d for (module_id, _), d in index.module_drills.items() if not module or module_id == module]
+        except FileNotFoundError:
+            drills = []
+        body = iter_csv(sessions, csv_columns(drills))
+    else:
+        body = iter_ndjson(sessions)
+    filename = f"sessions-{datetime.now():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
 
 @app.get("/api/sessions/{session_id}")
 async def get_session(session_id: str):
     """Session Details"""
-    try:
-        return load_json(os.path.join(DATA_DIR, "sessions", f"{session_id}.json"))
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-@app.patch("/api/sessions/{session_id}")
-async def update_session(session_id: str, updates: dict):
-    """Session aktualisieren"""
-    session_path = os.path.join(DATA_DIR, "sessions", f"{session_id}.json")
-    try:
-        session = load_json(session_path)
-    except FileNotFoundError:
+    session = await asyncio.to_thread(session_store.load, session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
+    return json_response(with_drills(session))
 
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
-    # Merge-Logik für microfeedback
-    for key, value in updates.items():
-        if key == "microfeedback":
-            if "microfeedback" not in session:
-                session["microfeedback"] = {"P1": {"done": False, "text": ""}, "P2": {"done": False, "text": ""}, "P3": {"done": False, "text": ""}}
-            for phase, mf in value.items():
-                if phase in session["microfeedback"]:
-                    session["microfeedback"][phase].update(mf)
-                else:
-                    session["microfeedback"][phase] = mf
-        else:
-            session[key] = value
+@app.get("/api/sessions/{session_id}/events")
+async def session_events_stream(session_id: str, request: Request):
+    """SSE: Änderungen dieser Session (revision, state, current_phase, geänderte Felder)"""
+    since = session_events.last_seq
+    session = await asyncio.to_thread(session_store.load, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    hello = {"seq": since, "type": "hello", "session_id": session_id, "user": session.get("user"),
+             "revision": session.get("revision", 0), "state": session.get("state"),
+             "current_phase": session.get("current_phase")}
+    last_id = parse_last_event_id(request.headers.get("last-event-id"))
+    return StreamingResponse(event_stream(session_events, ("session", session_id), request, hello, last_id),
+                             media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/api/events")
+async def user_events_stream(request: Request, user: str):
+    """SSE: Anlegen, Ändern und Löschen aller Sessions eines Nutzers"""
+    hello = {"seq": session_events.last_seq, "type": "hello", "user": user}
+    last_id = parse_last_event_id(request.headers.get("last-event-id"))
+    return StreamingResponse(event_stream(session_events, ("user", user), request, hello, last_id),
+                             media_type="text/event-stream", headers=SSE_HEADERS)
+
+MERGE_PATCH = "application/merge-patch+json"
+JSON_PATCH = "application/json-patch+json"
+# Felder, die per Patch nicht verändert werden dürfen
+PROTECTED_FIELDS = ("id", "user", "created_by", "created_at", "revision", "drill_refs", "curriculum_version")
+
+def patch_format(request: Request) -> str:
+    return (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+
+def apply_body_patch(target, body, fmt: str):
+    """RFC 6902 (json-patch+json) oder RFC 7396 (merge-patch+json) anwenden, ohne target zu verändern"""
+    try:
+        if fmt == JSON_PATCH:
+            if not isinstance(body, list):
+                raise PatchError("JSON Patch body must be an array")
+            return apply_patch(target, body)
+        return merge_patch(target, body)
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-    save_json(session_path, session)
-    return session
+@app.patch("/api/sessions/{session_id}")
+async def update_session(session_id: str, request: Request, updates: Any = Body(...)):
+    """Session aktualisieren.
+
+    Mit Content-Type application/merge-patch+json bzw. application/json-patch+json
+    wird der Patch auf die Session angewendet und nur Revision + geänderte Pfade
+    zurückgegeben; sonst gilt das bisherige Merge-Verhalten mit voller Session.
+    """
+    fmt = patch_format(request)
+    if fmt in (MERGE_PATCH, JSON_PATCH):
+        async with session_txn(session_id, request) as session:
+            patched = apply_body_patch(session, updates, fmt)
+            if not isinstance(patched, dict):
+                raise HTTPException(status_code=422, detail="Patch must result in an object")
+            for field in PROTECTED_FIELDS:
+                if patched.get(field) != session.get(field):
+                    raise HTTPException(status_code=422, detail=f"Field '{field}' cannot be patched")
+            changed = changed_paths(session, patched)
+            session.clear()
+            session.update(patched)
+        return {"id": session_id, "revision": session.get("revision", 0), "changed": changed}
+
+    if not isinstance(updates, dict):
+        raise HTTPException(status_code=400, detail="Body must be an object")
+    async with session_txn(session_id, request) as session:
+        # Merge-Logik für microfeedback
+        for key, value in updates.items():
+            if key == "revision":
+                continue
+            if key == "microfeedback":
+                if "microfeedback" not in session:
+                    session["microfeedback"] = {"P1": {"done": False, "text": ""}, "P2": {"done": False, "text": ""}, "P3": {"done": False, "text": ""}}
+                for phase, mf in value.items():
+                    if phase in session["microfeedback"]:
+                        session["microfeedback"][phase].update(mf)
+                    else:
+                        session["microfeedback"][phase] = mf
+            else:
+                session[key] = value
+    return mutation_response(session, request, {k: session.get(k) for k in updates if k != "revision"})
 
 @app.post("/api/sessions/{session_id}/checkins")
 async def save_checkin(session_id: str, checkin: CheckinData, request: Request):
     """Checkin speichern"""
-    req_id = uuid4().hex[:8]
-    phase_raw = checkin.phase
-    phase_norm = checkin.phase.strip().upper()
-    trace_id = request.headers.get("X-Trace-Id")
-    trace_action = request.headers.get("X-Trace-Action")
-    session_path = os.path.join(DATA_DIR, "sessions", f"{session_id}.json")
-    try:
-        session = load_json(session_path)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Session not found")
-    counts_before = Counter((c.get("phase") or "") for c in session.get("checkins", []))
-
-
-    # --- DEDUP checkins: keep newest per phase ---
-    dedup = {}
-    for c in session.get("checkins", []):
-        ph = (c.get("phase") or "").strip()
-        ts = c.get("timestamp") or ""
-        if ph not in dedup or ts > (dedup[ph].get("timestamp") or ""):
-            dedup[ph] = c
-    session["checkins"] = list(dedup.values())
-
-    # Check ob für diese Phase schon ein Checkin existiert (nach Cleanup)
-    existing = None
-    for c in session["checkins"]:
-        if c["phase"] == checkin.phase:
-            existing = c
-            break
-    action = "update" if existing else "append"
-    logging.info(f"[checkin:{req_id}] session={session_id} phase_raw={phase_raw!r} phase_norm={phase_norm!r} action={action} trace_id={trace_id} trace_action={trace_action} counts_before={dict(counts_before)}")
-
-    # Feedback und next_task nur im POST speichern!
-    is_post = checkin.phase == "POST"
-
-    if existing:
-        existing["answers"] = checkin.answers
-        if is_post:
-            if checkin.feedback is not None:
-                existing["feedback"] = checkin.feedback
-            if checkin.next_task is not None:
-                existing["next_task"] = checkin.next_task
-        else:
-            existing.pop("feedback", None)
-            existing.pop("next_task", None)
-        # Entferne jegliche micro/mini feedback Felder
-        existing.pop("mini_feedback", None)
-        existing.pop("micro_feedback", None)
-        existing.pop("microfeedback_done", None)
-        existing["timestamp"] = datetime.now().isoformat()
-    else:
-        checkin_data = {
-            "phase": checkin.phase,
-            "answers": checkin.answers,
-            "timestamp": datetime.now().isoformat()
-        }
-        if is_post:
-            if checkin.feedback is not None:
-                checkin_data["feedback"] = checkin.feedback
-            if checkin.next_task is not None:
-                checkin_data["next_task"] = checkin.next_task
-        # Entferne jegliche micro/mini feedback Felder
-        session["checkins"].append(checkin_data)
-
-    # Phase nur aktualisieren wenn es ein echter Checkin ist (nicht nur Speicherung)
-    # Für Continuation wird die Phase separat über die phase-Route aktualisiert
-
-    save_json(session_path, session)
+    async with session_txn(session_id, request) as session:
+        apply_checkin(session, checkin.phase, checkin.answers, checkin.feedback, checkin.next_task,
+                      trace_action=request.headers.get("X-Trace-Action"))
+
     counts_after = Counter((c.get("phase") or "") for c in session.get("checkins", []))
-    logging.info(f"[checkin:{req_id}] session={session_id} counts_after={dict(counts_after)}")
-    return session
+    logger.info("checkin saved", extra={"event": "checkin_saved", "session_id": session_id,
+                                        "counts_after": dict(counts_after)})
+    saved = next((c for c in session["checkins"] if c.get("phase") == checkin.phase), None)
+    return mutation_response(session, request, {"checkin": saved})
 
 @app.post("/api/sessions/{session_id}/post")
-async def complete_session(session_id: str, post: PostData):
+async def complete_session(session_id: str, post: PostData, request: Request):
     """Session abschließen"""
-    session_path = os.path.join(DATA_DIR, "sessions", f"{session_id}.json")
-    try:
-        session = load_json(session_path)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    session["post"] = {
-        "summary": post.summary,
-        "unclear": post.unclear,
-        "next_module": post.next_module,
-        "helpfulness": post.helpfulness,
-        "completed_at": datetime.now().isoformat()
-    }
-    session["state"] = "COMPLETED"
-
-    save_json(session_path, session)
-    return session
+    async with session_txn(session_id, request) as session:
+        session["post"] = {
+            "summary": post.summary,
+            "unclear": post.unclear,
+            "next_module": post.next_module,
+            "helpfulness": post.helpfulness,
+            "completed_at": datetime.now().isoformat()
+        }
+        session["state"] = "COMPLETED"
+    return mutation_response(session, request, {"post": session["post"]})
 
 @app.post("/api/sessions/{session_id}/abort")
-async def abort_session(session_id: str, abort: AbortData):
+async def abort_session(session_id: str, abort: AbortData, request: Request):
     """Session abbrechen"""
-    session_path = os.path.join(DATA_DIR, "sessions", f"{session_id}.json")
-    try:
-        session = load_json(session_path)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    session["abort"] = {
-        "reason": abort.reason,
-        "note": abort.note,
-        "aborted_at": datetime.now().isoformat()
-    }
-    session["state"] = "ABORTED"
-
-    save_json(session_path, session)
-    return session
+    async with session_txn(session_id, request) as session:
+        session["abort"] = {
+            "reason": abort.reason,
+            "note": abort.note,
+            "aborted_at": datetime.now().isoformat()
+        }
+        session["state"] = "ABORTED"
+    return mutation_response(session, request, {"abort": session["abort"]})
 
 @app.delete("/api/sessions/{session_id}/checkins/{checkin_index}")
-async def delete_checkin(session_id: str, checkin_index: int):
+async def delete_checkin(session_id: str, checkin_index: int, request: Request):
     """Checkin (Phase) löschen"""
-    session_path = os.path.join(DATA_DIR, "sessions", f"{session_id}.json")
-    try:
-        session = load_json(session_path)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    if checkin_index < 0 or checkin_index >= len(session.get("checkins", [])):
-        raise HTTPException(status_code=400, detail="Invalid checkin index")
-
-    session["checkins"].pop(checkin_index)
-    save_json(session_path, session)
-    return session
+    async with session_txn(session_id, request) as session:
+        if checkin_index < 0 or checkin_index >= len(session.get("checkins", [])):
+            raise HTTPException(status_code=400, detail="Invalid checkin index")
+        session["checkins"].pop(checkin_index)
+    return mutation_response(session, request, {"checkins": session["checkins"]})
 
 @app.delete("/api/sessions/{session_id}")
-async def delete_session(session_id: str):
+async def delete_session(session_id: str, request: Request):
     """Session löschen"""
-    sessions_dir = os.path.join(DATA_DIR, "sessions")
-    session_path = os.path.join(sessions_dir, f"{session_id}.json")
-    if not os.path.exists(session_path):
+    async with session_lock(session_id):
+        current = await asyncio.to_thread(session_store.load, session_id)
+        if current is not None and request.headers.get("if-match"):
+            check_revision(current, request)
+        try:
+            deleted = await asyncio.to_thread(session_store.delete, session_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to delete session: {e}")
+        if deleted and current is not None:
+            await asyncio.to_thread(session_stats.update, summarize(current), None)
+            await asyncio.to_thread(search_index.remove, session_id)
+            await asyncio.to_thread(answer_analytics.remove, session_id)
+            session_events.publish("session.deleted", current)
+    if not deleted:
         raise HTTPException(status_code=404, detail="Session not found")
-    try:
-        os.remove(session_path)
-        return {"status": "deleted", "id": session_id}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete session: {e}")
+    return {"status": "deleted", "id": session_id}
 
 @app.put("/api/sessions/{session_id}/drafts")
-async def save_drafts(session_id: str, drafts: dict):
+async def save_drafts(session_id: str, drafts: dict, request: Request):
     """Draft-Eingaben speichern für Session Continuation"""
-    session_path = os.path.join(DATA_DIR, "sessions", f"{session_id}.json")
-    try:
-        session = load_json(session_path)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    session["drafts"] = drafts
-    save_json(session_path, session)
-    return {"status": "saved"}
+    async with session_txn(session_id, request) as session:
+        apply_drafts(session, drafts)
+    return {"status": "saved", "revision": session.get("revision", 0)}
+
+@app.patch("/api/sessions/{session_id}/drafts")
+async def patch_drafts(session_id: str, request: Request, patch: Any = Body(...)):
+    """Drafts per Patch ändern (Default Merge-Patch, JSON Patch über Content-Type)"""
+    fmt = patch_format(request)
+    async with session_txn(session_id, request) as session:
+        old = session.get("drafts") or {}
+        new = apply_body_patch(old, patch, fmt)
+        if not isinstance(new, dict):
+            raise HTTPException(status_code=422, detail="Drafts must be an object")
+        changed = ["/drafts" + path for path in changed_paths(old, new)]
+        session["drafts"] = new
+    return {"id": session_id, "revision": session.get("revision", 0), "changed": changed}
 
 @app.put("/api/sessions/{session_id}/phase")
-async def update_session_phase(session_id: str, phase_data: dict):
+async def update_session_phase(session_id: str, phase_data: dict, request: Request):
     """Aktuelle Phase der Session aktualisieren"""
-    session_path = os.path.join(DATA_DIR, "sessions", f"{session_id}.json")
-    try:
-        session = load_json(session_path)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    if "phase" in phase_data:
-        session["current_phase"] = phase_data["phase"]
-    if "state" in phase_data:
-        session["state"] = phase_data["state"]
-
-    save_json(session_path, session)
-    return session
+    async with session_txn(session_id, request) as session:
+        apply_phase(session, phase_data)
+    return mutation_response(session, request)
 
 # Microfeedback-Endpoint muss nach app = FastAPI(...) deklariert werden
 
 @app.post("/api/sessions/{session_id}/microfeedback")
 async def add_microfeedback(session_id: str, data: MicroFeedbackData, request: Request):
     """Microfeedback für P1/P2/P3 speichern (Session-Block, nicht Checkin)"""
-    valid_phases = {"P1", "P2", "P3"}
-    phase = data.phase.strip().upper()
-    if phase not in valid_phases:
+    if data.phase.strip().upper() not in MICROFEEDBACK_PHASES:
         raise HTTPException(status_code=400, detail="Invalid phase for microfeedback")
-    session_path = os.path.join(DATA_DIR, "sessions", f"{session_id}.json")
-    try:
-        session = load_json(session_path)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Session not found")
-    if "microfeedback" not in session:
-        session["microfeedback"] = {p: {"done": False, "text": ""} for p in valid_phases}
-    session["microfeedback"][phase]["done"] = True
-    session["microfeedback"][phase]["text"] = data.text
-    session["microfeedback"][phase]["ts"] = datetime.now().isoformat()
-    # Logging
-    trace_id = request.headers.get("X-Trace-Id")
+    async with session_txn(session_id, request) as session:
+        block = apply_microfeedback(session, data.phase, data.text, request.headers.get("X-Trace-Action"))
+    return {"status": "ok", "revision": session.get("revision", 0), "microfeedback": block}
+
+BATCH_OPS = ("checkin", "phase", "microfeedback", "drafts")
+# Teilobjekt, das eine Batch-Operation ändert (für return=minimal); phase steckt schon im Kopf
+BATCH_FIELDS = {"checkin": "checkins", "microfeedback": "microfeedback", "drafts": "drafts"}
+
+class BatchRequest(BaseModel):
+    operations: List[dict]
+
+@app.post("/api/sessions/{session_id}/batch")
+async def batch_session(session_id: str, batch: BatchRequest, request: Request):
+    """Mehrere Änderungen (checkin, phase, microfeedback, drafts) der Reihe nach anwenden.
+
+    Ein Laden, ein Speichern, eine neue Revision. Schlägt eine Operation fehl,
+    wird nichts gespeichert (Fehler enthält den Index der Operation).
+    """
+    if not batch.operations:
+        raise HTTPException(status_code=400, detail="operations must not be empty")
     trace_action = request.headers.get("X-Trace-Action")
-    logging.info(f"[microfeedback] session={session_id} phase={phase} trace_id={trace_id} trace_action={trace_action} text_len={len(data.text)}")
-    save_json(session_path, session)
-    return {"status": "ok", "microfeedback": session["microfeedback"][phase]}
+    async with session_txn(session_id, request) as session:
+        for i, op in enumerate(batch.operations):
+            name = op.get("op")
+            try:
+                if name == "checkin":
+                    checkin = CheckinData(**{k: v for k, v in op.items() if k != "op"})
+                    apply_checkin(session, checkin.phase, checkin.answers, checkin.feedback, checkin.next_task,
+                                  trace_action=trace_action)
+                elif name == "phase":
+                    apply_phase(session, {k: v for k, v in op.items() if k in ("phase", "state")})
+                elif name == "microfeedback":
+                    data = MicroFeedbackData(**{k: v for k, v in op.items() if k != "op"})
+                    apply_microfeedback(session, data.phase, data.text, trace_action)
+                elif name == "drafts":
+                    if not isinstance(op.get("drafts"), dict):
+                        raise HTTPException(status_code=400, detail="drafts must be an object")
+                    apply_drafts(session, op["drafts"])
+                else:
+                    raise HTTPException(status_code=400, detail=f"Unknown operation {name!r}, expected one of {list(BATCH_OPS)}")
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail={"index": i, "op": name, "errors": e.errors()})
+            except HTTPException as e:
+                raise HTTPException(status_code=e.status_code, detail={"index": i, "op": name, "error": e.detail})
+    touched = {BATCH_FIELDS[op.get("op")] for op in batch.operations if op.get("op") in BATCH_FIELDS}
+    return mutation_response(session, request, {field: session.get(field) for field in sorted(touched)})
 
 
 # Auth Endpoints nach finaler app-Definition (jetzt immer registriert)
+_signup_lock = asyncio.Lock()
+
+async def run_bcrypt(coro):
+    """bcrypt im Worker-Pool; ist die Warteschlange voll, 503 statt Event-Loop-Stau"""
+    try:
+        return await coro
+    except HashPoolBusy:
+        raise HTTPException(status_code=503, detail="Auth busy, please retry", headers={"Retry-After": "1"})
+
 @app.post("/api/auth/signup")
 async def signup(payload: dict):
-    username = payload["username"].strip().lower()
+    username = _normalize_username(payload["username"])
     password = payload["password"].strip()
-    users = load_users()
-    if any(u["username"].strip().lower() == username for u in users["users"]):
+    if find_user(username):
         raise HTTPException(status_code=400, detail="User exists")
-    users["users"].append({
-        "username": username,
-        "password_hash": hash_password(password),
-        "created_at": datetime.utcnow().isoformat(),
-        "role": "user"
-    })
-    save_users(users)
-    print(f"[AUTH] signup ok user={username}")
+    password_hash = await run_bcrypt(hash_password_async(password))
+    async with _signup_lock:
+        # Während des Hashens könnte derselbe Name registriert worden sein
+        if find_user(username):
+            raise HTTPException(status_code=400, detail="User exists")
+        users = load_users()
+        save_users({**users, "users": users["users"] + [{
+            "username": username,
+            "password_hash": password_hash,
+            "created_at": datetime.utcnow().isoformat(),
+            "role": "user"
+        }]})
+    logger.info("signup ok", extra={"event": "auth_signup", "user": username})
     return {"ok": True}
 
 @app.post("/api/auth/login")
 async def login(payload: dict):
-    username = payload["username"].strip().lower()
+    username = _normalize_username(payload["username"])
     password = payload["password"].strip()
-    print(f"[AUTH] login attempt user={username} pw_len={len(password)}")
-    users = load_users()
-    user = next((u for u in users["users"] if u["username"].strip().lower() == username), None)
-    if not user or not verify_password(password, user["password_hash"]):
+    user = find_user(username)
+    if not user or not await run_bcrypt(verify_password_async(password, user["password_hash"])):
+        logger.info("login failed", extra={"event": "auth_login_failed", "user": username})
         raise HTTPException(status_code=401, detail="Invalid credentials")
     token = jwt.encode({
         "sub": username,
         "exp": (datetime.utcnow() + timedelta(days=JWT_EXP_DAYS)).timestamp()
     }, JWT_SECRET, algorithm=JWT_ALGO)
-    print(f"[AUTH] login ok user={username}")
+    logger.info("login ok", extra={"event": "auth_login", "user": username})
     return {"token": token, "username": username}
 
+@app.get("/api/auth/pool")
+async def auth_pool_stats():
+    """Auslastung des bcrypt-Worker-Pools"""
+    return bcrypt_pool.stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
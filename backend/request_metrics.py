@@ -0,0 +1,49 @@
+import time
+
+from academy.metrics import REGISTRY
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+REQUEST_SECONDS = REGISTRY.histogram("academy_http_request_duration_seconds", "Request latency per route",
+                                     ("method", "route"), LATENCY_BUCKETS)
+RESPONSE_BYTES = REGISTRY.histogram("academy_http_response_size_bytes", "Response body size per route (on the wire)",
+                                    ("method", "route"), SIZE_BUCKETS)
+REQUESTS = REGISTRY.counter("academy_http_requests_total", "Requests per route and status",
+                            ("method", "route", "status"))
+
+
+class RequestMetricsMiddleware:
+    """ASGI-Middleware: Latenz, Antwortgröße und Status je Route-Template erfassen.
+
+    Als Label dient der Pfad der gematchten Route (/api/sessions/{session_id}),
+    nicht die konkrete URL; nicht gematchte Pfade landen gesammelt unter "unmatched".
+    Die Zeit läuft bis zur letzten Body-Nachricht, Streams zählen also vollständig.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def wrapped_send(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            route = scope.get("route")
+            labels = {"method": scope["method"], "route": getattr(route, "path", None) or "unmatched"}
+            REQUEST_SECONDS.observe(time.perf_counter() - started, **labels)
+            RESPONSE_BYTES.observe(size, **labels)
+            REQUESTS.inc(status=str(status), **labels)
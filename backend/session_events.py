@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+import json
+import os
+from collections import deque
+from typing import Optional
+
+from academy.metrics import REGISTRY
+
+# Ereignisse der letzten Zeit für Wiederaufnahme per Last-Event-ID; Heartbeat hält Proxys offen
+EVENTS_BACKLOG = int(os.environ.get("ACADEMY_EVENTS_BACKLOG", "500"))
+EVENTS_HEARTBEAT = float(os.environ.get("ACADEMY_EVENTS_HEARTBEAT", "15"))
+EVENTS_QUEUE_SIZE = 100
+
+SUBSCRIBERS = REGISTRY.counter("academy_events_subscriptions_total", "SSE subscriptions opened", ("stream",))
+PUBLISHED = REGISTRY.counter("academy_events_published_total", "Session change events published", ("type",))
+DROPPED = REGISTRY.counter("academy_events_dropped_total", "Subscribers dropped because their queue was full")
+
+
+def changed_fields(base: Optional[dict], session: dict) -> list:
+    """Geänderte Top-Level-Felder (ohne revision)"""
+    if base is None:
+        return []
+    keys = (set(base) | set(session)) - {"revision"}
+    return sorted(k for k in keys if base.get(k) != session.get(k))
+
+
+class _Subscription:
+    def __init__(self, key):
+        self.key = key
+        self.queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class SessionEventBus:
+    """Verteilt Änderungs-Ereignisse an offene SSE-Verbindungen (nur innerhalb eines Prozesses).
+
+    Abonniert wird pro Session ("session", id) oder pro Nutzer ("user", name). Jedes
+    Ereignis trägt eine fortlaufende Nummer (SSE-id) und die Revision der Session;
+    die letzten EVENTS_BACKLOG Ereignisse werden für Last-Event-ID vorgehalten.
+    Läuft die Queue eines langsamen Clients voll, wird er getrennt und holt nach dem
+    Reconnect über den Backlog auf.
+    """
+
+    def __init__(self, backlog: int = EVENTS_BACKLOG):
+        self._subs = {}
+        self._backlog = deque(maxlen=backlog)
+        self._seq = itertools.count(1)
+
+    def publish(self, event_type: str, session: dict, changed=()):
+        """Ereignis an Session- und Nutzer-Abonnenten; nur aus dem Event-Loop aufrufen"""
+        event = {
+            "seq": next(self._seq),
+            "type": event_type,
+            "session_id": session.get("id"),
+            "user": session.get("user"),
+            "revision": session.get("revision", 0),
+            "state": session.get("state"),
+            "current_phase": session.get("current_phase"),
+            "changed": list(changed),
+        }
+        self._backlog.append(event)
+        PUBLISHED.inc(type=event_type)
+        for key in (("session", event["session_id"]), ("user", event["user"])):
+            for sub in list(self._subs.get(key, ())):
+                try:
+                    sub.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    sub.overflowed = True
+                    self._remove(sub)
+                    DROPPED.inc()
+        return event
+
+    def subscribe(self, key) -> _Subscription:
+        sub = _Subscription(key)
+        self._subs.setdefault(key, set()).add(sub)
+        SUBSCRIBERS.inc(stream=key[0])
+        return sub
+
+    def _remove(self, sub: _Subscription):
+        subs = self._subs.get(sub.key)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.key]
+
+    def unsubscribe(self, sub: _Subscription):
+        self._remove(sub)
+
+    def replay(self, key, last_id: int) -> list:
+        """Ereignisse nach last_id für key; None, wenn der Backlog nicht weit genug zurückreicht
+        (oder last_id aus einem früheren Prozess stammt)"""
+        if last_id > self.last_seq or (self._backlog and self._backlog[0]["seq"] > last_id + 1):
+            return None
+        field = "session_id" if key[0] == "session" else "user"
+        return [e for e in self._backlog if e["seq"] > last_id and e[field] == key[1]]
+
+    @property
+    def last_seq(self) -> int:
+        return self._backlog[-1]["seq"] if self._backlog else 0
+
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self._subs.values())
+
+
+def format_event(event: dict, event_type: Optional[str] = None) -> bytes:
+    lines = []
+    if "seq" in event:
+        lines.append(f"id: {event['seq']}")
+    lines.append(f"event: {event_type or event['type']}")
+    lines.append("data: " + json.dumps(event, ensure_ascii=False, separators=(",", ":")))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+async def event_stream(bus: SessionEventBus, key, request, hello: dict, last_id: Optional[int] = None):
+    """SSE-Generator: Begrüßung mit aktuellem Stand (bzw. verpasste Ereignisse), dann live.
+
+    hello["seq"] ist der Stand des Busses, bevor hello gebaut wurde. Abonniert wird vor
+    dem Replay, damit dazwischen nichts verloren geht; Duplikate filtert die Sequenznummer.
+    """
+    sub = bus.subscribe(key)
+    try:
+        yield b"retry: 3000\n\n"
+        if last_id is None:
+            yield format_event(hello, "hello")
+            last_id = hello["seq"]
+        sent = last_id
+        missed = bus.replay(key, last_id)
+        if missed is None:
+            # Lücke im Backlog: Client soll komplett neu laden
+            yield format_event(hello, "resync")
+            sent = hello["seq"]
+            missed = bus.replay(key, sent) or []
+        for event in missed:
+            sent = event["seq"]
+            yield format_event(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                if sub.overflowed or await request.is_disconnected():
+                    return
+                yield b": ping\n\n"
+                continue
+            if event["seq"] > sent:
+                sent = event["seq"]
+                yield format_event(event)
+            if sub.overflowed and sub.queue.empty():
+                return
+    finally:
+        bus.unsubscribe(sub)
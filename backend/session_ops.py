@@ -0,0 +1,105 @@
+import logging
+from collections import Counter
+from datetime import datetime
+
+from fastapi import HTTPException
+
+logger = logging.getLogger("academy.api")
+
+MICROFEEDBACK_PHASES = ("P1", "P2", "P3")
+
+# Änderungen an einer geladenen Session (in place). Werden von den Einzel-Endpunkten
+# und vom Batch-Endpunkt innerhalb von session_txn aufgerufen, speichern also nie selbst.
+
+def apply_checkin(session: dict, phase: str, answers: dict, feedback=None, next_task=None,
+                  trace_action=None) -> str:
+    """Checkin anlegen oder den vorhandenen der Phase ersetzen; liefert "append" bzw. "update" """
+    phase_norm = phase.strip().upper()
+    counts_before = Counter((c.get("phase") or "") for c in session.get("checkins", []))
+
+    # --- DEDUP checkins: keep newest per phase ---
+    dedup = {}
+    for c in session.get("checkins", []):
+        ph = (c.get("phase") or "").strip()
+        ts = c.get("timestamp") or ""
+        if ph not in dedup or ts > (dedup[ph].get("timestamp") or ""):
+            dedup[ph] = c
+    session["checkins"] = list(dedup.values())
+
+    # Check ob für diese Phase schon ein Checkin existiert (nach Cleanup)
+    existing = None
+    for c in session["checkins"]:
+        if c["phase"] == phase:
+            existing = c
+            break
+    action = "update" if existing else "append"
+    logger.info("checkin", extra={
+        "event": "checkin", "session_id": session.get("id"), "phase_raw": phase, "phase_norm": phase_norm,
+        "action": action, "trace_action": trace_action, "counts_before": dict(counts_before),
+    })
+
+    # Feedback und next_task nur im POST speichern!
+    is_post = phase == "POST"
+
+    if existing:
+        existing["answers"] = answers
+        if is_post:
+            if feedback is not None:
+                existing["feedback"] = feedback
+            if next_task is not None:
+                existing["next_task"] = next_task
+        else:
+            existing.pop("feedback", None)
+            existing.pop("next_task", None)
+        # Entferne jegliche micro/mini feedback Felder
+        existing.pop("mini_feedback", None)
+        existing.pop("micro_feedback", None)
+        existing.pop("microfeedback_done", None)
+        existing["timestamp"] = datetime.now().isoformat()
+    else:
+        checkin_data = {
+            "phase": phase,
+            "answers": answers,
+            "timestamp": datetime.now().isoformat()
+        }
+        if is_post:
+            if feedback is not None:
+                checkin_data["feedback"] = feedback
+            if next_task is not None:
+                checkin_data["next_task"] = next_task
+        session["checkins"].append(checkin_data)
+
+    # Phase nur aktualisieren wenn es ein echter Checkin ist (nicht nur Speicherung)
+    # Für Continuation wird die Phase separat über die phase-Route aktualisiert
+    return action
+
+
+def apply_phase(session: dict, phase_data: dict):
+    """Aktuelle Phase und/oder Status setzen"""
+    if "phase" in phase_data:
+        session["current_phase"] = phase_data["phase"]
+    if "state" in phase_data:
+        session["state"] = phase_data["state"]
+
+
+def apply_microfeedback(session: dict, phase: str, text: str, trace_action=None) -> dict:
+    """Microfeedback für P1/P2/P3 als erledigt speichern; liefert den Phasen-Block"""
+    phase = phase.strip().upper()
+    if phase not in MICROFEEDBACK_PHASES:
+        raise HTTPException(status_code=400, detail="Invalid phase for microfeedback")
+    if "microfeedback" not in session:
+        session["microfeedback"] = {p: {"done": False, "text": ""} for p in MICROFEEDBACK_PHASES}
+    block = session["microfeedback"].setdefault(phase, {"done": False, "text": ""})
+    block["done"] = True
+    block["text"] = text
+    block["ts"] = datetime.now().isoformat()
+    logger.info("microfeedback", extra={
+        "event": "microfeedback", "session_id": session.get("id"), "phase": phase,
+        "trace_action": trace_action, "text_len": len(text),
+    })
+    return block
+
+
+def apply_drafts(session: dict, drafts: dict):
+    """Drafts vollständig ersetzen"""
+    session["drafts"] = drafts
@@ -73,6 +73,29 @@ export interface Module {
 
 export type CurriculumModule = Module
 
+// Leichte Übersicht (GET /curriculum/outline): Drills nur mit ID/Titel/Typ
+export interface DrillSummary {
+  id: string
+  title: string
+  drill_type: string
+  description?: string
+}
+
+export interface OutlineModule extends Omit<Module, 'drills'> {
+  drill_count: number
+  drills: DrillSummary[]
+}
+
+export interface CurriculumOutline {
+  tracks: (Omit<Track, 'modules'> & { modules: OutlineModule[] })[]
+}
+
+// GET /curriculum/modules/{id}: alle Modulfelder, Drills ohne Didaktik/Config
+export interface ModuleDetail extends Omit<Module, 'drills'> {
+  track_id: string
+  drills: DrillSummary[]
+}
+
 export interface Drill {
   id: string
   title: string
@@ -142,6 +165,89 @@ export interface Session {
     }
   }
   observed_team?: string
+  revision?: number
+}
+
+export interface PatchResult {
+  id: string
+  revision: number
+  changed: string[]
+}
+
+// Treffer der Volltextsuche (GET /search); highlights sind [start, ende] im snippet
+export interface SearchResult {
+  id: string
+  score: number
+  user?: string
+  module_id?: string
+  created_at?: string
+  field?: string
+  snippet: string
+  highlights: [number, number][]
+}
+
+export interface SearchResponse {
+  total: number
+  took_ms: number
+  results: SearchResult[]
+}
+
+// Passende miniFeedback-Gruppen für Antworten (POST /drills/{id}/feedback)
+export interface DrillFeedback {
+  drill_id: string
+  trigger?: string
+  groups: { index: number; when: Record<string, string>; questions: string[] }[]
+  question: string | null
+  fallback: boolean
+}
+
+// Antwort bei Prefer: return=minimal (statt der ganzen Session)
+export interface MutationResult {
+  id: string
+  revision: number
+  state: string
+  current_phase?: string
+  [changed: string]: any
+}
+
+const MINIMAL = { Prefer: 'return=minimal' }
+
+export type BatchOperation =
+  | { op: 'checkin'; phase: string; answers: any; feedback?: string; next_task?: string }
+  | { op: 'phase'; phase?: string; state?: string }
+  | { op: 'microfeedback'; phase: 'P1' | 'P2' | 'P3'; text: string }
+  | { op: 'drafts'; drafts: Record<string, any> }
+
+export interface SessionStats {
+  user: string | null
+  total: number
+  completed: number
+  aborted: number
+  active: number
+  by_state: Record<string, number>
+  last_activity: string | null
+  completed_drills: string[]
+  completed_by_module: Record<string, number>
+  avg_confidence: number | null
+  avg_helpfulness: number | null
+}
+
+export interface ProgressCounts {
+  total: number
+  completed: number
+  aborted: number
+  active: number
+  last_activity: string | null
+}
+
+export interface ModuleProgress extends ProgressCounts {
+  last_session: { id: string; state: string; created_at?: string; abort_reason?: string | null } | null
+}
+
+export interface ProgressOverview {
+  user: string | null
+  modules: Record<string, ModuleProgress>
+  tracks: Record<string, ProgressCounts & { modules: number }>
 }
 
 export interface GameInfo {
@@ -202,6 +308,58 @@ const API_BASE = resolveApiBase()
 
 const buildUrl = (path: string) => `${API_BASE}${path}`
 
+// Live-Ereignis aus /sessions/{id}/events bzw. /events?user= (SSE)
+export interface SessionEvent {
+  seq: number
+  type: 'hello' | 'resync' | 'session.created' | 'session.updated' | 'session.deleted'
+  session_id?: string
+  user?: string
+  revision?: number
+  state?: string
+  current_phase?: string
+  changed?: string[]
+}
+
+// EventSource verbindet sich selbst neu und schickt dabei Last-Event-ID mit
+const subscribe = (path: string, onEvent: (event: SessionEvent) => void): (() => void) => {
+  if (typeof EventSource === 'undefined') return () => {}
+  const source = new EventSource(buildUrl(path))
+  const handler = (e: MessageEvent) => onEvent(JSON.parse(e.data))
+  for (const type of ['hello', 'resync', 'session.created', 'session.updated', 'session.deleted']) {
+    source.addEventListener(type, handler as EventListener)
+  }
+  return () => source.close()
+}
+
+// 409 bei If-Match: die Session hat inzwischen eine andere Revision (z.B. zweites Gerät)
+export class RevisionConflictError extends Error {
+  revision: number
+
+  constructor(revision: number) {
+    super('Revision conflict')
+    this.revision = revision
+  }
+}
+
+// JSON Merge Patch (RFC 7396), mit revision als If-Match
+const mergePatch = async (path: string, patch: Record<string, any>, revision: number | undefined, what: string): Promise<PatchResult> => {
+  const res = await fetch(buildUrl(path), {
+    method: 'PATCH',
+    headers: {
+      'Content-Type': 'application/merge-patch+json',
+      ...(revision !== undefined ? { 'If-Match': `"${revision}"` } : {}),
+      ...authHeaders()
+    },
+    body: JSON.stringify(patch)
+  })
+  if (res.status === 409) {
+    const body = await res.json().catch(() => null)
+    throw new RevisionConflictError(body?.detail?.revision ?? 0)
+  }
+  if (!res.ok) throw new Error(`Failed to patch ${what}`)
+  return res.json()
+}
+
 
 
 export interface Team {
@@ -218,6 +376,12 @@ export interface TeamsResponse {
 }
 
 export const api = {
+  subscribeSession: (sessionId: string, onEvent: (event: SessionEvent) => void) =>
+    subscribe(`/sessions/${encodeURIComponent(sessionId)}/events`, onEvent),
+
+  subscribeUser: (user: string, onEvent: (event: SessionEvent) => void) =>
+    subscribe(`/events?user=${encodeURIComponent(user)}`, onEvent),
+
   signup: signup,
   // Microfeedback: Session-Block, nicht Checkin
   addMicrofeedback: async (id: string, phase: 'P1'|'P2'|'P3', text: string): Promise<any> => {
@@ -265,6 +429,45 @@ export const api = {
     }
   },
 
+  // Übersicht/Details; ohne Backend aus dem vollständigen Curriculum (inkl. Fallback-Datei)
+  getCurriculumOutline: async (): Promise<CurriculumOutline> => {
+    try {
+      const res = await fetch(buildUrl('/curriculum/outline'))
+      if (!res.ok) throw new Error(`Failed to fetch curriculum outline (${res.status})`)
+      return await res.json()
+    } catch (err) {
+      const curriculum = await api.getCurriculum()
+      return {
+        tracks: curriculum.tracks.map(t => ({ ...t, modules: t.modules.map(m => ({ ...m, drill_count: m.drills.length })) }))
+      }
+    }
+  },
+
+  getCurriculumModule: async (moduleId: string): Promise<ModuleDetail> => {
+    const res = await fetch(buildUrl(`/curriculum/modules/${encodeURIComponent(moduleId)}`))
+    if (res.ok) return res.json()
+    if (res.status === 404) throw new Error('Module not found')
+    const curriculum = await api.getCurriculum()
+    for (const track of curriculum.tracks) {
+      const module = track.modules.find(m => m.id === moduleId)
+      if (module) return { ...module, track_id: track.id }
+    }
+    throw new Error('Module not found')
+  },
+
+  getCurriculumDrill: async (drillId: string, moduleId?: string): Promise<Drill> => {
+    const params = new URLSearchParams()
+    if (moduleId) params.append('module_id', moduleId)
+    const res = await fetch(buildUrl(`/curriculum/drills/${encodeURIComponent(drillId)}?${params}`))
+    if (res.ok) return res.json()
+    if (res.status === 404) throw new Error('Drill not found')
+    const curriculum = await api.getCurriculum()
+    const modules = curriculum.tracks.flatMap(t => t.modules).filter(m => !moduleId || m.id === moduleId)
+    const drill = modules.flatMap(m => m.drills).find(d => d.id === drillId)
+    if (!drill) throw new Error('Drill not found')
+    return drill
+  },
+
   // Sessions
   getSessions: async (user?: string, state?: string): Promise<Session[]> => {
     const params = new URLSearchParams()
@@ -279,6 +482,41 @@ export const api = {
     return res.json()
   },
 
+  getDrillFeedback: async (drillId: string, answers: Record<string, any>, moduleId?: string): Promise<DrillFeedback> => {
+    const res = await fetch(buildUrl(`/drills/${encodeURIComponent(drillId)}/feedback`), {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ answers, module_id: moduleId })
+    })
+    if (!res.ok) throw new Error('Failed to fetch drill feedback')
+    return res.json()
+  },
+
+  searchSessions: async (q: string, user?: string, module?: string): Promise<SearchResponse> => {
+    const params = new URLSearchParams({ q })
+    if (user) params.append('user', user)
+    if (module) params.append('module', module)
+    const res = await fetch(buildUrl(`/search?${params}`), { headers: { ...authHeaders() } })
+    if (!res.ok) throw new Error('Failed to search sessions')
+    return res.json()
+  },
+
+  getStats: async (user?: string): Promise<SessionStats> => {
+    const params = new URLSearchParams()
+    if (user) params.append('user', user)
+    const res = await fetch(buildUrl(`/stats?${params}`), { headers: { ...authHeaders() } })
+    if (!res.ok) throw new Error('Failed to fetch stats')
+    return res.json()
+  },
+
+  getProgress: async (user?: string): Promise<ProgressOverview> => {
+    const params = new URLSearchParams()
+    if (user) params.append('user', user)
+    const res = await fetch(buildUrl(`/progress?${params}`), { headers: { ...authHeaders() } })
+    if (!res.ok) throw new Error('Failed to fetch progress')
+    return res.json()
+  },
+
   createSession: async (data: { user: string; module_id: string; goal: string; confidence: number; focus?: string; session_method?: string; drill_id?: string; game_info?: GameInfo }): Promise<Session> => {
     const res = await fetch(buildUrl('/sessions'), {
       method: 'POST',
@@ -306,7 +544,7 @@ export const api = {
     return res.json()
   },
 
-  saveCheckin: async (id: string, data: { phase: string; answers: any; feedback?: string; next_task?: string; [key: string]: any }): Promise<Session> => {
+  saveCheckin: async (id: string, data: { phase: string; answers: any; feedback?: string; next_task?: string; [key: string]: any }): Promise<MutationResult> => {
     const trace = typeof crypto !== 'undefined' && crypto.randomUUID ? crypto.randomUUID() : String(Date.now());
     console.log("[saveCheckin]", { trace, sessionId: id, phase: data.phase, at: new Date().toISOString() });
     const headers: Record<string, string> = {
@@ -317,7 +555,7 @@ export const api = {
     };
     const res = await fetch(buildUrl(`/sessions/${encodeURIComponent(id)}/checkins`), {
       method: 'POST',
-      headers: { ...headers, ...authHeaders() },
+      headers: { ...headers, ...MINIMAL, ...authHeaders() },
       body: JSON.stringify(data)
     });
     if (!res.ok) throw new Error('Failed to save checkin');
@@ -334,20 +572,20 @@ export const api = {
     return res.json()
   },
 
-  completeSession: async (id: string, data: { summary: string; unclear?: string; next_module?: string; helpfulness: number }): Promise<Session> => {
+  completeSession: async (id: string, data: { summary: string; unclear?: string; next_module?: string; helpfulness: number }): Promise<MutationResult> => {
     const res = await fetch(buildUrl(`/sessions/${encodeURIComponent(id)}/post`), {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json', ...authHeaders() },
+      headers: { 'Content-Type': 'application/json', ...MINIMAL, ...authHeaders() },
       body: JSON.stringify(data)
     })
     if (!res.ok) throw new Error('Failed to complete session')
     return res.json()
   },
 
-  abortSession: async (id: string, data: { reason: string; note?: string }): Promise<Session> => {
+  abortSession: async (id: string, data: { reason: string; note?: string }): Promise<MutationResult> => {
     const res = await fetch(buildUrl(`/sessions/${encodeURIComponent(id)}/abort`), {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json', ...authHeaders() },
+      headers: { 'Content-Type': 'application/json', ...MINIMAL, ...authHeaders() },
       body: JSON.stringify(data)
     })
     if (!res.ok) throw new Error('Failed to abort session')
@@ -363,10 +601,10 @@ export const api = {
     return res.json()
   },
 
-  deleteCheckin: async (sessionId: string, checkinIndex: number): Promise<Session> => {
+  deleteCheckin: async (sessionId: string, checkinIndex: number): Promise<MutationResult> => {
     const res = await fetch(buildUrl(`/sessions/${encodeURIComponent(sessionId)}/checkins/${checkinIndex}`), {
       method: 'DELETE',
-      headers: { ...authHeaders() }
+      headers: { ...MINIMAL, ...authHeaders() }
     })
     if (!res.ok) {
       let detail = ''
@@ -390,21 +628,29 @@ export const api = {
     return res.json()
   },
 
-  // Update session phase for continuation
-  updateSessionPhase: async (sessionId: string, phaseData: {phase?: string, state?: string}): Promise<Session> => {
+  // Drafts per JSON Merge Patch: nur geänderte Felder senden, null löscht; 409 -> RevisionConflictError
+  patchDrafts: (sessionId: string, patch: Record<string, any>, revision?: number): Promise<PatchResult> =>
+    mergePatch(`/sessions/${encodeURIComponent(sessionId)}/drafts`, patch, revision, 'drafts'),
+
+  // Session-Felder per JSON Merge Patch; Antwort enthält nur Revision + geänderte Pfade
+  patchSession: (sessionId: string, patch: Record<string, any>, revision?: number): Promise<PatchResult> =>
+    mergePatch(`/sessions/${encodeURIComponent(sessionId)}`, patch, revision, 'session'),
+
+  // Mehrere Änderungen in einem Schreibvorgang (eine Revision)
+  batchSession: async (sessionId: string, operations: BatchOperation[], action = 'batch'): Promise<Session> => {
     const trace = typeof crypto !== 'undefined' && crypto.randomUUID ? crypto.randomUUID() : String(Date.now());
     const headers: Record<string, string> = {
       'Content-Type': 'application/json',
       'X-Trace-Id': trace,
-      'X-Trace-Action': 'updateSessionPhase',
-      'X-Client-Action': 'updateSessionPhase'
+      'X-Trace-Action': action,
+      'X-Client-Action': action
     };
-    const res = await fetch(buildUrl(`/sessions/${encodeURIComponent(sessionId)}/phase`), {
-      method: 'PUT',
+    const res = await fetch(buildUrl(`/sessions/${encodeURIComponent(sessionId)}/batch`), {
+      method: 'POST',
       headers: { ...headers, ...authHeaders() },
-      body: JSON.stringify(phaseData)
+      body: JSON.stringify({ operations })
     })
-    if (!res.ok) throw new Error('Failed to update session phase')
+    if (!res.ok) throw new Error('Failed to apply session batch')
     return res.json()
   },
 
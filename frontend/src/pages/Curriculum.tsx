@@ -2,14 +2,14 @@
 import { useQuery } from '@tanstack/react-query'
 import { useNavigate } from 'react-router-dom'
 import { api } from '../api'
-import type { CurriculumTrack, CurriculumModule } from '../api'
+import type { CurriculumOutline, OutlineModule } from '../api'
 import theoryData from '../data/theoryData.json'
 
 export default function Curriculum() {
   const navigate = useNavigate()
   const { data: curriculum, isLoading, error } = useQuery({
-    queryKey: ['curriculum'],
-    queryFn: () => api.getCurriculum()
+    queryKey: ['curriculum', 'outline'],
+    queryFn: () => api.getCurriculumOutline()
   })
 
   if (isLoading) return <div className="card">Lade Curriculum...</div>
@@ -19,13 +19,13 @@ export default function Curriculum() {
     <div style={{ display: 'flex', flexDirection: 'column', gap: '1.5rem' }}>
       <h1>Curriculum</h1>
 
-      {curriculum?.tracks.map((track: CurriculumTrack) => (
+      {curriculum?.tracks.map((track: CurriculumOutline['tracks'][number]) => (
         <div key={track.id} className="card">
           <h2>{track.title}</h2>
           <p style={{ wordWrap: 'break-word', overflowWrap: 'break-word' }}>{track.description}</p>
 
           <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fit, minmax(min(280px, 100%), 1fr))', gap: '1rem', marginTop: '1rem' }}>
-            {track.modules.map((module: CurriculumModule) => (
+            {track.modules.map((module: OutlineModule) => (
               <div key={module.id} style={{ border: '1px solid rgba(255,255,255,0.1)', padding: '1rem', borderRadius: '0.5rem', minWidth: 0, overflow: 'hidden' }}>
                 <h3 style={{ wordWrap: 'break-word', overflowWrap: 'break-word' }}>{module.title}</h3>
                 <p style={{ wordWrap: 'break-word', overflowWrap: 'break-word' }}>{module.summary}</p>
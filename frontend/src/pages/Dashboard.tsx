@@ -1,7 +1,7 @@
 import { useMemo, useEffect, useState } from "react";
-import { useQuery } from "@tanstack/react-query";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
 import { api } from "../api";
-import type { Session, Curriculum, Drill } from "../api";
+import type { Session, CurriculumOutline, DrillSummary } from "../api";
 import { useUser } from "../context/UserContext";
 
 export default function Dashboard() {
@@ -23,12 +23,25 @@ export default function Dashboard() {
     queryKey: ["sessions", user],
     queryFn: () => api.getSessions(user || undefined),
     enabled: Boolean(user),
+    // Aktualisierung kommt über den Ereignis-Stream statt per Refetch bei Fokus
+    refetchOnWindowFocus: false,
   });
 
-  // Curriculum laden, um alle Drills zu kennen
-  const { data: curriculum } = useQuery<Curriculum>({
-    queryKey: ["curriculum"],
-    queryFn: () => api.getCurriculum(),
+  const queryClient = useQueryClient();
+  useEffect(() => {
+    if (!user) return;
+    return api.subscribeUser(user, (event) => {
+      if (event.type === "hello") return;
+      queryClient.invalidateQueries({ queryKey: ["sessions", user] });
+      queryClient.invalidateQueries({ queryKey: ["stats", user] });
+      queryClient.invalidateQueries({ queryKey: ["progress", user] });
+    });
+  }, [user, queryClient]);
+
+  // Curriculum-Übersicht laden, um alle Drills zu kennen (ohne Didaktik/Config)
+  const { data: curriculum } = useQuery<CurriculumOutline>({
+    queryKey: ["curriculum", "outline"],
+    queryFn: () => api.getCurriculumOutline(),
     enabled: Boolean(user),
   });
 
@@ -128,7 +141,7 @@ export default function Dashboard() {
 
     // --- Drill-Fortschritt berechnen ---
     // 1. Alle Drills aus Curriculum extrahieren
-    let allDrills: Drill[] = [];
+    let allDrills: DrillSummary[] = [];
     if (curriculum) {
       allDrills = curriculum.tracks.flatMap((t) => t.modules.flatMap((m) => m.drills));
     }
@@ -27,6 +27,16 @@ export default function History() {
   const [filterModule, setFilterModule] = useState<string>('')
   const [filterStatus, setFilterStatus] = useState<string>('')
   const [filterCreator, setFilterCreator] = useState<string>('')
+  const [searchText, setSearchText] = useState<string>('')
+
+  // Volltextsuche im Backend (Notizen, Reflexionen, Microfeedback); erst ab 2 Zeichen
+  const searchQuery = searchText.trim()
+  const { data: searchResults } = useQuery({
+    queryKey: ['search', user, searchQuery, filterModule],
+    queryFn: () => api.searchSessions(searchQuery, user || undefined, filterModule || undefined),
+    enabled: Boolean(user) && searchQuery.length >= 2,
+    placeholderData: (previous) => previous
+  })
 
   if (!user) return <div className="card">Bitte oben im Login deinen Namen speichern, dann zeigen wir dir deine Session-Historie.</div>
   if (isLoading) return <div className="card">Lade Historie...</div>
@@ -40,13 +50,21 @@ export default function History() {
   }) || []
 
   // Nach Datum absteigend sortieren (neueste oben)
-  const sortedSessions = [...filteredSessions].sort((a, b) => {
+  let sortedSessions = [...filteredSessions].sort((a, b) => {
     // created_at kann string oder Date sein
     const dateA = new Date(a.created_at).getTime();
     const dateB = new Date(b.created_at).getTime();
     return dateB - dateA;
   });
 
+  // Bei aktiver Suche: nur Treffer, in Ranking-Reihenfolge
+  const hits = new Map((searchQuery.length >= 2 ? searchResults?.results ?? [] : []).map((r, i) => [r.id, { ...r, rank: i }]))
+  if (searchQuery.length >= 2 && searchResults) {
+    sortedSessions = sortedSessions
+      .filter(s => hits.has(s.id))
+      .sort((a, b) => hits.get(a.id)!.rank - hits.get(b.id)!.rank)
+  }
+
   const uniqueModules = [...new Set(sessions?.map(s => s.module_id) || [])]
   const uniqueCreators = [...new Set(sessions?.map(s => s.created_by).filter(Boolean) || [])]
 
@@ -57,6 +75,13 @@ export default function History() {
       {/* Filter */}
       <div className="card">
         <h3>Filter</h3>
+        <input
+          type="search"
+          value={searchText}
+          onChange={(e) => setSearchText(e.target.value)}
+          placeholder="In Notizen und Reflexionen suchen…"
+          style={{ width: '100%', padding: '0.4rem', marginBottom: '0.75rem' }}
+        />
         <div style={{ display: 'flex', gap: '1rem', alignItems: 'center', flexWrap: 'wrap' }}>
           <div>
             <label>Ersteller:</label>
@@ -112,16 +137,22 @@ export default function History() {
           </div>
         ) : (
           sortedSessions.map((session: Session) => (
-            <SessionCard
-              key={session.id}
-              session={{ ...session, observed_team: session.game_info?.observed_team }}
-              onDelete={(id) => deleteMutation.mutate(id)}
-              isDeletingId={
-                deleteMutation.isPending
-                  ? deleteMutation.variables
-                  : undefined
-              }
-            />
+            <div key={session.id}>
+              {hits.get(session.id)?.snippet && (
+                <div style={{ fontSize: '0.85rem', color: 'rgba(255,255,255,0.7)', marginBottom: '0.25rem' }}>
+                  „{hits.get(session.id)!.snippet}“
+                </div>
+              )}
+              <SessionCard
+                session={{ ...session, observed_team: session.game_info?.observed_team }}
+                onDelete={(id) => deleteMutation.mutate(id)}
+                isDeletingId={
+                  deleteMutation.isPending
+                    ? deleteMutation.variables
+                    : undefined
+                }
+              />
+            </div>
           ))
         )}
       </div>
@@ -1,56 +1,32 @@
 import { useQuery } from '@tanstack/react-query'
 import { api } from '../api'
-import type { Session } from '../api'
 import { useUser } from '../context/UserContext'
 
 export default function Progress() {
   const { user } = useUser()
-  const { data: sessions, isLoading, error } = useQuery({
-    queryKey: ['sessions', user],
-    queryFn: () => api.getSessions(user || undefined),
+  // Aggregate kommen fertig vom Server (/api/stats, /api/progress)
+  const { data: stats, isLoading, error } = useQuery({
+    queryKey: ['stats', user],
+    queryFn: () => api.getStats(user || undefined),
+    enabled: Boolean(user)
+  })
+
+  const { data: progressData } = useQuery({
+    queryKey: ['progress', user],
+    queryFn: () => api.getProgress(user || undefined),
     enabled: Boolean(user)
   })
 
   const { data: curriculum } = useQuery({
-    queryKey: ['curriculum'],
-    queryFn: () => api.getCurriculum()
+    queryKey: ['curriculum', 'outline'],
+    queryFn: () => api.getCurriculumOutline()
   })
 
   if (!user) return <div className="card">Bitte oben im Login deinen Namen speichern, dann können wir deinen Fortschritt anzeigen.</div>
   if (isLoading) return <div className="card">Lade Fortschritt...</div>
   if (error) return <div className="card">Fehler beim Laden: {(error as Error).message}</div>
 
-  // Berechne Fortschritt pro Modul
-  const moduleProgress = new Map<string, {
-    total: number
-    completed: number
-    aborted: number
-    lastSession?: Session
-  }>()
-
-  sessions?.forEach(session => {
-    if (!moduleProgress.has(session.module_id)) {
-      moduleProgress.set(session.module_id, {
-        total: 0,
-        completed: 0,
-        aborted: 0
-      })
-    }
-    const progress = moduleProgress.get(session.module_id)!
-    progress.total++
-
-    if (session.state === 'COMPLETED') {
-      progress.completed++
-    } else if (session.state === 'ABORTED') {
-      progress.aborted++
-    }
-
-    // Track letzte Session
-    if (!progress.lastSession ||
-        new Date(session.created_at) > new Date(progress.lastSession.created_at)) {
-      progress.lastSession = session
-    }
-  })
+  const moduleProgress = new Map(Object.entries(progressData?.modules || {}))
 
   const getModuleTitle = (moduleId: string) => {
     for (const track of curriculum?.tracks || []) {
@@ -76,10 +52,10 @@ export default function Progress() {
 
       <div className="card">
         <h2>Übersicht</h2>
-        <p><strong>Gesamt Sessions:</strong> {sessions?.length || 0}</p>
-        <p><strong>Abgeschlossen:</strong> {sessions?.filter(s => s.state === 'COMPLETED').length || 0}</p>
-        <p><strong>Abgebrochen:</strong> {sessions?.filter(s => s.state === 'ABORTED').length || 0}</p>
-        <p><strong>Aktiv:</strong> {sessions?.filter(s => s.state !== 'COMPLETED' && s.state !== 'ABORTED').length || 0}</p>
+        <p><strong>Gesamt Sessions:</strong> {stats?.total || 0}</p>
+        <p><strong>Abgeschlossen:</strong> {stats?.completed || 0}</p>
+        <p><strong>Abgebrochen:</strong> {stats?.aborted || 0}</p>
+        <p><strong>Aktiv:</strong> {stats?.active || 0}</p>
       </div>
 
       <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fit, minmax(300px, 1fr))', gap: '1rem' }}>
@@ -111,13 +87,13 @@ export default function Progress() {
 
             <p><strong>Abgebrochen:</strong> {progress.aborted}</p>
 
-            {progress.lastSession && (
+            {progress.last_session && (
               <div style={{ marginTop: '1rem', padding: '0.5rem', backgroundColor: 'rgba(255,255,255,0.05)', borderRadius: '5px' }}>
                 <p><strong>Letzte Session:</strong></p>
-                <p>{new Date(progress.lastSession.created_at).toLocaleDateString()}</p>
-                <p>Status: {progress.lastSession.state}</p>
-                {progress.lastSession.abort && (
-                  <p>Abbruch: {progress.lastSession.abort.reason}</p>
+                <p>{new Date(progress.last_session.created_at || progress.last_activity || '').toLocaleDateString()}</p>
+                <p>Status: {progress.last_session.state}</p>
+                {progress.last_session.abort_reason && (
+                  <p>Abbruch: {progress.last_session.abort_reason}</p>
                 )}
               </div>
             )}
@@ -1,9 +1,10 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { useParams, useNavigate } from 'react-router-dom'
-import { api } from '../api'
+import { api, RevisionConflictError } from '../api'
+import type { Session } from '../api'
 
 import { DrillRendererRouter } from '../components/DrillRendererRouter';
-import { useState, useEffect, useRef } from 'react'
+import { useState, useEffect, useRef, useCallback } from 'react'
 
 // Patch: Checkin type ohne microfeedback_done
 type CheckinWithMicro = {
@@ -14,6 +15,23 @@ type CheckinWithMicro = {
   [key: string]: any;
 };
 
+// Verzögerung für das Sichern der Drafts auf dem Server
+const DRAFT_SAVE_DELAY = 800
+
+// Merge-Patch für die Drafts einer Phase: geänderte Antworten, entfernte als null; null = nichts zu tun
+function draftPatch(saved: Record<string, any>, current: Record<string, any>): Record<string, any> | null {
+  const patch: Record<string, any> = {}
+  for (const [key, value] of Object.entries(current)) {
+    if (JSON.stringify(saved[key]) !== JSON.stringify(value)) patch[key] = value
+  }
+  for (const key of Object.keys(saved)) {
+    if (!(key in current)) patch[key] = null
+  }
+  return Object.keys(patch).length ? patch : null
+}
+
+const sameJson = (a: any, b: any) => JSON.stringify(a) === JSON.stringify(b)
+
 export default function SessionPage() {
   // Notizfeld für Session-Info
   const [sessionNote, setSessionNote] = useState<string>('')
@@ -37,6 +55,7 @@ export default function SessionPage() {
 
   const [showMicroModal, setShowMicroModal] = useState(false)
   const [microText, setMicroText] = useState('')
+  const [microQuestion, setMicroQuestion] = useState<string | null>(null)
   const [microFeedbackError, setMicroFeedbackError] = useState<string>('')
 
   // FIX: getrennte States für "Feedback gehört zu welcher Phase" und "wohin danach wechseln"
@@ -49,11 +68,44 @@ export default function SessionPage() {
   // Draft key pro Session+Phase (localStorage fallback)
   const draftKey = id ? `academy.session.${id}.phase.${currentPhase}` : null
 
+  // Stand auf dem Server: Revision (für If-Match) und zuletzt gesicherte Drafts je Phase
+  const revisionRef = useRef<number | undefined>(undefined)
+  const savedDraftsRef = useRef<Record<string, Record<string, any>>>({})
+
   const { data: session, isLoading, error } = useQuery({
     queryKey: ['session', id],
     queryFn: () => api.getSession(id!)
   })
 
+  // Live-Updates (z.B. zweites Gerät): nur neu laden, wenn die Revision neuer ist als der Cache
+  useEffect(() => {
+    if (!id) return
+    return api.subscribeSession(id, (event) => {
+      const cached = queryClient.getQueryData<Session>(['session', id])
+      if (event.type === 'hello' && cached && event.revision === cached.revision) return
+      if (event.type === 'session.updated' && cached && (event.revision ?? 0) <= (cached.revision ?? 0)) return
+      queryClient.invalidateQueries({ queryKey: ['session', id] })
+      if (event.type !== 'hello') queryClient.invalidateQueries({ queryKey: ['sessions'] })
+    })
+  }, [id, queryClient])
+
+  // Microfeedback-Frage vom Backend (kompilierte miniFeedback-Regeln); lokal nur als Fallback.
+  // Abhängig nur von Werten, die sich bei offenem Modal nicht ändern (kein Refetch pro Refresh)
+  const microDrillId = session?.drills?.[0]?.id
+  const microModuleId = session?.module_id
+  const microAnswers = answersByPhase[microPhase ?? currentPhase]
+  useEffect(() => {
+    if (!showMicroModal || !microDrillId) return
+    let cancelled = false
+    api.getDrillFeedback(microDrillId, microAnswers || {}, microModuleId)
+      .then(result => { if (!cancelled) setMicroQuestion(result.question) })
+      .catch(() => { if (!cancelled) setMicroQuestion(null) })
+    return () => {
+      cancelled = true
+      setMicroQuestion(null)
+    }
+  }, [showMicroModal, microDrillId, microModuleId, microAnswers])
+
   // Renderer switch based on moduleId (A1 = v1, else v2)
   // const moduleId = session?.module_id
 
@@ -74,11 +126,19 @@ export default function SessionPage() {
       firstLoadRef.current = false
     }
 
+    if (session.revision !== undefined && session.revision > (revisionRef.current ?? -1)) {
+      revisionRef.current = session.revision
+    }
+
     // NOTE: NICHT mehr stumpf [currentPhase] auf {} setzen, sonst verlierst du UI-State
-    // Wir laden nur, wenn es wirklich Daten gibt.
+    // Wir laden nur, wenn es wirklich Daten gibt (und nicht nur unser eigener Autosave zurückkommt).
     if (session.drafts && session.drafts[currentPhase]) {
-      setAnswersByPhase(prev => ({ ...prev, [currentPhase]: session.drafts?.[currentPhase] || {} }))
+      if (!sameJson(session.drafts[currentPhase], savedDraftsRef.current[currentPhase])) {
+        savedDraftsRef.current[currentPhase] = session.drafts[currentPhase]
+        setAnswersByPhase(prev => ({ ...prev, [currentPhase]: session.drafts?.[currentPhase] || {} }))
+      }
     } else {
+      delete savedDraftsRef.current[currentPhase]
       // wenn es schon lokale answers gibt: behalten
       setAnswersByPhase(prev => prev)
     }
@@ -96,9 +156,13 @@ export default function SessionPage() {
     if (!session) return;
 
     if (session.drafts && session.drafts[currentPhase]) {
-      setAnswersByPhase(prev => ({ ...prev, [currentPhase]: session.drafts?.[currentPhase] || {} }))
+      if (!sameJson(session.drafts[currentPhase], savedDraftsRef.current[currentPhase])) {
+        savedDraftsRef.current[currentPhase] = session.drafts[currentPhase]
+        setAnswersByPhase(prev => ({ ...prev, [currentPhase]: session.drafts?.[currentPhase] || {} }))
+      }
       return
     }
+    delete savedDraftsRef.current[currentPhase]
 
     // Fallback localStorage
     if (draftKey) {
@@ -119,6 +183,53 @@ export default function SessionPage() {
     }
   }, [answersByPhase, currentPhase, draftKey])
 
+  // Drafts auf dem Server sichern: nur die Änderungen seit dem letzten Sichern (JSON Merge Patch).
+  // Bei 409 (anderes Gerät hat geschrieben) Serverstand holen, Diff neu bilden, einmal wiederholen
+  const saveDraftPatch = useCallback(async (phase: Phase, answers: Record<string, any>) => {
+    const attempt = async (retried: boolean): Promise<void> => {
+      const saved = savedDraftsRef.current[phase] || {}
+      const patch = draftPatch(saved, answers)
+      if (!patch) return
+      savedDraftsRef.current[phase] = answers
+      try {
+        const result = await api.patchDrafts(id!, { [phase]: patch }, revisionRef.current)
+        revisionRef.current = result.revision
+      } catch (err) {
+        savedDraftsRef.current[phase] = saved
+        if (!(err instanceof RevisionConflictError) || retried) {
+          console.warn('[DRAFTS] autosave failed', err)
+          return
+        }
+        const fresh = await api.getSession(id!)
+        revisionRef.current = fresh.revision
+        savedDraftsRef.current[phase] = fresh.drafts?.[phase] || {}
+        await attempt(true)
+      }
+    }
+    await attempt(false)
+  }, [id])
+
+  const sessionLoaded = !!session
+  useEffect(() => {
+    if (!id || !sessionLoaded) return
+    const phase = currentPhase
+    const answers = answersByPhase[phase] || {}
+    const timer = setTimeout(() => { saveDraftPatch(phase, answers) }, DRAFT_SAVE_DELAY)
+    return () => clearTimeout(timer)
+  }, [answersByPhase, currentPhase, id, sessionLoaded, saveDraftPatch])
+
+  // Phase per Merge-Patch setzen; bei 409 einmal mit der aktuellen Revision wiederholen
+  const patchPhase = async (phase: string, revision = revisionRef.current) => {
+    try {
+      const result = await api.patchSession(id!, { current_phase: phase }, revision)
+      revisionRef.current = result.revision
+    } catch (err) {
+      if (!(err instanceof RevisionConflictError)) throw err
+      const result = await api.patchSession(id!, { current_phase: phase }, err.revision)
+      revisionRef.current = result.revision
+    }
+  }
+
   const clearDraft = () => {
     setAnswersByPhase(prev => ({ ...prev, [currentPhase]: {} }))
     if (draftKey) localStorage.removeItem(draftKey)
@@ -144,7 +255,7 @@ export default function SessionPage() {
   })
 
   const updatePhaseMutation = useMutation({
-    mutationFn: (phaseData: { phase?: string, state?: string }) => api.updateSessionPhase(id!, phaseData),
+    mutationFn: (phase: string) => patchPhase(phase),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['session', id] })
     }
@@ -221,6 +332,21 @@ export default function SessionPage() {
       const phase = currentPhase
       const next = nextPhaseMap[phase]
 
+      // 0) Ohne fälliges Microfeedback: Checkin + Phasenwechsel in einem Schreibvorgang
+      const cached = queryClient.getQueryData(["session", id]) as any
+      if (next && cached && !needsMicrofeedback(phase, cached, cached?.drills?.[0])) {
+        const updated: any = await api.batchSession(id as string, [
+          { op: 'checkin', phase, answers: answersByPhase[currentPhase] },
+          { op: 'phase', phase: next }
+        ], 'advancePhase')
+        queryClient.setQueryData(["session", id], updated)
+        setCurrentPhase(next)
+        setDrillCompleted(false)
+        const existingCheckin = updated?.checkins?.find((c: any) => c.phase === next) as CheckinWithMicro | undefined
+        setAnswersByPhase(prev => ({ ...prev, [next]: updated?.drafts?.[next] || existingCheckin?.answers || {} }))
+        return
+      }
+
       // 1) Checkin speichern
       await api.saveCheckin(id as string, {
         phase,
@@ -251,7 +377,7 @@ export default function SessionPage() {
 
       // 4) Phase updaten (ohne Modal)
       if (next) {
-        await api.updateSessionPhase(id as string, { phase: next })
+        await patchPhase(next, sessionObj?.revision)
         setCurrentPhase(next)
         setDrillCompleted(false)
 
@@ -291,7 +417,7 @@ export default function SessionPage() {
     if (prevPhase) {
       setCurrentPhase(prevPhase as Phase)
       setDrillCompleted(false)
-      updatePhaseMutation.mutate({ phase: prevPhase })
+      updatePhaseMutation.mutate(prevPhase)
 
       // Antworten für vorherige Phase laden (Draft oder Checkin)
       if (session?.drafts && session.drafts[prevPhase]) {
@@ -515,8 +641,8 @@ export default function SessionPage() {
       {/* Microfeedback Modal */}
       {showMicroModal && (() => {
         const drill = session?.drills?.[0]
-        let question = 'Bitte gib ein kurzes Feedback.'
-        if (drill && (drill as any).miniFeedback && Array.isArray((drill as any).miniFeedback.groups) && (drill as any).miniFeedback.groups.length > 0) {
+        let question = microQuestion || 'Bitte gib ein kurzes Feedback.'
+        if (!microQuestion && drill && (drill as any).miniFeedback && Array.isArray((drill as any).miniFeedback.groups) && (drill as any).miniFeedback.groups.length > 0) {
           const answers = answersByPhase[currentPhase] || {}
           let found = false
           for (const group of (drill as any).miniFeedback.groups) {
@@ -578,26 +704,29 @@ export default function SessionPage() {
                     if (!microPhase) return
 
                     try {
-                      // 1) Microfeedback für DIE Phase speichern, in der du gerade warst (P1/P2/P3)
-                      await api.addMicrofeedback(id!, microPhase as 'P1' | 'P2' | 'P3', microText.trim())
+                      // 1) Microfeedback für DIE Phase speichern, in der du gerade warst (P1/P2/P3),
+                      //    und direkt in die nächste Phase wechseln (ein Schreibvorgang)
+                      const next = pendingNextPhase
+                      const sessionFresh = await api.batchSession(id!, [
+                        { op: 'microfeedback', phase: microPhase as 'P1' | 'P2' | 'P3', text: microText.trim() },
+                        ...(next ? [{ op: 'phase' as const, phase: next }] : [])
+                      ], 'submitMicrofeedback')
+                      queryClient.setQueryData(["session", id], sessionFresh)
 
                       // 2) UI schließen
                       setShowMicroModal(false)
                       setMicroText('')
                       setMicroFeedbackError('')
 
-                      // 3) Jetzt Phase wechseln
-                      const next = pendingNextPhase
+                      // 3) Phase im UI wechseln
                       setMicroPhase(null)
                       setPendingNextPhase(null)
 
                       if (next) {
-                        await api.updateSessionPhase(id as string, { phase: next })
                         setCurrentPhase(next)
                         setDrillCompleted(false)
 
                         // answers für next laden (draft oder checkin), aber nix resetten
-                        const sessionFresh = await queryClient.fetchQuery({ queryKey: ["session", id] })
                         const sessionObj = sessionFresh as any
 
                         if (sessionObj?.drafts && sessionObj.drafts[next]) {
@@ -607,8 +736,6 @@ export default function SessionPage() {
                           setAnswersByPhase(prev => ({ ...prev, [next]: existingCheckin?.answers || {} }))
                         }
                       }
-
-                      await queryClient.invalidateQueries({ queryKey: ['session', id] })
                     } catch (err: any) {
                       setMicroFeedbackError(err?.message || 'Speichern fehlgeschlagen')
                     }
@@ -113,9 +113,17 @@ export default function SessionSetup() {
     localStorage.setItem(draftKey, JSON.stringify(draft))
   }, [draftKey, goal, confidence, league, teamHome, teamAway, selectedDrill, observedTeam])
 
-  const { data: curriculum } = useQuery({
-    queryKey: ['curriculum'],
-    queryFn: () => api.getCurriculum()
+  // Modul mit Drill-Liste; Didaktik erst für den gewählten Drill nachladen
+  const { data: currentModule } = useQuery({
+    queryKey: ['curriculum', 'module', moduleId],
+    queryFn: () => api.getCurriculumModule(moduleId!),
+    enabled: Boolean(moduleId)
+  })
+
+  const { data: selectedDrillDetail } = useQuery({
+    queryKey: ['curriculum', 'drill', moduleId, selectedDrill],
+    queryFn: () => api.getCurriculumDrill(selectedDrill, moduleId),
+    enabled: Boolean(moduleId && selectedDrill)
   })
 
   const { data: teamsResp } = useQuery({
@@ -143,9 +151,6 @@ export default function SessionSetup() {
   })
 
 
-  // Finde aktuelles Modul
-  const currentModule = curriculum?.tracks.flatMap(t => t.modules).find(m => m.id === moduleId)
-
   // Debug-Ausgaben: immer ganz oben, niemals nach einem return!
   useEffect(() => {
     console.log('SessionSetup Debug:', {
@@ -406,7 +411,7 @@ export default function SessionSetup() {
       )}
 
       {selectedDrill && (() => {
-        const drill = currentModule.drills.find(d => d.id === selectedDrill)
+        const drill = selectedDrillDetail?.id === selectedDrill ? selectedDrillDetail : undefined
         const didactics = drill?.didactics
         if (!didactics) return null
 
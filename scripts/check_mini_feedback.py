@@ -1,6 +1,13 @@
+import argparse
 import json
+import logging
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from academy.curriculum import CurriculumIndex
+
 # Path to curriculum.json
 CURRICULUM_PATH = Path(__file__).parent.parent / "data" / "academy" / "curriculum.json"
 
@@ -9,33 +16,30 @@ def load_curriculum():
         return json.load(f)
 
 def check_mini_feedback_consistency(curriculum):
-    errors = []
-    for track in curriculum.get("tracks", []):
-        for module in track.get("modules", []):
-            for drill in module.get("drills", []):
-                drill_id = drill.get("id", "<no id>")
-                config_questions = {q["key"]: q for q in drill.get("config", {}).get("questions", []) if "key" in q}
-                mini_feedback = drill.get("miniFeedback", {})
-                for group in mini_feedback.get("groups", []):
-                    when = group.get("when", {})
-                    for key, value in when.items():
-                        if key not in config_questions:
-                            errors.append(f"Drill {drill_id}: miniFeedback.when key '{key}' not in config.questions")
-                        else:
-                            options = config_questions[key].get("options")
-                            if options and value not in options:
-                                errors.append(f"Drill {drill_id}: miniFeedback.when value '{value}' not in options for key '{key}' ({options})")
-    return errors
+    # Gleiche Prüfung wie beim Laden im Backend (academy.feedback_rules)
+    return CurriculumIndex(curriculum).rule_problems
 
 def main():
+    parser = argparse.ArgumentParser(description="miniFeedback-Bedingungen gegen config.questions prüfen")
+    parser.add_argument("--strict", action="store_true",
+                        help="Werte, die erst nach Normalisierung (Groß/klein, Umlaute, _) einer Option "
+                             "entsprechen, als Fehler statt als Warnung melden")
+    args = parser.parse_args()
+    # Probleme werden unten gesammelt ausgegeben, nicht zusätzlich über das Logging
+    logging.getLogger("academy.curriculum").setLevel(logging.CRITICAL)
     curriculum = load_curriculum()
-    errors = check_mini_feedback_consistency(curriculum)
-    if errors:
+    problems = check_mini_feedback_consistency(curriculum)
+    if args.strict:
+        # Das Backend matcht diese Werte zwar, im Curriculum sollen sie aber exakt stimmen
+        problems = [{**p, "level": "error"} for p in problems]
+    errors = [p for p in problems if p["level"] == "error"]
+    if problems:
         print("Inkonsistenzen gefunden:")
-        for err in errors:
-            print("-", err)
+        for problem in problems:
+            print("-", f"[{problem['level']}]", problem["message"])
     else:
         print("Alle miniFeedback-Gruppen sind konsistent mit config.questions.")
+    sys.exit(1 if errors else 0)
 
 if __name__ == "__main__":
     main()
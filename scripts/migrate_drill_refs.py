@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from academy.session_store import DATA_DIR, get_session_store
+from academy.drill_snapshots import DrillSnapshotStore, dehydrate
+
+def main():
+    parser = argparse.ArgumentParser(description="Eingebettete Drills in Sessions durch Referenzen ersetzen")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    store = get_session_store(args.data_dir)
+    snapshots = DrillSnapshotStore(os.path.join(args.data_dir, "drill_snapshots"))
+    size_before = size_after = changed = 0
+    for session_id in store.ids():
+        session = store.load(session_id)
+        if session is None:
+            continue
+        path = store.path_of(session_id) if hasattr(store, "path_of") else None
+        if path and os.path.exists(path):
+            size_before += os.path.getsize(path)
+        if dehydrate(session, snapshots):
+            changed += 1
+            if not args.dry_run:
+                store.save(session)
+        if path and os.path.exists(path):
+            size_after += os.path.getsize(path)
+
+    print(f"{changed} Sessions umgestellt.")
+    if size_before:
+        print(f"Session-Dateien: {size_before} -> {size_after} Bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from academy.session_store import DATA_DIR, get_session_store, migrate
+
+def main():
+    parser = argparse.ArgumentParser(description="Sessions zwischen Storage-Backends migrieren")
+    parser.add_argument("--from", dest="source", default="json", choices=["json", "sqlite"])
+    parser.add_argument("--to", dest="target", default="sqlite", choices=["json", "sqlite"])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args()
+    if args.source == args.target:
+        parser.error("--from und --to müssen verschieden sein")
+
+    source = get_session_store(args.data_dir, args.source)
+    target = get_session_store(args.data_dir, args.target)
+    count = migrate(source, target)
+    print(f"{count} Sessions von {args.source} nach {args.target} migriert.")
+    print(f"Zum Umschalten: ACADEMY_SESSION_STORE={args.target}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import argparse
+import gzip
+import http.client
+import json
+import math
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from academy.session_store import DATA_DIR
+
+# Uvicorn-Zugriffszeile: INFO:     127.0.0.1:50911 - "GET /api/curriculum HTTP/1.1" 200 OK
+ACCESS_LINE = re.compile(r'"(GET|POST|PUT|PATCH|DELETE|OPTIONS) (/api/[^ "]*) HTTP/[\d.]+" (\d{3})')
+SESSION_PATH = re.compile(r'^/api/sessions/([^/?]+)(/.*)?$')
+BENCH_USER = "bench"
+BENCH_PASSWORD = "bench-password"
+
+
+def route_of(method, path):
+    """Route-Template für die Auswertung (/api/sessions/{id}/drafts statt konkreter ID)"""
+    path = path.split("?", 1)[0]
+    match = SESSION_PATH.match(path)
+    if match:
+        rest = re.sub(r"/\d+$", "/{index}", match.group(2) or "")
+        path = "/api/sessions/{id}" + rest
+    return f"{method} {path}"
+
+
+def parse_log(paths):
+    """Zugriffszeilen in Szenarien zerlegen; jedes POST /api/sessions beginnt ein neues Szenario"""
+    scenarios, current = [], []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                match = ACCESS_LINE.search(line)
+                if not match:
+                    continue
+                method, target, status = match.group(1), match.group(2), int(match.group(3))
+                if method == "POST" and target.split("?", 1)[0] == "/api/sessions" and current:
+                    scenarios.append(current)
+                    current = []
+                current.append((method, target, status))
+    if current:
+        scenarios.append(current)
+    return scenarios
+
+
+class Replayer:
+    """Spielt Szenarien gegen eine laufende Instanz ab und sammelt Latenzen je Route.
+
+    Bodies stehen nicht im Log und werden pro Route synthetisiert. Session-IDs aus
+    dem Log werden auf die im Szenario neu angelegte Session abgebildet, solange
+    sie in der Datenkopie nicht existieren.
+    """
+
+    def __init__(self, base_url, token, module_id, drill_id, known_ids):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.token = token
+        self.module_id = module_id
+        self.drill_id = drill_id
+        self.known_ids = known_ids
+        self.samples = {}
+        self.errors = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return conn
+
+    def request(self, method, path, body=None, headers=None):
+        headers = {"Accept-Encoding": "gzip", "Authorization": f"Bearer {self.token}", **(headers or {})}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        for attempt in (0, 1):
+            conn = self._conn()
+            try:
+                started = time.perf_counter()
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+                seconds = time.perf_counter() - started
+                if response.getheader("Content-Encoding") == "gzip":
+                    payload = gzip.decompress(payload)
+                return response.status, payload, seconds
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+    def record(self, route, status, seconds):
+        with self._lock:
+            self.samples.setdefault(route, []).append(seconds)
+            if status >= 400:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def body_for(self, method, route, n):
+        if route == "POST /api/sessions":
+            return {"user": BENCH_USER, "module_id": self.module_id, "goal": "Benchmark",
+                    "confidence": 3, "drill_id": self.drill_id}
+        if route.endswith("/checkins"):
+            return {"phase": "P1", "answers": {"note": f"Replay {n}"}}
+        if route.endswith("/drafts"):
+            return {"P1": {"note": f"Entwurf {n}"}} if method == "PUT" else {"P1": {"n": n}}
+        if route.endswith("/phase"):
+            return {"phase": ("P1", "P2", "P3")[n % 3]}
+        if route.endswith("/microfeedback"):
+            return {"phase": "P1", "text": f"Replay {n}"}
+        if route.endswith("/post"):
+            return {"summary": "Benchmark", "helpfulness": 4}
+        if route.endswith("/abort"):
+            return {"reason": "other", "note": "Benchmark"}
+        if route == "PATCH /api/sessions/{id}":
+            return {"focus": f"replay-{n}"}
+        if route == "POST /api/auth/login":
+            return {"username": BENCH_USER, "password": BENCH_PASSWORD}
+        if route == "POST /api/auth/signup":
+            return {"username": f"bench-{uuid.uuid4().hex[:12]}", "password": BENCH_PASSWORD}
+        return None
+
+    def run_scenario(self, scenario):
+        session_id = None
+        for n, (method, target, _) in enumerate(scenario):
+            route = route_of(method, target)
+            match = SESSION_PATH.match(target.split("?", 1)[0])
+            target_id = None
+            if match:
+                original = match.group(1)
+                target_id = original if original in self.known_ids else session_id
+                if target_id is None:
+                    continue
+                target = target.replace(f"/api/sessions/{original}", f"/api/sessions/{target_id}", 1)
+            if "user=" in target:
+                target = target.split("?", 1)[0] + "?" + urlencode({"user": BENCH_USER})
+            headers = None
+            if method == "OPTIONS":
+                headers = {"Origin": "http://localhost:5173", "Access-Control-Request-Method": "PUT"}
+            status, payload, seconds = self.request(method, target, self.body_for(method, route, n), headers)
+            self.record(route, status, seconds)
+            if route == "POST /api/sessions" and status == 200:
+                session_id = json.loads(payload)["id"]
+            elif route == "DELETE /api/sessions/{id}" and target_id == session_id:
+                session_id = None
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def report(replayer, wall):
+    rows = []
+    total = 0
+    for route, values in sorted(replayer.samples.items(), key=lambda kv: -len(kv[1])):
+        values.sort()
+        total += len(values)
+        rows.append({
+            "route": route,
+            "count": len(values),
+            "errors": replayer.errors.get(route, 0),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "rps": round(len(values) / wall, 1) if wall else 0.0,
+        })
+    return {"requests": total, "seconds": round(wall, 3), "rps": round(total / wall, 1) if wall else 0.0, "routes": rows}
+
+
+def print_report(result):
+    print(f"{'Route':<48} {'n':>6} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for row in result["routes"]:
+        print(f"{row['route']:<48} {row['count']:>6} {row['errors']:>5} {row['p50_ms']:>8} "
+              f"{row['p95_ms']:>8} {row['p99_ms']:>8} {row['rps']:>8}")
+    print(f"Gesamt: {result['requests']} Requests in {result['seconds']} s ({result['rps']} req/s)")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_dir, workdir, port):
+    env = {**os.environ, "ACADEMY_DATA_DIR": data_dir}
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(ROOT / "backend"),
+           "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=workdir, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit("Backend konnte nicht gestartet werden")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("Backend antwortet nicht auf /api/health")
+
+
+def bench_token(base_url):
+    """Benchmark-Nutzer in der Datenkopie anlegen und einloggen"""
+    parts = urlsplit(base_url)
+    for path in ("/api/auth/signup", "/api/auth/login"):
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        conn.request("POST", path, body=json.dumps({"username": BENCH_USER, "password": BENCH_PASSWORD}),
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        payload = response.read()
+    if response.status != 200:
+        raise SystemExit(f"Login fehlgeschlagen: {response.status} {payload[:200]!r}")
+    return json.loads(payload)["token"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zugriffe aus backend.log gegen eine Kopie der Daten abspielen")
+    parser.add_argument("--log", action="append", help="Log-Datei(en), Default backend/backend.log")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Quelle der Datenkopie")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1, help="Szenarien n-mal abspielen")
+    parser.add_argument("--limit", type=int, help="nur die ersten n Szenarien")
+    parser.add_argument("--json", help="Ergebnis zusätzlich als JSON speichern (Vergleich zwischen Läufen)")
+    args = parser.parse_args()
+
+    scenarios = parse_log(args.log or [str(ROOT / "backend" / "backend.log")])
+    if args.limit:
+        scenarios = scenarios[:args.limit]
+    scenarios = scenarios * args.repeat
+    if not scenarios:
+        raise SystemExit("Keine Zugriffszeilen gefunden")
+
+    with tempfile.TemporaryDirectory(prefix="academy-bench-") as tmp:
+        data_dir = os.path.join(tmp, "academy")
+        shutil.copytree(args.data_dir, data_dir)
+        sessions_dir = os.path.join(data_dir, "sessions")
+        # Altbestand liegt flach in sessions/, neue Sessions in sessions/<user>/<yyyy-mm>/
+        known_ids = {name[:-5] for _, _, files in os.walk(sessions_dir) for name in files if name.endswith(".json")}
+        with open(os.path.join(data_dir, "curriculum.json"), "r", encoding="utf-8") as f:
+            module = json.load(f)["tracks"][0]["modules"][0]
+        drill_id = (module.get("drills") or [{}])[0].get("id")
+
+        port = free_port()
+        proc = start_server(data_dir, tmp, port)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            replayer = Replayer(base_url, bench_token(base_url), module["id"], drill_id, known_ids)
+            print(f"{len(scenarios)} Szenarien, {sum(map(len, scenarios))} Requests, Concurrency {args.concurrency}")
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                for _ in pool.map(replayer.run_scenario, scenarios):
+                    pass
+            wall = time.perf_counter() - started
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    result = report(replayer, wall)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import itertools
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+# academy-Paket aus dem Repo-Root, Backend-Module (main, session_ops, ...) flach wie beim Start aus backend/
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+DATA_FILES = ("curriculum.json", "teams.json", "users.json")
+_legacy_ids = itertools.count(1700000000)
+
+
+@pytest.fixture(scope="session")
+def data_dir(tmp_path_factory):
+    """Temporäre Datenablage mit Curriculum/Teams/Nutzern aus dem Repo, ohne Sessions"""
+    path = tmp_path_factory.mktemp("academy")
+    for name in DATA_FILES:
+        shutil.copy(os.path.join(ROOT, "data", "academy", name), path / name)
+    (path / "sessions").mkdir()
+    return path
+
+
+@pytest.fixture(scope="session")
+def main(data_dir):
+    """Backend-Modul gegen die temporäre Datenablage (JSON-Store, ohne Write-Behind)"""
+    os.environ.update({
+        "ACADEMY_DATA_DIR": str(data_dir),
+        "ACADEMY_SESSION_STORE": "json",
+        "ACADEMY_SESSION_JOURNAL": "0",
+        "ACADEMY_WRITE_BEHIND": "0",
+        "ACADEMY_LOG_FILE": str(data_dir / "backend.log"),
+        "ACADEMY_LOG_STDOUT": "0",
+        "ACADEMY_JWT_SECRET": "test-secret-" + "x" * 32,
+    })
+    import main as backend_main
+    return backend_main
+
+
+@pytest.fixture
+def client(main):
+    from fastapi.testclient import TestClient
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def legacy_session(data_dir):
+    """Session im Altformat (flach in sessions/, ohne revision)"""
+    def make(**fields):
+        session_id = f"legacy_{next(_legacy_ids)}"
+        session = {"id": session_id, "user": "legacy", "module_id": "A1", "drill_id": "A1_D1",
+                   "state": "IN_PROGRESS", "current_phase": "P1", "created_at": "2026-01-01T10:00:00",
+                   "checkins": [], "drafts": {"P1": {"center_mostly": "low"}}, **fields}
+        with open(data_dir / "sessions" / f"{session_id}.json", "w", encoding="utf-8") as f:
+            json.dump(session, f)
+        return session_id
+
+    return make
+
+
+@pytest.fixture
+def auth(main):
+    """Authorization-Header für einen Nutzer"""
+    import jwt
+    return lambda user: {"Authorization": "Bearer " + jwt.encode({"sub": user}, main.JWT_SECRET, algorithm=main.JWT_ALGO)}
+
+
+@pytest.fixture
+def new_session(client, auth):
+    """Session über die API anlegen (aktuelles Format, im Index)"""
+    def make(user, module_id="A1", drill_id="A1_D1", **fields):
+        payload = {"user": user, "module_id": module_id, "drill_id": drill_id, "goal": "Test", "confidence": 3, **fields}
+        r = client.post("/api/sessions", json=payload, headers=auth(user))
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    return make
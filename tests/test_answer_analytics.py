@@ -0,0 +1,98 @@
+import pytest
+
+from academy import answer_analytics
+from academy.answer_analytics import AnswerAnalytics
+from academy.curriculum import CurriculumIndex
+from academy.session_ids import new_session_id
+from academy.session_store import JsonSessionStore
+
+# Zwei Drills mit derselben Frage (Key "pace"), aber unterschiedlichen Optionen
+CURRICULUM = {"tracks": [{"id": "T", "modules": [{"id": "M", "drills": [
+    {"id": "D1", "config": {"questions": [{"key": "pace", "label": "Tempo", "options": ["slow", "fast"]},
+                                          {"key": "note", "label": "Notiz"}]}},
+    {"id": "D2", "config": {"questions": [{"key": "pace", "label": "Tempo", "options": ["low", "mid", "high"]}]}},
+]}]}]}
+
+
+@pytest.fixture(params=["numpy", "python"])
+def counting(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(answer_analytics, "np", None)
+    return request.param
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JsonSessionStore(str(tmp_path / "sessions"))
+
+
+@pytest.fixture
+def analytics(store):
+    index = CurriculumIndex(CURRICULUM)
+    return AnswerAnalytics(store, lambda: index)
+
+
+def session(drill_id="D1", user="anna", team="EHC", checkins=(), **fields):
+    return {"id": new_session_id(), "user": user, "module_id": "M", "drill_id": drill_id,
+            "observed_team": team, "created_at": "2026-01-01T10:00:00",
+            "checkins": [{"phase": phase, "answers": answers, "timestamp": f"2026-01-01T10:0{n}:00"}
+                         for n, (phase, answers) in enumerate(checkins)], **fields}
+
+
+def counts(result, drill_id, key="pace"):
+    question = next(q for q in result["questions"] if q["drill_id"] == drill_id and q["key"] == key)
+    return dict(zip(question["values"], question["counts"]))
+
+
+def test_first_scan_counts_stored_sessions(store, analytics, counting):
+    store.save(session(checkins=[("P1", {"pace": "fast", "note": "frei"}), ("P2", {"pace": "slow"})]))
+    store.save(session(user="ben", checkins=[("P1", {"pace": "Fast "})]))
+    result = analytics.answers()
+    assert result["numpy"] is (counting == "numpy")
+    assert result["sessions"] == 2
+    assert counts(result, "D1") == {"slow": 1, "fast": 2}
+    assert [q["key"] for q in result["questions"]] == ["pace"]
+
+
+def test_filters_and_cross_tables(store, analytics, counting):
+    store.save(session(checkins=[("P1", {"pace": "fast"}), ("P2", {"pace": "slow"})]))
+    store.save(session(user="ben", team="KEC", checkins=[("P1", {"pace": "fast"})]))
+    assert counts(analytics.answers(user="ben"), "D1") == {"slow": 0, "fast": 1}
+    assert analytics.answers(team="unknown")["questions"] == []
+    question = analytics.answers(by=("phase",))["questions"][0]
+    assert question["by"]["phase"] == {"values": ["P1", "P2"], "counts": [[0, 2], [1, 0]]}
+    with pytest.raises(ValueError):
+        analytics.answers(by=("colour",))
+
+
+def test_incremental_update_and_remove(store, analytics, counting):
+    first = session(checkins=[("P1", {"pace": "fast"})])
+    store.save(first)
+    assert counts(analytics.answers(), "D1") == {"slow": 0, "fast": 1}
+    changed = {**first, "checkins": [{"phase": "P1", "answers": {"pace": "slow"}, "timestamp": "2026-01-01T11:00:00"}]}
+    store.save(changed)
+    analytics.update(changed)
+    second = session(checkins=[("P1", {"pace": "sehr schnell"})])
+    store.save(second)
+    analytics.update(second)
+    result = analytics.answers()
+    assert counts(result, "D1") == {"slow": 1, "fast": 0, "sehr schnell": 1}
+    analytics.remove(first["id"])
+    assert counts(analytics.answers(), "D1") == {"slow": 0, "fast": 0, "sehr schnell": 1}
+    analytics.rebuild()
+    assert counts(analytics.answers(), "D1") == {"slow": 1, "fast": 0, "sehr schnell": 1}
+
+
+def test_module_wide_session_counts_for_the_recorded_drill(store, analytics, counting):
+    # Ohne drill_id: Antworten gehören zum Drill an progress.current_drill_index
+    store.save(session(drill_id=None, drill_refs=[{"id": "D1"}, {"id": "D2"}],
+                       progress={"current_drill_index": 1}, checkins=[("P1", {"pace": "mid"})]))
+    second = session(drill_id=None, drill_refs=[{"id": "D1"}, {"id": "D2"}], checkins=[("P1", {"pace": "slow"})])
+    second["checkins"].append({"phase": "P2", "drill_id": "D2", "answers": {"pace": "high"},
+                               "timestamp": "2026-01-01T10:05:00"})
+    store.save(second)
+    result = analytics.answers(module_id="M")
+    assert counts(result, "D1") == {"slow": 1, "fast": 0}
+    assert counts(result, "D2") == {"low": 0, "mid": 1, "high": 1}
@@ -0,0 +1,51 @@
+from academy.feedback_rules import FeedbackRules, parse_condition
+
+DRILL = {
+    "id": "D1",
+    "config": {"questions": [
+        {"key": "timing", "options": ["zu früh", "passend", "zu spät"]},
+        {"key": "side", "options": ["links", "rechts"]},
+    ]},
+    "miniFeedback": {"groups": [
+        {"when": {"timing": "zu früh"}, "questions": ["Warum so früh?"]},
+        {"when": {"timing": "zu_spaet", "side": "links"}, "questions": ["Was hat links gebremst?"]},
+        {"when": {"unknown": "x"}, "questions": ["nie"]},
+        {"questions": ["Allgemein?"]},
+    ]},
+}
+
+
+def test_problem_levels():
+    problems = {(p["group"], p["level"]) for p in FeedbackRules(DRILL).problems}
+    assert problems == {(1, "warning"), (2, "error")}
+
+
+def test_match_uses_all_conditions():
+    rules = FeedbackRules(DRILL)
+    assert [i for i, _ in rules.match({"timing": "zu früh"})] == [0, 3]
+    assert [i for i, _ in rules.match({"timing": "Zu spät", "side": "links"})] == [1, 3]
+    assert [i for i, _ in rules.match({"timing": "zu spät", "side": "rechts"})] == [3]
+    assert rules.question_for({"timing": "zu früh"}) == ("Warum so früh?", False)
+    assert rules.question_for({}) == ("Allgemein?", False)
+
+
+def test_parse_condition():
+    assert parse_condition("center == 'low'")({"center": "low"})
+    assert not parse_condition("center == 'low'")({"center": "high"})
+    assert parse_condition("rating <= 2")({"rating": 2})
+    assert not parse_condition("rating <= 2")({"rating": 3})
+    # fehlender Wert zählt als 0
+    assert parse_condition("rating <= 2")({})
+
+
+def test_check_script_warns_by_default_and_fails_with_strict():
+    import os
+    import subprocess
+    import sys
+
+    script = os.path.join(os.path.dirname(__file__), "..", "scripts", "check_mini_feedback.py")
+    run = lambda *args: subprocess.run([sys.executable, script, *args], capture_output=True, text=True)
+    default = run()
+    assert default.returncode == 0, default.stdout
+    strict = run("--strict")
+    assert strict.returncode == (1 if "[warning]" in default.stdout else 0)
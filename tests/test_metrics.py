@@ -0,0 +1,31 @@
+import asyncio
+
+from auth_utils import BcryptPool
+from academy.metrics import Registry
+
+
+def test_gauge_with_function_is_read_on_render():
+    registry = Registry()
+    depth = [3]
+    registry.gauge("queue_depth", "Queue depth", fn=lambda: depth[0])
+    assert "queue_depth 3" in registry.render()
+    depth[0] = 0
+    assert "queue_depth 0" in registry.render()
+
+
+def test_bcrypt_pool_reports_to_registry():
+    registry = Registry()
+    pool = BcryptPool(workers=1, max_queue=0)
+    pool.register_metrics(registry)
+    assert asyncio.run(pool.run(lambda x: x * 2, 21)) == 42
+    text = registry.render()
+    for line in ("# TYPE academy_bcrypt_queued gauge", "academy_bcrypt_in_flight 0", "academy_bcrypt_workers 1",
+                 "academy_bcrypt_completed_total 1", "academy_bcrypt_wait_seconds_count 1",
+                 "academy_bcrypt_run_seconds_count 1"):
+        assert line in text
+
+
+def test_metrics_endpoint_includes_bcrypt_pool(client):
+    r = client.get("/api/metrics")
+    assert r.status_code == 200
+    assert "# TYPE academy_bcrypt_queued gauge" in r.text
@@ -0,0 +1,84 @@
+from academy.curriculum import CurriculumIndex
+from academy.search_index import SearchIndex, fold, free_text_keys, tokenize
+from academy.session_store import SessionStore, _matches, _sort_key, summarize
+
+CURRICULUM = {"tracks": [{"id": "T", "modules": [{"id": "A1", "drills": [{
+    "id": "A1_D1", "drill_type": "period_checkin",
+    "config": {"questions": [
+        {"key": "center_mostly", "type": "radio", "options": ["low", "middle", "high"]},
+        {"key": "note", "type": "text"},
+    ]},
+}]}]}]}
+
+
+class MemoryStore(SessionStore):
+    def __init__(self, sessions=()):
+        self.docs = {s["id"]: s for s in sessions}
+
+    def load(self, session_id):
+        return self.docs.get(session_id)
+
+    def save(self, session, base=None):
+        self.docs[session["id"]] = session
+
+    def delete(self, session_id):
+        return self.docs.pop(session_id, None) is not None
+
+    def list(self, user=None, state=None, module_id=None):
+        return [doc for doc in self.docs.values() if _matches(doc, user, state, module_id)]
+
+    def query(self, user=None, state=None, module_id=None, since=None, until=None,
+              order="desc", cursor=None, limit=None):
+        entries = sorted((summarize(doc) for doc in self.docs.values()
+                          if _matches(doc, user, state, module_id, since, until)), key=_sort_key)
+        return entries if order == "asc" else entries[::-1]
+
+    def ids(self):
+        return list(self.docs)
+
+
+def make_session(session_id, note, **fields):
+    return {"id": session_id, "user": "anna", "module_id": "A1", "drill_id": "A1_D1",
+            "created_at": "2026-01-01T10:00:00",
+            "checkins": [{"phase": "P1", "answers": {"center_mostly": "high", "note": note}}], **fields}
+
+
+def make_index(tmp_path, *sessions):
+    index = CurriculumIndex(CURRICULUM)
+    return SearchIndex(str(tmp_path / "search.jsonl"), MemoryStore(sessions), lambda: index)
+
+
+def test_fold_umlaut_spellings():
+    assert fold("Überzahl") == fold("Ueberzahl") == fold("uberzahl") == fold("ÜBERZAHL")
+    assert fold("Straße") == fold("strasse")
+    assert tokenize("für den Center") == tokenize("fuer den center")
+
+
+def test_query_without_umlaut_finds_umlaut(tmp_path):
+    index = make_index(tmp_path, make_session("s1", "Gute Überzahl im zweiten Drittel"))
+    for query in ("uberzahl", "Überzahl", "ueberzahl", "uberz"):
+        assert index.search(query)["total"] == 1, query
+
+
+def test_option_values_are_not_indexed(tmp_path):
+    index = make_index(tmp_path, make_session("s1", "Center tief"))
+    assert index.search("high")["total"] == 0
+    assert index.search("tief")["results"][0]["field"] == "checkin:P1"
+
+
+def test_free_text_keys():
+    index = CurriculumIndex(CURRICULUM)
+    assert free_text_keys(index, "A1", "A1_D1") == {"note", "expectations"}
+    assert free_text_keys(index, "A1", None) == {"note", "expectations"}
+    assert free_text_keys(None, "A1", "A1_D1") == {"expectations"}
+
+
+def test_update_and_remove(tmp_path):
+    index = make_index(tmp_path, make_session("s1", "Breakout über die Bande"))
+    index.update(make_session("s1", "Forecheck zu spät"))
+    assert index.search("bande")["total"] == 0
+    assert index.search("spat")["total"] == 1
+    index.remove("s1")
+    assert index.search("forecheck")["total"] == 0
+    reloaded = make_index(tmp_path)
+    assert reloaded.search("forecheck")["total"] == 0
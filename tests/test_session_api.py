@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+
+
+def test_put_drafts_unchanged_on_legacy_session(client, legacy_session):
+    session_id = legacy_session()
+    r = client.put(f"/api/sessions/{session_id}/drafts", json={"P1": {"center_mostly": "low"}})
+    assert r.status_code == 200
+    assert r.json() == {"status": "saved", "revision": 0}
+
+
+def test_put_drafts_changed_bumps_revision(client, legacy_session):
+    session_id = legacy_session()
+    r = client.put(f"/api/sessions/{session_id}/drafts", json={"P2": {"center_mostly": "high"}})
+    assert r.json()["revision"] == 1
+    session = client.get(f"/api/sessions/{session_id}").json()
+    assert session["drafts"] == {"P2": {"center_mostly": "high"}}
+    assert session["revision"] == 1
+
+
+def test_patch_drafts_on_legacy_session(client, legacy_session):
+    session_id = legacy_session()
+    r = client.patch(f"/api/sessions/{session_id}/drafts", json={"P1": {"center_mostly": None}, "P2": {"note": "x"}},
+                     headers={"Content-Type": "application/merge-patch+json"})
+    assert r.status_code == 200
+    assert r.json()["revision"] == 1
+    assert sorted(r.json()["changed"]) == ["/drafts/P1/center_mostly", "/drafts/P2"]
+    r = client.patch(f"/api/sessions/{session_id}/drafts", json={"P2": {"note": "x"}},
+                     headers={"Content-Type": "application/merge-patch+json"})
+    assert r.json() == {"id": session_id, "revision": 1, "changed": []}
+
+
+def test_json_patch_session(client, legacy_session):
+    session_id = legacy_session()
+    ops = [{"op": "replace", "path": "/current_phase", "value": "P2"}, {"op": "add", "path": "/focus", "value": "Center"}]
+    r = client.patch(f"/api/sessions/{session_id}", json=ops, headers={"Content-Type": "application/json-patch+json"})
+    assert r.status_code == 200
+    assert r.json()["revision"] == 1
+    session = client.get(f"/api/sessions/{session_id}").json()
+    assert (session["current_phase"], session["focus"]) == ("P2", "Center")
+
+
+def test_json_patch_protected_field(client, legacy_session):
+    session_id = legacy_session()
+    r = client.patch(f"/api/sessions/{session_id}", json=[{"op": "replace", "path": "/user", "value": "x"}],
+                     headers={"Content-Type": "application/json-patch+json"})
+    assert r.status_code == 422
+
+
+def test_if_match_mismatch_conflicts_without_writing(client, legacy_session):
+    session_id = legacy_session()
+    r = client.put(f"/api/sessions/{session_id}/phase", json={"phase": "P2"}, headers={"If-Match": '"3"'})
+    assert r.status_code == 409
+    assert r.json()["detail"] == {"error": "revision_conflict", "revision": 0}
+    session = client.get(f"/api/sessions/{session_id}").json()
+    assert session["current_phase"] == "P1"
+    assert session.get("revision", 0) == 0
+
+
+def test_if_match_current_revision(client, legacy_session):
+    session_id = legacy_session()
+    r = client.put(f"/api/sessions/{session_id}/phase", json={"phase": "P2"}, headers={"If-Match": '"0"'})
+    assert r.status_code == 200
+    r = client.put(f"/api/sessions/{session_id}/phase", json={"phase": "P3"}, headers={"If-Match": 'W/"1"'})
+    assert r.status_code == 200
+    assert client.get(f"/api/sessions/{session_id}").json()["revision"] == 2
+
+
+def test_microfeedback_on_legacy_session(client, legacy_session):
+    session_id = legacy_session()
+    r = client.post(f"/api/sessions/{session_id}/microfeedback", json={"phase": "p1", "text": "tief"})
+    assert r.status_code == 200
+    assert r.json()["revision"] == 1
+    assert r.json()["microfeedback"]["done"] is True
+
+
+def test_list_sessions_paginates_with_cursor(client, new_session):
+    ids = [new_session("pager")["id"] for _ in range(3)]
+    r = client.get("/api/sessions", params={"user": "pager", "order": "asc", "limit": 2})
+    assert [s["id"] for s in r.json()] == ids[:2]
+    r = client.get("/api/sessions", params={"user": "pager", "order": "asc", "limit": 2,
+                                            "cursor": r.headers["X-Next-Cursor"]})
+    assert [s["id"] for s in r.json()] == ids[2:]
+    assert "X-Next-Cursor" not in r.headers
+    r = client.get("/api/sessions", params={"user": "pager", "fields": "state,current_phase"})
+    assert r.json()[0] == {"id": ids[2], "state": "IN_PROGRESS", "current_phase": "PRE"}
+
+
+def test_curriculum_outline_without_drill_content(client):
+    r = client.get("/api/curriculum/outline")
+    assert r.status_code == 200
+    module = r.json()["tracks"][0]["modules"][0]
+    assert module["id"] == "A1"
+    assert module["drill_count"] == len(module["drills"])
+    assert set(module["drills"][0]) <= {"id", "title", "drill_type"}
+    r = client.get("/api/curriculum/outline", headers={"If-None-Match": r.headers["ETag"]})
+    assert r.status_code == 304
+
+
+def test_curriculum_module(client):
+    r = client.get("/api/curriculum/modules/A1")
+    assert r.status_code == 200
+    assert r.json()["track_id"] == "A"
+    assert "config" not in r.json()["drills"][0]
+    assert client.get("/api/curriculum/modules/XX").status_code == 404
+
+
+def test_curriculum_drill(client):
+    r = client.get("/api/curriculum/drills/A1_D1")
+    assert r.status_code == 200
+    assert r.json()["module_id"] == "A1"
+    assert r.json()["config"]["questions"]
+    # C1_D1 steht in C1 und C2
+    assert client.get("/api/curriculum/drills/C1_D1", params={"module_id": "C2"}).json()["module_id"] == "C2"
+    assert client.get("/api/curriculum/drills/XX_D1").status_code == 404
+
+
+def test_stats_per_user(client, new_session):
+    new_session("counter", confidence=4)
+    aborted = new_session("counter", confidence=2)
+    client.post(f"/api/sessions/{aborted['id']}/abort", json={"reason": "time"})
+    r = client.get("/api/stats", params={"user": "counter"})
+    assert r.status_code == 200
+    assert r.json()["total"] == 2
+    assert r.json()["by_state"] == {"IN_PROGRESS": 1, "ABORTED": 1}
+    assert r.json()["active"] == 1
+
+
+def test_progress_per_module_and_track(client, new_session):
+    new_session("progress")
+    aborted = new_session("progress", drill_id="A1_D2")
+    client.post(f"/api/sessions/{aborted['id']}/abort", json={"reason": "time"})
+    new_session("progress", module_id="B1", drill_id="B1_D1")
+    r = client.get("/api/progress", params={"user": "progress"})
+    assert r.status_code == 200
+    modules = r.json()["modules"]
+    assert modules["A1"]["total"] == 2
+    assert modules["A1"]["aborted"] == 1
+    assert modules["A1"]["active"] == 1
+    assert modules["A1"]["last_session"]["id"] == aborted["id"]
+    assert r.json()["tracks"]["A"]["modules"] == 1
+    assert r.json()["tracks"]["B"]["total"] == 1
+
+
+def test_export_ndjson_and_csv(client, new_session):
+    ids = [new_session("exporter")["id"] for _ in range(2)]
+    client.post(f"/api/sessions/{ids[0]}/checkins", json={"phase": "P1", "answers": {"center_mostly": "high"}})
+    r = client.get("/api/export/sessions", params={"user": "exporter"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["id"] for line in r.text.splitlines()] == ids
+    r = client.get("/api/export/sessions", params={"user": "exporter", "module": "A1", "format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert [row["id"] for row in rows] == ids
+    assert rows[0]["P1.center_mostly"] == "high"
+    assert client.get("/api/export/sessions", params={"format": "xml"}).status_code == 400
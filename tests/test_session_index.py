@@ -0,0 +1,74 @@
+import json
+
+from academy.session_ids import new_session_id
+from academy.session_store import JsonSessionStore, SessionIndex
+
+
+def session(session_id, user="anna", **fields):
+    return {"id": session_id, "user": user, "module_id": "A1", "state": "IN_PROGRESS",
+            "created_at": "2026-01-01T10:00:00", "checkins": [], **fields}
+
+
+def lines(path):
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_put_appends_one_line(tmp_path):
+    path = tmp_path / "index.jsonl"
+    index = SessionIndex(str(path))
+    index.refresh([], lambda sid: None, lambda sid: None)
+    for n in range(1, 4):
+        index.put(session(f"s{n}"), (n, 10))
+    before = lines(path)
+    index.put(session("s2", checkins=[{"phase": "P1"}]), (5, 20))
+    after = lines(path)
+    assert after[:-1] == before
+    assert json.loads(after[-1])["entry"]["checkin_phases"] == ["P1"]
+
+
+def test_stamp_only_change_is_not_written(tmp_path):
+    path = tmp_path / "index.jsonl"
+    index = SessionIndex(str(path))
+    index.put(session("s1"), (1, 10))
+    before = lines(path)
+    index.put(session("s1"), (2, 11))
+    assert lines(path) == before
+    assert index.entries["s1"]["mtime"] == 2
+
+
+def test_other_process_changes_are_visible(tmp_path):
+    path = str(tmp_path / "index.jsonl")
+    backend, streamlit = SessionIndex(path), SessionIndex(path)
+    backend.put(session("s1"), (1, 10))
+    streamlit.put(session("s2", user="ben"), (2, 10))
+    backend.put(session("s3"), (3, 10))
+    assert sorted(backend.ids()) == sorted(streamlit.ids()) == ["s1", "s2", "s3"]
+    streamlit.remove("s1")
+    assert [e["id"] for e in backend.query(user="anna")] == ["s3"]
+    assert SessionIndex(path).ids() == backend.ids()
+
+
+def test_compaction_is_picked_up_by_other_process(tmp_path):
+    path = str(tmp_path / "index.jsonl")
+    first, second = SessionIndex(path), SessionIndex(path)
+    for n in range(150):
+        first.put(session(f"s{n}"), (n, 10))
+        first.put(session(f"s{n}", state="POST"), (n, 11))
+        first.put(session(f"s{n}", state="COMPLETED"), (n, 12))
+    # 450 Änderungen, kompaktiert bei mehr als 2 Zeilen pro Session
+    assert len(lines(tmp_path / "index.jsonl")) <= 301
+    second.put(session("x1"), (1, 1))
+    assert len(first.ids()) == 151
+    assert first.query(state="COMPLETED")[0]["state"] == "COMPLETED"
+
+
+def test_store_ids_include_sessions_from_other_store(tmp_path):
+    sessions_dir = str(tmp_path / "sessions")
+    backend = JsonSessionStore(sessions_dir)
+    streamlit = JsonSessionStore(sessions_dir)
+    first_id, second_id = new_session_id(), new_session_id()
+    backend.save(session(first_id))
+    streamlit.save(session(second_id, user="ben"))
+    assert sorted(backend.ids()) == [first_id, second_id]
+    assert [e["id"] for e in backend.query(user="ben")] == [second_id]
+    assert backend.load(second_id)["user"] == "ben"
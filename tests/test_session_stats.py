@@ -0,0 +1,86 @@
+from academy.session_stats import SessionStats
+
+
+class FakeStore:
+    """Summaries im Speicher; query wie beim echten Store (created_at aufsteigend)"""
+
+    def __init__(self):
+        self.summaries = {}
+
+    def query(self, user=None, order="asc"):
+        rows = [s for s in self.summaries.values() if user is None or s["user"] == user]
+        return sorted(rows, key=lambda s: (s["created_at"], s["id"]), reverse=order == "desc")
+
+
+def summary(session_id, state="IN_PROGRESS", drill_id="A1_D1", user="anna", **fields):
+    return {"id": session_id, "user": user, "state": state, "module_id": "A1", "drill_id": drill_id,
+            "created_at": f"2026-01-01T10:00:{session_id[-2:]}", **fields}
+
+
+def save(store, stats, new):
+    old = store.summaries.get(new["id"])
+    store.summaries[new["id"]] = new
+    stats.update(old, new)
+
+
+def test_module_wide_sessions_count_as_completed():
+    store = FakeStore()
+    store.summaries["s01"] = summary("s01", "COMPLETED")
+    store.summaries["s02"] = summary("s02", "COMPLETED", drill_id=None)
+    stats = SessionStats(store).stats("anna")
+    assert stats["completed"] == 2
+    assert stats["completed_drills"] == ["A1_D1"]
+    assert stats["completed_by_module"] == {"A1": 2}
+
+
+def test_incremental_update_matches_rebuild():
+    store = FakeStore()
+    stats = SessionStats(store)
+    save(store, stats, summary("s01"))
+    stats.stats()
+    save(store, stats, summary("s01", "COMPLETED", drill_id=None))
+    save(store, stats, summary("s02", "COMPLETED"))
+    incremental = stats.stats("anna")
+    stats.reset()
+    assert stats.stats("anna") == incremental
+    assert incremental["completed_by_module"] == {"A1": 2}
+
+
+def test_update_after_build_read_new_state_counts_once():
+    store = FakeStore()
+    stats = SessionStats(store)
+    stats.stats()
+    old = summary("s01")
+    store.summaries["s01"] = old
+    stats.update(None, old)
+    new = summary("s01", "COMPLETED")
+    store.summaries["s01"] = new
+    # Aufbau zwischen Speichern und update() sieht schon den neuen Stand
+    stats.reset()
+    stats.stats()
+    stats.update(old, new)
+    result = stats.stats("anna")
+    assert result["total"] == 1
+    assert result["completed"] == 1
+    assert result["by_state"] == {"COMPLETED": 1}
+
+
+def test_create_after_build_counts_once():
+    store = FakeStore()
+    stats = SessionStats(store)
+    new = summary("s01")
+    store.summaries["s01"] = new
+    stats.stats()
+    stats.update(None, new)
+    assert stats.stats("anna")["total"] == 1
+
+
+def test_delete():
+    store = FakeStore()
+    stats = SessionStats(store)
+    save(store, stats, summary("s01", "COMPLETED"))
+    stats.stats()
+    stats.update(store.summaries.pop("s01"), None)
+    result = stats.stats("anna")
+    assert result["total"] == 0
+    assert result["completed_by_module"] == {}
@@ -0,0 +1,140 @@
+import logging
+import threading
+
+from academy.session_store import SessionStore, WriteBehindSessionStore, _matches, _sort_key, summarize
+
+
+class SlowStore(SessionStore):
+    """Innerer Store, dessen save() wartet, bis der Test ihn freigibt"""
+
+    def __init__(self):
+        self.docs = {}
+        self.saving = threading.Event()
+        self.release = threading.Event()
+
+    def load(self, session_id):
+        doc = self.docs.get(session_id)
+        return dict(doc) if doc is not None else None
+
+    def save(self, session, base=None):
+        self.saving.set()
+        self.release.wait(5)
+        self.docs[session["id"]] = dict(session)
+
+    def delete(self, session_id):
+        return self.docs.pop(session_id, None) is not None
+
+    def ids(self):
+        return list(self.docs)
+
+    def list(self, user=None, state=None, module_id=None):
+        return [dict(doc) for doc in self.docs.values() if _matches(doc, user, state, module_id)]
+
+    def query(self, user=None, state=None, module_id=None, since=None, until=None,
+              order="desc", cursor=None, limit=None):
+        entries = sorted((summarize(doc) for doc in self.docs.values()
+                          if _matches(doc, user, state, module_id, since, until)), key=_sort_key)
+        return entries if order == "asc" else entries[::-1]
+
+
+def start_flush(store):
+    thread = threading.Thread(target=store.flush)
+    thread.start()
+    store.inner.saving.wait(5)
+    return thread
+
+
+def test_saves_are_coalesced():
+    inner = SlowStore()
+    inner.release.set()
+    store = WriteBehindSessionStore(inner)
+    store.save({"id": "s1", "revision": 1})
+    store.save({"id": "s1", "revision": 2})
+    assert store.load("s1")["revision"] == 2
+    assert store.flush() == 1
+    assert inner.docs["s1"]["revision"] == 2
+    assert store.dirty_count == 0
+
+
+def test_load_during_flush_sees_buffered_state():
+    inner = SlowStore()
+    inner.docs["s1"] = {"id": "s1", "revision": 1, "checkins": []}
+    store = WriteBehindSessionStore(inner)
+    store.save({"id": "s1", "revision": 2, "checkins": ["A"]})
+    thread = start_flush(store)
+    try:
+        current = store.load("s1")
+        assert current["revision"] == 2
+        current["checkins"].append("B")
+        current["revision"] = 3
+        store.save(current)
+    finally:
+        inner.release.set()
+        thread.join()
+    store.flush()
+    assert inner.docs["s1"] == {"id": "s1", "revision": 3, "checkins": ["A", "B"]}
+
+
+def test_delete_during_flush_waits_for_write():
+    inner = SlowStore()
+    store = WriteBehindSessionStore(inner)
+    store.save({"id": "s1", "revision": 1})
+    thread = start_flush(store)
+    result = {}
+    deleter = threading.Thread(target=lambda: result.setdefault("deleted", store.delete("s1")))
+    deleter.start()
+    inner.release.set()
+    thread.join()
+    deleter.join()
+    assert result["deleted"] is True
+    assert "s1" not in inner.docs
+    assert store.load("s1") is None
+
+
+def test_failed_write_is_requeued(caplog):
+    inner = SlowStore()
+    inner.release.set()
+    calls = []
+
+    def failing_save(session, base=None):
+        calls.append(session["revision"])
+        if len(calls) == 1:
+            raise OSError("disk full")
+        inner.docs[session["id"]] = dict(session)
+
+    inner.save = failing_save
+    store = WriteBehindSessionStore(inner)
+    store.save({"id": "s1", "revision": 1})
+    with caplog.at_level(logging.ERROR, logger="academy.store"):
+        assert store.flush() == 0
+    assert store.load("s1")["revision"] == 1
+    record = caplog.records[-1]
+    assert record.name == "academy.store"
+    assert (record.event, record.session_id) == ("write_behind_flush_failed", "s1")
+    assert store.flush() == 1
+    assert inner.docs["s1"]["revision"] == 1
+
+
+def test_query_and_list_read_the_buffer_without_flushing(tmp_path):
+    from academy.session_ids import new_session_id
+    from academy.session_store import JsonSessionStore
+
+    store = WriteBehindSessionStore(JsonSessionStore(str(tmp_path / "sessions")))
+    sessions = [{"id": new_session_id(), "user": "anna", "module_id": "A1", "state": "IN_PROGRESS",
+                 "created_at": f"2026-01-0{n}T10:00:00", "checkins": []} for n in range(1, 4)]
+    store.save(sessions[0])
+    store.flush()
+    for s in sessions[1:]:
+        store.save(s)
+    store.save({**sessions[0], "state": "COMPLETED"})
+    assert store.writes == 1
+    assert [e["id"] for e in store.query(order="asc")] == [s["id"] for s in sessions]
+    assert [e["id"] for e in store.query(state="COMPLETED")] == [sessions[0]["id"]]
+    assert store.inner.query(state="COMPLETED") == []
+    first = store.query(limit=2)
+    assert [e["id"] for e in first] == [sessions[2]["id"], sessions[1]["id"]]
+    rest = store.query(limit=2, cursor=(first[-1]["created_at"], first[-1]["id"]))
+    assert [e["id"] for e in rest] == [sessions[0]["id"]]
+    assert [s["state"] for s in store.list(user="anna")] == ["COMPLETED", "IN_PROGRESS", "IN_PROGRESS"]
+    assert sorted(store.ids()) == sorted(s["id"] for s in sessions)
+    assert store.writes == 1